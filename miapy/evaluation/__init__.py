@@ -8,6 +8,7 @@ This package provides an easy way to evaluate the performance of your algorithms
 We provide an :class:`evaluator.Evaluator` and two writers (:class:`evaluator.CSVEvaluatorWriter`)
 and (:class:`evaluator.ConsoleEvaluatorWriter`), which can be used with a large amount of metrics
 (see :mod:`evaluation.metric`).
+For a fast, approximate evaluation use the :class:`preview.PreviewEvaluator`.
 
 
 This package provides a number of metric measures that e.g. can be used for testing
@@ -30,6 +31,30 @@ The metric module (:mod:`evaluation.metric`)
 .. automodule:: evaluation.metric
     :members:
 
+The agreement module (:mod:`evaluation.agreement`)
+--------------------------------------------------
+
+.. automodule:: evaluation.agreement
+    :members:
+
+The preview module (:mod:`evaluation.preview`)
+----------------------------------------------
+
+.. automodule:: evaluation.preview
+    :members:
+
+The results module (:mod:`evaluation.results`)
+----------------------------------------------
+
+.. automodule:: evaluation.results
+    :members:
+
+The statistics module (:mod:`evaluation.statistics`)
+----------------------------------------------------
+
+.. automodule:: evaluation.statistics
+    :members:
+
 The validation module (:mod:`evaluation.validation`)
 ----------------------------------------------------
 
@@ -0,0 +1,221 @@
+"""The agreement module enables the evaluation of the agreement between multiple raters.
+
+The label maps of K raters (e.g. annotators or models) are compared pairwise. Instead of evaluating each of the K x K
+pairs separately, the label maps are stacked and encoded once, and the confusion counts of all labels of a pair are
+obtained from a single joint histogram. The metrics are calculated with the confusion matrix metrics of the
+:mod:`evaluation.metric` module.
+
+Example usage:
+
+>>> evaluator = AgreementEvaluator()
+>>> evaluator.add_label(1, "Tumor")
+>>> evaluator.add_label((1, 2), "Tumor and edema")
+>>> evaluator.add_metric(DiceCoefficient())
+>>> result = evaluator.evaluate([rater1, rater2, rater3])
+>>> result.matrices["DICE"]  # shape=(2, 3, 3)
+>>> result.fleiss_kappa  # shape=(2,)
+"""
+from typing import Union
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.evaluation.metric as mtrc
+import miapy.image.image as img
+
+
+class AgreementResult:
+    """Represents the agreement between multiple raters."""
+
+    def __init__(self, labels: list, tp: np.ndarray, tn: np.ndarray, fp: np.ndarray, fn: np.ndarray,
+                 matrices: dict, fleiss_kappa: np.ndarray):
+        """Initializes a new instance of the AgreementResult class.
+
+        Args:
+            labels (list): The label descriptions.
+            tp (np.ndarray): The true positives of shape=(labels, K, K), where rater i is the prediction and rater j
+                the reference of element [l, i, j].
+            tn (np.ndarray): The true negatives of shape=(labels, K, K).
+            fp (np.ndarray): The false positives of shape=(labels, K, K).
+            fn (np.ndarray): The false negatives of shape=(labels, K, K).
+            matrices (dict): The metric matrices of shape=(labels, K, K) by metric name.
+            fleiss_kappa (np.ndarray): Fleiss' kappa of all raters of shape=(labels,).
+        """
+        self.labels = labels
+        self.tp = tp
+        self.tn = tn
+        self.fp = fp
+        self.fn = fn
+        self.matrices = matrices
+        self.fleiss_kappa = fleiss_kappa
+
+    @property
+    def number_of_raters(self) -> int:
+        """int: The number of raters."""
+        return self.tp.shape[1]
+
+    def get_mean_pairwise_agreement(self, metric: str) -> np.ndarray:
+        """Gets the mean agreement over all pairs of distinct raters.
+
+        Args:
+            metric (str): The metric name, e.g. "DICE".
+
+        Returns:
+            np.ndarray: The mean agreement of shape=(labels,).
+        """
+        matrix = self.matrices[metric]
+        off_diagonal = ~np.eye(self.number_of_raters, dtype=bool)
+        return np.nanmean(matrix[:, off_diagonal], axis=1)
+
+    def get_rater_agreement(self, metric: str) -> np.ndarray:
+        """Gets the mean agreement of each rater with all other raters.
+
+        Args:
+            metric (str): The metric name, e.g. "DICE".
+
+        Returns:
+            np.ndarray: The mean agreement of shape=(labels, K).
+        """
+        matrix = self.matrices[metric].copy()
+        matrix[:, np.eye(self.number_of_raters, dtype=bool)] = np.nan
+        # use the mean of both directions as non-symmetric metrics depend on which rater is the reference
+        return np.nanmean(np.concatenate([matrix, matrix.transpose(0, 2, 1)], axis=2), axis=2)
+
+
+class AgreementEvaluator:
+    """Represents an evaluator of the pairwise agreement between multiple raters."""
+
+    def __init__(self):
+        """Initializes a new instance of the AgreementEvaluator class."""
+        self.metrics = []  # list of IConfusionMatrixMetrics
+        self.labels = {}  # dictionary of label: label_str
+
+    def add_label(self, label: Union[tuple, int], description: str):
+        """Adds a label with its description to the evaluation.
+
+        Args:
+            label (Union[tuple, int]): The label or a tuple of labels that should be merged.
+            description (str): The label's description.
+        """
+        self.labels[label] = description
+
+    def add_metric(self, metric: mtrc.IConfusionMatrixMetric):
+        """Adds a metric to the evaluation.
+
+        Args:
+            metric (IConfusionMatrixMetric): The metric.
+
+        Raises:
+            ValueError: If the metric is not based on the confusion matrix.
+        """
+        if not isinstance(metric, mtrc.IConfusionMatrixMetric):
+            raise ValueError('only confusion matrix metrics are supported')
+
+        self.metrics.append(metric)
+
+    def evaluate(self, label_maps: list) -> AgreementResult:
+        """Evaluates the pairwise agreement between the label maps.
+
+        If no metrics were added, the Dice coefficient, the Jaccard coefficient, and Cohen's kappa are calculated.
+
+        Args:
+            label_maps (list): The label maps (sitk.Image or np.ndarray) of the K raters, which need to have the same
+                number of voxels.
+
+        Returns:
+            AgreementResult: The agreement.
+        """
+
+        if len(label_maps) < 2:
+            raise ValueError('at least two label maps are required')
+
+        arrays = [(sitk.GetArrayViewFromImage(label_map) if isinstance(label_map, sitk.Image) else
+                   np.asarray(label_map)).ravel() for label_map in label_maps]
+        if any(array.size != arrays[0].size for array in arrays):
+            raise ValueError('all label maps need to have the same number of voxels')
+
+        codes, values = _encode(arrays)
+        del arrays
+
+        # membership of each encoded value in each label, shape=(labels, values)
+        memberships = np.array([np.isin(values, label) for label in self.labels], dtype=bool).reshape(-1, len(values))
+
+        number_of_raters = len(codes)
+        number_of_values = len(values)
+        shape = (len(self.labels), number_of_raters, number_of_raters)
+        tp = np.zeros(shape, dtype=np.int64)
+        prediction_positives = np.zeros(shape, dtype=np.int64)
+        reference_positives = np.zeros(shape, dtype=np.int64)
+
+        for i in range(number_of_raters):
+            offsets = codes[i].astype(np.intp) * number_of_values
+            for j in range(i, number_of_raters):
+                # joint histogram of the values of rater i (rows) and rater j (columns)
+                histogram = np.bincount(offsets + codes[j], minlength=number_of_values * number_of_values) \
+                    .reshape(number_of_values, number_of_values)
+                for l, membership in enumerate(memberships):
+                    rows = histogram[membership]
+                    tp[l, i, j] = tp[l, j, i] = rows[:, membership].sum()
+                    prediction_positives[l, i, j] = reference_positives[l, j, i] = rows.sum()
+                    reference_positives[l, i, j] = prediction_positives[l, j, i] = histogram[:, membership].sum()
+
+        fp = prediction_positives - tp
+        fn = reference_positives - tp
+        tn = codes.shape[1] - tp - fp - fn
+
+        metrics = self.metrics if self.metrics else [mtrc.DiceCoefficient(), mtrc.JaccardCoefficient(),
+                                                     mtrc.CohenKappaMetric()]
+        matrices = {str(metric): mtrc.calculate_confusion_matrix_metric(metric, tp, tn, fp, fn) for metric in metrics}
+
+        fleiss_kappa = np.array([_calculate_fleiss_kappa(codes, membership) for membership in memberships])
+
+        return AgreementResult(list(self.labels.values()), tp, tn, fp, fn, matrices, fleiss_kappa)
+
+
+def _encode(arrays: list) -> (np.ndarray, np.ndarray):
+    """Encodes the values of the label maps to consecutive codes.
+
+    Non-negative integer label maps with a small maximum and densely used values are used as is (code == value);
+    otherwise, the unique values are determined. Sparse values (e.g. 0 and 60000) would inflate the joint histograms,
+    whose size is the squared number of codes.
+
+    Returns:
+        (np.ndarray, np.ndarray): The stacked codes of shape=(K, voxels) and the value of each code.
+    """
+
+    if all(np.issubdtype(array.dtype, np.integer) for array in arrays):
+        minimum = min(int(array.min()) for array in arrays)
+        maximum = max(int(array.max()) for array in arrays)
+        if minimum >= 0 and maximum < 2 ** 16:
+            counts = sum(np.bincount(array.reshape(-1), minlength=maximum + 1) for array in arrays)
+            if maximum + 1 <= 2 * np.count_nonzero(counts):
+                dtype = img.get_label_data_type(maximum)
+                return np.stack([array.astype(dtype, copy=False) for array in arrays]), np.arange(maximum + 1)
+
+    values = np.unique(np.concatenate([np.unique(array) for array in arrays]))
+    dtype = img.get_label_data_type(len(values) - 1)
+    return np.stack([np.searchsorted(values, array).astype(dtype) for array in arrays]), values
+
+
+def _calculate_fleiss_kappa(codes: np.ndarray, membership: np.ndarray) -> float:
+    """Calculates Fleiss' kappa of the binary label decision (in label or not) of all raters."""
+
+    number_of_raters, number_of_voxels = codes.shape
+
+    votes = np.zeros(number_of_voxels, dtype=np.uint16 if number_of_raters < 2 ** 16 else np.uint32)
+    for rater_codes in codes:
+        votes += membership[rater_codes]
+
+    # the number of voxels with j positive votes
+    histogram = np.bincount(votes, minlength=number_of_raters + 1).astype(np.float64)
+    j = np.arange(number_of_raters + 1)
+
+    voxel_agreement = (j * (j - 1) + (number_of_raters - j) * (number_of_raters - j - 1)) / \
+                      (number_of_raters * (number_of_raters - 1))
+    observed_agreement = (histogram * voxel_agreement).sum() / number_of_voxels
+    p = (histogram * j).sum() / (number_of_voxels * number_of_raters)
+    chance_agreement = p * p + (1 - p) * (1 - p)
+
+    if chance_agreement == 1:
+        return 1.0 if observed_agreement == 1 else 0.0
+    return (observed_agreement - chance_agreement) / (1 - chance_agreement)
@@ -1,11 +1,15 @@
 """Contains evaluation function"""
 import csv
+import numbers
 import os
 from abc import ABCMeta, abstractmethod
 from typing import Union
 import SimpleITK as sitk
 import numpy as np
-from miapy.evaluation.metric import IMetric, IConfusionMatrixMetric, ConfusionMatrix, ISimpleITKImageMetric, INumpyArrayMetric
+from miapy.evaluation.metric import IMetric, ConfusionMatrix, calculate_moments, \
+    MASKS, CONFUSION_MATRIX, IMAGES, SURFACES, MOMENTS, PRIMITIVES
+from miapy.evaluation.results import EvaluationResults
+import miapy.image.image as img
 
 
 class IEvaluatorWriter(metaclass=ABCMeta):
@@ -139,6 +143,62 @@ class ConsoleEvaluatorWriter(IEvaluatorWriter):
         self.header = header
 
 
+class EvaluationPlan:
+    """Represents the plan of the primitives to compute for each label.
+
+    A primitive (see :data:`metric.PRIMITIVES`) is only computed if a metric requires it, either directly or through
+    another primitive, and at most once per label. Print the plan to see why a primitive is computed.
+    """
+
+    def __init__(self, metrics: list, images_from_masks: bool=True):
+        """Initializes a new instance of the EvaluationPlan class.
+
+        Args:
+            metrics (list): The metrics (IMetric).
+            images_from_masks (bool): True if the images are converted from the masks; False if the images are
+                thresholded from SimpleITK inputs (without computing the masks).
+        """
+
+        self.dependencies = {MASKS: (),
+                             CONFUSION_MATRIX: (MASKS, ),
+                             IMAGES: (MASKS, ) if images_from_masks else (),
+                             SURFACES: (IMAGES, ),
+                             MOMENTS: (MASKS, )}
+        self.reasons = {}  # dictionary of primitive: list of metrics or primitives requiring it
+
+        for metric in metrics:
+            for primitive in metric.primitives:
+                self._require(primitive, str(metric))
+
+        self.primitives = [primitive for primitive in PRIMITIVES if primitive in self.reasons]  # in computation order
+
+    def _require(self, primitive: str, reason: str):
+        """Adds a primitive and its dependencies to the plan."""
+
+        if primitive not in self.dependencies:
+            raise ValueError('unknown primitive {} required by {}'.format(primitive, reason))
+
+        if primitive not in self.reasons:
+            self.reasons[primitive] = []
+            for dependency in self.dependencies[primitive]:
+                self._require(dependency, primitive)
+
+        self.reasons[primitive].append(reason)
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+
+        string = 'EvaluationPlan:\n'
+        for primitive in self.primitives:
+            string += ' {:<17} required by {}\n'.format(primitive + ':', ', '.join(self.reasons[primitive]))
+
+        return string
+
+
 class Evaluator:
     """
     Represents a metric evaluator.
@@ -160,6 +220,10 @@ class Evaluator:
     ID;LABEL;DICE;VOLSMTY
     Patient1;Background;0.999548418549;0.999757743496
     Patient1;Nerve;0.70692469107;0.842776093884
+
+    All results are also accumulated in memory (see :class:`results.EvaluationResults`):
+
+    >>> evaluator.results.filter(metric="DICE").aggregate(by=("label", ), functions=("mean", "std"))
     """
 
     def __init__(self, writer: IEvaluatorWriter=None):
@@ -174,6 +238,7 @@ class Evaluator:
         self.writers = [writer] if writer is not None else []  # list of IEvaluatorWriters
         self.labels = {}  # dictionary of label: label_str
         self.is_header_written = False
+        self.results = EvaluationResults()  # the accumulated results of all evaluations
 
     def add_label(self, label: Union[tuple, int], description: str):
         """
@@ -209,6 +274,24 @@ class Evaluator:
         self.writers.append(writer)
         self.is_header_written = False  # re-write header
 
+    def plan(self, image: Union[sitk.Image, np.ndarray], ground_truth: Union[sitk.Image, np.ndarray]) \
+            -> EvaluationPlan:
+        """Plans the primitives to compute for the registered metrics and labels.
+
+        Args:
+            image (Union[sitk.Image, np.ndarray]): The segmented image.
+            ground_truth (Union[sitk.Image, np.ndarray]): The ground truth image.
+
+        Returns:
+            EvaluationPlan: The plan.
+        """
+
+        # single labels of SimpleITK images can be thresholded directly without computing the masks
+        images_from_masks = not (isinstance(image, sitk.Image) and isinstance(ground_truth, sitk.Image)) or \
+            not all(isinstance(label, numbers.Integral) for label in self.labels)
+
+        return EvaluationPlan(self.metrics, images_from_masks)
+
     def evaluate(self, image: Union[sitk.Image, np.ndarray], ground_truth: Union[sitk.Image, np.ndarray],
                  evaluation_id: str):
         """Evaluates the metrics on the provided image and ground truth image.
@@ -222,52 +305,64 @@ class Evaluator:
         if not self.is_header_written:
             self.write_header()
 
-        image_array = sitk.GetArrayFromImage(image) if isinstance(image, sitk.Image) else image
-        ground_truth_array = sitk.GetArrayFromImage(ground_truth) if isinstance(ground_truth, sitk.Image) else ground_truth
+        plan = self.plan(image, ground_truth)
+
+        if MASKS in plan.primitives:
+            # views are sufficient since the images are alive during the evaluation
+            image_array = sitk.GetArrayViewFromImage(image) if isinstance(image, sitk.Image) else image
+            ground_truth_array = sitk.GetArrayViewFromImage(ground_truth) if isinstance(ground_truth, sitk.Image) \
+                else ground_truth
+            if len(self.labels) > 1:
+                # a single conversion to the smallest label data type speeds up the mask computation of each label
+                image_array, ground_truth_array = _get_compact_label_array(image_array), \
+                    _get_compact_label_array(ground_truth_array)
 
         results = []  # clear results
 
         for label, label_str in self.labels.items():
             label_results = [evaluation_id, label_str]
 
-            # get only current label
-            predictions = np.in1d(image_array.ravel(), label, True).reshape(image_array.shape).astype(np.uint8)
-            labels = np.in1d(ground_truth_array.ravel(), label, True).reshape(ground_truth_array.shape).astype(np.uint8)
-
-            # calculate the confusion matrix for IConfusionMatrixMetric
-            confusion_matrix = ConfusionMatrix(predictions, labels)
-
-            # flag indicating whether the images have been converted for ISimpleITKImageMetric
-            converted_to_image = False
-            predictions_as_image = None
-            labels_as_image = None
+            primitives = {}
+            for primitive in plan.primitives:
+                if primitive == MASKS:
+                    # get only current label
+                    primitives[MASKS] = (_get_mask(image_array, label), _get_mask(ground_truth_array, label))
+                elif primitive == CONFUSION_MATRIX:
+                    primitives[CONFUSION_MATRIX] = _get_confusion_matrix(*primitives[MASKS])
+                elif primitive == IMAGES:
+                    if MASKS in plan.dependencies[IMAGES]:
+                        primitives[IMAGES] = tuple(_get_image_from_mask(mask, reference) for mask, reference in
+                                                   zip(primitives[MASKS], (image, ground_truth)))
+                    else:
+                        primitives[IMAGES] = (sitk.BinaryThreshold(image, label, label, 1, 0),
+                                              sitk.BinaryThreshold(ground_truth, label, label, 1, 0))
+                elif primitive == SURFACES:
+                    primitives[SURFACES] = tuple(sitk.LabelContour(image_) for image_ in primitives[IMAGES])
+                elif primitive == MOMENTS:
+                    primitives[MOMENTS] = tuple(calculate_moments(mask) for mask in primitives[MASKS])
 
             # calculate the metrics
-            for param_index, metric in enumerate(self.metrics):
-                if isinstance(metric, IConfusionMatrixMetric):
-                    metric.confusion_matrix = confusion_matrix
-                elif isinstance(metric, INumpyArrayMetric):
-                    metric.ground_truth = labels
-                    metric.segmentation = predictions
-                elif isinstance(metric, ISimpleITKImageMetric):
-                    if not converted_to_image:
-                        predictions_as_image = sitk.GetImageFromArray(predictions)
-                        predictions_as_image.CopyInformation(image)
-                        labels_as_image = sitk.GetImageFromArray(labels)
-                        labels_as_image.CopyInformation(ground_truth)
-                        converted_to_image = True
-
-                    metric.ground_truth = labels_as_image
-                    metric.segmentation = predictions_as_image
-
+            for metric in self.metrics:
+                metric.set_primitives(primitives)
                 label_results.append(metric.calculate())
 
             results.append(label_results)
 
+        self._store(results, [str(metric) for metric in self.metrics])
+
         # write the results
         for writer in self.writers:
             writer.write(results)
 
+    def _store(self, results: list, metrics: list):
+        """Accumulates the results (a list per label with id, label, and a value per metric) in memory."""
+
+        number_of_metrics = len(metrics)
+        self.results.extend([row[0] for row in results for _ in range(number_of_metrics)],
+                            [row[1] for row in results for _ in range(number_of_metrics)],
+                            metrics * len(results),
+                            [value for row in results for value in row[2:]])
+
     def write_header(self):
         """
         Writes the header. 
@@ -282,3 +377,38 @@ class Evaluator:
             writer.write_header(header)
 
         self.is_header_written = True
+
+
+def _get_compact_label_array(array: np.ndarray) -> np.ndarray:
+    """Gets the array in the smallest label data type or the array itself if it has non-integral values."""
+
+    try:
+        return img.get_compact_label_array(array)
+    except ValueError:
+        return array
+
+
+def _get_mask(array: np.ndarray, label: Union[tuple, int]) -> np.ndarray:
+    """Gets the uint8 mask of a label (or a tuple of labels)."""
+
+    mask = np.isin(array, label) if isinstance(label, tuple) else array == label
+    return mask.view(np.uint8)  # no copy since bool and uint8 have the same size
+
+
+def _get_confusion_matrix(prediction: np.ndarray, label: np.ndarray) -> ConfusionMatrix:
+    """Gets the confusion matrix of two masks with a single pass over the intersection."""
+
+    tp = np.int64(np.count_nonzero(prediction & label))
+    predicted = np.int64(np.count_nonzero(prediction))
+    labeled = np.int64(np.count_nonzero(label))
+
+    return ConfusionMatrix.from_counts(tp, prediction.size - predicted - labeled + tp, predicted - tp, labeled - tp)
+
+
+def _get_image_from_mask(mask: np.ndarray, reference: Union[sitk.Image, np.ndarray]) -> sitk.Image:
+    """Converts a mask to an image with the image information of the reference (if it is an image)."""
+
+    image = sitk.GetImageFromArray(mask)
+    if isinstance(reference, sitk.Image):
+        image.CopyInformation(reference)
+    return image
@@ -8,6 +8,10 @@ It is possible to implement your own metrics and use them with the :class:`evalu
 Just inherit from :class:`metric.IMetric`, :class:`metric.IConfusionMatrixMetric` or :class:`ISimpleITKImageMetric`
 and implement the function :func:`calculate`.
 
+The :class:`evaluator.Evaluator` only computes the primitives (e.g. the label masks or the confusion matrix) that
+are required by the metrics' ``primitives`` attribute, see :data:`PRIMITIVES`. Metrics requiring other primitives
+than their base class override ``primitives`` and :func:`IMetric.set_primitives`.
+
 """
 from abc import ABCMeta, abstractmethod
 import math
@@ -78,6 +82,30 @@ def get_classical_metrics():
            PredictionVolume()]
 
 
+MASKS = 'masks'  # the label masks as np.ndarray of the segmentation and the ground truth
+CONFUSION_MATRIX = 'confusion_matrix'  # the ConfusionMatrix of the label masks
+IMAGES = 'images'  # the label masks as sitk.Image of the segmentation and the ground truth
+SURFACES = 'surfaces'  # the label contours as sitk.Image of the segmentation and the ground truth
+MOMENTS = 'moments'  # the voxel count, mean, and covariance of the label masks of the segmentation and the ground truth
+
+PRIMITIVES = (MASKS, CONFUSION_MATRIX, IMAGES, SURFACES, MOMENTS)
+"""The primitives, which can be required by a metric (in the order of their computation)."""
+
+
+def calculate_moments(mask: np.ndarray) -> tuple:
+    """Calculates the moments of a label mask.
+
+    Args:
+        mask (np.ndarray): The label mask.
+
+    Returns:
+        tuple: The number of voxels, the mean, and the covariance matrix of the voxel indices (in x, y, z order).
+    """
+
+    indices = np.flip(np.array(np.nonzero(mask)), axis=0)
+    return indices.shape[1], indices.mean(axis=1), np.cov(indices)
+
+
 def _calculate_volume(image: sitk.Image):
     """Calculates the volume of a label image."""
 
@@ -104,10 +132,72 @@ class ConfusionMatrix:
 
         self.n = prediction.size
 
+    @classmethod
+    def from_counts(cls, tp, tn, fp, fn):
+        """Creates a confusion matrix from already computed counts.
+
+        The counts can be scalars or NumPy arrays of equal shape, e.g. the counts of many subjects and labels.
+
+        Args:
+            tp: The true positives.
+            tn: The true negatives.
+            fp: The false positives.
+            fn: The false negatives.
+
+        Returns:
+            ConfusionMatrix: The confusion matrix.
+        """
+
+        confusion_matrix = cls.__new__(cls)
+        confusion_matrix.tp = tp
+        confusion_matrix.tn = tn
+        confusion_matrix.fp = fp
+        confusion_matrix.fn = fn
+        confusion_matrix.n = tp + tn + fp + fn
+        return confusion_matrix
+
+
+def calculate_confusion_matrix_metric(metric: 'IConfusionMatrixMetric', tp, tn, fp, fn) -> np.ndarray:
+    """Calculates a confusion matrix metric for arrays of counts at once.
+
+    The metric's own definition is evaluated on the whole count arrays. Metrics, which branch on scalar values
+    (e.g. :class:`Precision`), are evaluated element-wise instead. Divisions by zero result in NaN or inf.
+
+    Args:
+        metric (IConfusionMatrixMetric): The metric.
+        tp: The true positives (scalar or NumPy array).
+        tn: The true negatives (scalar or NumPy array).
+        fp: The false positives (scalar or NumPy array).
+        fn: The false negatives (scalar or NumPy array).
+
+    Returns:
+        np.ndarray: The metric values with the (broadcast) shape of the counts.
+    """
+
+    # use floats to avoid integer overflows (e.g. n * n in the rand index) for large counts
+    tp, tn, fp, fn = np.broadcast_arrays(*(np.asarray(count, dtype=np.float64) for count in (tp, tn, fp, fn)))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        metric.confusion_matrix = ConfusionMatrix.from_counts(tp, tn, fp, fn)
+        try:
+            values = np.asarray(metric.calculate(), dtype=np.float64)
+            if values.shape == tp.shape:
+                return values
+        except (TypeError, ValueError):
+            pass  # the metric does not support arrays
+
+        def calculate(*counts):
+            metric.confusion_matrix = ConfusionMatrix.from_counts(*counts)
+            return metric.calculate()
+
+        return np.vectorize(calculate, otypes=[np.float64])(tp, tn, fp, fn)
+
 
 class IMetric(metaclass=ABCMeta):
     """Represents an evaluation metric."""
 
+    primitives = ()  # the primitives required by the metric (see PRIMITIVES)
+
     def __init__(self):
         self.metric = "IMetric"
 
@@ -117,6 +207,14 @@ class IMetric(metaclass=ABCMeta):
 
         raise NotImplementedError
 
+    def set_primitives(self, primitives: dict):
+        """Sets the primitives required to calculate the metric.
+
+        Args:
+            primitives (dict): The computed primitives by name (contains at least the required primitives).
+        """
+        pass
+
     def __str__(self):
         """Gets a printable string representation.
 
@@ -130,6 +228,8 @@ class IMetric(metaclass=ABCMeta):
 class IConfusionMatrixMetric(IMetric):
     """Represents an evaluation metric based on the confusion matrix."""
 
+    primitives = (CONFUSION_MATRIX, )
+
     def __init__(self):
         """Initializes a new instance of the IConfusionMatrixMetric class."""
         super().__init__()
@@ -142,10 +242,20 @@ class IConfusionMatrixMetric(IMetric):
 
         raise NotImplementedError
 
+    def set_primitives(self, primitives: dict):
+        """Sets the confusion matrix.
+
+        Args:
+            primitives (dict): The computed primitives by name.
+        """
+        self.confusion_matrix = primitives[CONFUSION_MATRIX]
+
 
 class ISimpleITKImageMetric(IMetric):
     """Represents an evaluation metric based on SimpleITK images."""
 
+    primitives = (IMAGES, )
+
     def __init__(self):
         """Initializes a new instance of the ISimpleITKImageMetric class."""
         super(ISimpleITKImageMetric, self).__init__()
@@ -159,10 +269,20 @@ class ISimpleITKImageMetric(IMetric):
 
         raise NotImplementedError
 
+    def set_primitives(self, primitives: dict):
+        """Sets the segmentation and ground truth images.
+
+        Args:
+            primitives (dict): The computed primitives by name.
+        """
+        self.segmentation, self.ground_truth = primitives[IMAGES]
+
 
 class INumpyArrayMetric(IMetric):
     """Represents an evaluation metric based on numpy arrays."""
 
+    primitives = (MASKS, )
+
     def __init__(self):
         """Initializes a new instance of the INumpyArrayMetric class."""
         super(INumpyArrayMetric, self).__init__()
@@ -176,6 +296,14 @@ class INumpyArrayMetric(IMetric):
 
         raise NotImplementedError
 
+    def set_primitives(self, primitives: dict):
+        """Sets the segmentation and ground truth arrays.
+
+        Args:
+            primitives (dict): The computed primitives by name.
+        """
+        self.segmentation, self.ground_truth = primitives[MASKS]
+
 
 class Accuracy(IConfusionMatrixMetric):
     """Represents an accuracy metric."""
@@ -512,33 +640,45 @@ class LabelVolume(ISimpleITKImageMetric):
 
 
 class MahalanobisDistance(INumpyArrayMetric):
-    """Represents a Mahalanobis distance metric."""
+    """Represents a Mahalanobis distance metric.
+
+    The distance is calculated from the moments of the label masks. These are either calculated from the
+    `ground_truth` and `segmentation` arrays or provided by the evaluator as primitive.
+    """
+
+    primitives = (MOMENTS, )
 
     def __init__(self):
         """Initializes a new instance of the MahalanobisDistance class."""
         super().__init__()
         self.metric = "MAHLNBS"
+        self.moments = None  # the moments of the segmentation and the ground truth
+
+    def set_primitives(self, primitives: dict):
+        """Sets the moments of the segmentation and the ground truth.
+
+        Args:
+            primitives (dict): The computed primitives by name.
+        """
+        self.segmentation = self.ground_truth = None
+        self.moments = primitives[MOMENTS]
 
     def calculate(self):
         """Calculates the Mahalanobis distance."""
 
-        gt_n = np.count_nonzero(self.ground_truth)
-        gt_indices = np.flip(np.where(self.ground_truth == 1), axis=0)
-        gt_mean = gt_indices.mean(axis=1)
-        gt_cov = np.cov(gt_indices)
-
-        seg_n = np.count_nonzero(self.segmentation)
-        seg_indices = np.flip(np.where(self.segmentation == 1), axis=0)
-        seg_mean = seg_indices.mean(axis=1)
-        seg_cov = np.cov(seg_indices)
+        if self.ground_truth is not None:
+            seg_n, seg_mean, seg_cov = calculate_moments(self.segmentation == 1)
+            gt_n, gt_mean, gt_cov = calculate_moments(self.ground_truth == 1)
+        else:
+            (seg_n, seg_mean, seg_cov), (gt_n, gt_mean, gt_cov) = self.moments
 
         # calculate common covariance matrix
         common_cov = (gt_n * gt_cov + seg_n * seg_cov) / (gt_n + seg_n)
         common_cov_inv = np.linalg.inv(common_cov)
 
-        mean = np.matrix(np.array(gt_mean) - np.array(seg_mean))
+        mean = np.array(gt_mean) - np.array(seg_mean)
 
-        return math.sqrt(mean * np.matrix(common_cov_inv) * mean.T)
+        return math.sqrt(mean @ common_cov_inv @ mean)
 
 
 class MutualInformation(IConfusionMatrixMetric):
@@ -0,0 +1,257 @@
+"""The preview module enables a fast, approximate evaluation with error bounds.
+
+The :class:`PreviewEvaluator` estimates metrics on a subset of the voxels and reports each estimate with a lower and
+upper bound. The ``sampling_rate`` trades accuracy for latency:
+
+- Confusion matrix metrics (e.g. :class:`metric.DiceCoefficient`) and the volume metrics
+  (:class:`metric.LabelVolume`, :class:`metric.PredictionVolume`) are estimated from randomly or strided sampled
+  voxels. The confusion counts are scaled to the total number of voxels and the confidence bounds are obtained by a
+  multinomial (parametric) bootstrap of the sampled counts.
+- Distance metrics (:class:`metric.HausdorffDistance`, :class:`metric.AverageDistance`) are calculated on a grid
+  downsampled by max pooling, i.e. a coarse voxel belongs to the label if any of its voxels does. The Hausdorff
+  distance differs at most by the diagonal of a coarse voxel from the exact one, which is reported as bounds
+  (the same bounds are reported for the average distance, for which they are approximate).
+
+Example usage:
+
+>>> evaluator = PreviewEvaluator(ConsoleEvaluatorWriter(3), sampling_rate=0.01)
+>>> evaluator.add_label(1, "Tumor")
+>>> evaluator.add_metric(DiceCoefficient())
+>>> evaluator.add_metric(HausdorffDistance())
+>>> evaluator.evaluate(prediction, ground_truth, "Patient1")
+The console output would be:
+          ID       LABEL        DICE  DICE_LOWER  DICE_UPPER     HDRFDST HDRFDST_LOWER HDRFDST_UPPER
+    Patient1       Tumor       0.853       0.841       0.864       7.810         4.346        11.274
+"""
+import math
+from typing import Union
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.evaluation.evaluator as eval_
+import miapy.evaluation.metric as mtrc
+
+
+class PreviewEvaluator(eval_.Evaluator):
+    """Represents a fast, approximate metric evaluator."""
+
+    STRATEGIES = ('random', 'stride')
+
+    def __init__(self, writer: eval_.IEvaluatorWriter=None, sampling_rate: float=0.01, strategy: str='random',
+                 confidence: float=0.95, number_of_resamples: int=1000, seed: int=None):
+        """Initializes a new instance of the PreviewEvaluator class.
+
+        Args:
+            writer (IEvaluatorWriter): One evaluator writer.
+            sampling_rate (float): The fraction of voxels to evaluate in (0, 1]. The distance metrics are evaluated on
+                a grid downsampled by the factor ``round(sampling_rate ** (-1 / dimensions))`` per axis.
+            strategy (str): The voxel sampling strategy, either 'random' (uniform with replacement) or 'stride'
+                (every n-th voxel along each axis).
+            confidence (float): The confidence level of the bounds of the sampled metrics.
+            number_of_resamples (int): The number of bootstrap resamples used to estimate the bounds.
+            seed (int): The seed of the random number generator.
+        """
+        super().__init__(writer)
+
+        if not 0 < sampling_rate <= 1:
+            raise ValueError('sampling_rate must be in (0, 1]')
+        if strategy not in PreviewEvaluator.STRATEGIES:
+            raise ValueError('strategy must be one of {}'.format(PreviewEvaluator.STRATEGIES))
+
+        self.sampling_rate = sampling_rate
+        self.strategy = strategy
+        self.confidence = confidence
+        self.number_of_resamples = number_of_resamples
+        self.random_state = np.random.RandomState(seed)
+
+    def add_metric(self, metric: mtrc.IMetric):
+        """Adds a metric to the evaluation.
+
+        Args:
+            metric (IMetric): The metric, which needs to be a confusion matrix metric, a volume metric, or a
+                distance metric.
+
+        Raises:
+            ValueError: If the metric can not be estimated.
+        """
+        if not isinstance(metric, (mtrc.IConfusionMatrixMetric, mtrc.LabelVolume, mtrc.PredictionVolume,
+                                   mtrc.HausdorffDistance, mtrc.AverageDistance)):
+            raise ValueError('metric {} can not be estimated'.format(metric))
+
+        super().add_metric(metric)
+
+    def evaluate(self, image: Union[sitk.Image, np.ndarray], ground_truth: Union[sitk.Image, np.ndarray],
+                 evaluation_id: str) -> list:
+        """Estimates the metrics on the provided image and ground truth image.
+
+        Args:
+            image (Union[sitk.Image, np.ndarray]): The segmented image.
+            ground_truth (Union[sitk.Image, np.ndarray]): The ground truth image.
+            evaluation_id (str): The identification of the evaluation.
+
+        Returns:
+            list: The results, i.e. a list per label containing the id, the label, and value, lower bound, and upper
+                bound of each metric.
+        """
+
+        if not self.is_header_written:
+            self.write_header()
+
+        if isinstance(image, sitk.Image):
+            spacing = np.array(image.GetSpacing())
+            image_array = sitk.GetArrayViewFromImage(image)
+        else:
+            spacing = np.ones(image.ndim)
+            image_array = image
+        ground_truth_array = sitk.GetArrayViewFromImage(ground_truth) if isinstance(ground_truth, sitk.Image) \
+            else ground_truth
+
+        indices = self._get_sample_indices(image_array)
+        image_samples, ground_truth_samples = self._sample(image_array, indices), \
+            self._sample(ground_truth_array, indices)
+        scale = image_array.size / image_samples.size
+
+        results = []
+        for label, label_str in self.labels.items():
+            label_results = [evaluation_id, label_str]
+
+            predictions = np.isin(image_samples, label)
+            labels = np.isin(ground_truth_samples, label)
+            counts = np.array([np.count_nonzero(predictions & labels),  # tp
+                               np.count_nonzero(~(predictions | labels)),  # tn
+                               np.count_nonzero(predictions & ~labels),  # fp
+                               np.count_nonzero(~predictions & labels)])  # fn
+            if self.sampling_rate == 1:
+                resampled_counts = counts[np.newaxis]  # all voxels are evaluated, i.e. no sampling error
+            else:
+                resampled_counts = self.random_state.multinomial(image_samples.size, counts / image_samples.size,
+                                                                 self.number_of_resamples)
+
+            distances = None
+            for metric in self.metrics:
+                if isinstance(metric, (mtrc.HausdorffDistance, mtrc.AverageDistance)):
+                    if distances is None:
+                        distances = self._calculate_distances(image, ground_truth, image_array, ground_truth_array,
+                                                              label)
+                    value, bound = distances[isinstance(metric, mtrc.AverageDistance)]
+                    label_results += [value, max(value - bound, 0), value + bound]
+                else:
+                    label_results += self._estimate(metric, counts * scale, resampled_counts * scale,
+                                                    np.prod(spacing))
+
+            results.append(label_results)
+
+        self._store(results, [name for metric in self.metrics
+                              for name in (str(metric), str(metric) + '_LOWER', str(metric) + '_UPPER')])
+
+        for writer in self.writers:
+            writer.write(results)
+
+        return results
+
+    def write_header(self):
+        """Writes the header."""
+
+        header = ["ID", "LABEL"]
+
+        for metric in self.metrics:
+            header += [str(metric), str(metric) + '_LOWER', str(metric) + '_UPPER']
+
+        for writer in self.writers:
+            writer.write_header(header)
+
+        self.is_header_written = True
+
+    def get_downsampling_factor(self, dimensions: int) -> int:
+        """Gets the downsampling factor per axis used for the distance metrics and the stride strategy.
+
+        Args:
+            dimensions (int): The number of image dimensions.
+
+        Returns:
+            int: The downsampling factor.
+        """
+        return max(1, int(round(self.sampling_rate ** (-1 / dimensions))))
+
+    def _get_sample_indices(self, array: np.ndarray):
+        """Gets the flat indices of the randomly sampled voxels or None for the stride strategy."""
+
+        if self.strategy == 'stride' or self.sampling_rate == 1:
+            return None
+
+        number_of_samples = max(1, int(round(self.sampling_rate * array.size)))
+        return self.random_state.randint(0, array.size, number_of_samples)
+
+    def _sample(self, array: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        """Samples the voxels of an array at the flat indices or according to the stride."""
+
+        if indices is None:
+            factor = self.get_downsampling_factor(array.ndim)
+            return array[(slice(None, None, factor), ) * array.ndim].ravel()
+
+        return array.ravel()[indices]
+
+    def _estimate(self, metric: mtrc.IMetric, counts: np.ndarray, resampled_counts: np.ndarray,
+                  voxel_volume: float) -> list:
+        """Estimates a metric and its bounds from the (scaled) sampled and resampled confusion counts."""
+
+        if isinstance(metric, mtrc.LabelVolume):
+            value, samples = (counts[0] + counts[3]) * voxel_volume, \
+                             (resampled_counts[:, 0] + resampled_counts[:, 3]) * voxel_volume
+        elif isinstance(metric, mtrc.PredictionVolume):
+            value, samples = (counts[0] + counts[2]) * voxel_volume, \
+                             (resampled_counts[:, 0] + resampled_counts[:, 2]) * voxel_volume
+        else:
+            value = float(mtrc.calculate_confusion_matrix_metric(metric, *counts))
+            samples = mtrc.calculate_confusion_matrix_metric(metric, *resampled_counts.T)
+
+        alpha = (1 - self.confidence) / 2
+        if np.all(np.isnan(samples)):
+            return [value, math.nan, math.nan]
+        lower, upper = np.nanpercentile(samples, [100 * alpha, 100 * (1 - alpha)])
+        return [value, lower, upper]
+
+    def _calculate_distances(self, image, ground_truth, image_array: np.ndarray, ground_truth_array: np.ndarray,
+                             label) -> tuple:
+        """Calculates the Hausdorff and average distance on the downsampled grid.
+
+        Returns:
+            tuple: The (value, bound) of the Hausdorff distance and the average distance.
+        """
+
+        factor = self.get_downsampling_factor(image_array.ndim)
+        reference = image if isinstance(image, sitk.Image) else \
+            ground_truth if isinstance(ground_truth, sitk.Image) else sitk.GetImageFromArray(image_array)
+
+        predictions_as_image = _downsample_label(image_array, label, factor, reference)
+        labels_as_image = _downsample_label(ground_truth_array, label, factor, reference)
+
+        distance_filter = sitk.HausdorffDistanceImageFilter()
+        distance_filter.Execute(labels_as_image, predictions_as_image)
+
+        # each voxel is at most half the diagonal of a coarse voxel (spanning factor voxel centers) away from its
+        # coarse voxel center, which applies to both the prediction and the ground truth
+        bound = float(np.linalg.norm((factor - 1) * np.array(reference.GetSpacing())))
+        return (distance_filter.GetHausdorffDistance(), bound), (distance_filter.GetAverageHausdorffDistance(), bound)
+
+
+def _downsample_label(array: np.ndarray, label, factor: int, reference: sitk.Image) -> sitk.Image:
+    """Downsamples a label by max pooling and returns it as an image with the adapted geometry of the reference."""
+
+    mask = np.isin(array, label)
+
+    if factor > 1:
+        padding = [(0, -size % factor) for size in mask.shape]
+        mask = np.pad(mask, padding, mode='constant')
+        blocks = [(size // factor, factor) for size in mask.shape]
+        mask = mask.reshape([length for block in blocks for length in block]) \
+            .any(axis=tuple(range(1, 2 * mask.ndim, 2)))
+
+    image = sitk.GetImageFromArray(mask.astype(np.uint8))
+    spacing = np.array(reference.GetSpacing())
+    direction = np.array(reference.GetDirection()).reshape(reference.GetDimension(), reference.GetDimension())
+    image.SetSpacing(tuple(spacing * factor))
+    image.SetOrigin(tuple(np.array(reference.GetOrigin()) + direction @ ((factor - 1) / 2 * spacing)))
+    image.SetDirection(reference.GetDirection())
+    return image
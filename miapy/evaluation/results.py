@@ -0,0 +1,312 @@
+"""The results module holds the evaluation results in memory.
+
+The :class:`EvaluationResults` is a columnar table with one row per subject, label, and metric. The subjects, labels,
+and metrics are stored as integer codes into their categories and the values as float64 array, such that filtering,
+group-by aggregation, and export operate vectorized on millions of rows. The :class:`evaluator.Evaluator`
+accumulates its results in such a table (see ``Evaluator.results``).
+
+Example usage:
+
+>>> evaluator.evaluate(prediction, ground_truth, "Patient1")
+>>> evaluator.evaluate(prediction2, ground_truth2, "Patient2")
+>>> dice = evaluator.results.filter(metric="DICE")
+>>> summary = dice.aggregate(by=("label", ), functions=("mean", "std"))
+>>> summary["label"], summary["mean"]
+>>> subjects, labels, values = evaluator.results.pivot("DICE")  # values.shape=(subjects, labels)
+"""
+import numpy as np
+
+
+class EvaluationResults:
+    """Represents a columnar in-memory table of evaluation results."""
+
+    COLUMNS = ('subject', 'label', 'metric')
+    FUNCTIONS = ('count', 'sum', 'mean', 'std', 'min', 'max', 'median')
+
+    def __init__(self, capacity: int=1024):
+        """Initializes a new instance of the EvaluationResults class.
+
+        Args:
+            capacity (int): The initial number of rows to allocate (grows as needed).
+        """
+        self.categories = {column: [] for column in EvaluationResults.COLUMNS}  # list of values by column
+        self._category_codes = {column: {} for column in EvaluationResults.COLUMNS}  # value: code by column
+        self._codes = {column: np.empty(capacity, dtype=np.int32) for column in EvaluationResults.COLUMNS}
+        self._values = np.empty(capacity, dtype=np.float64)
+        self._size = 0
+
+    def __len__(self):
+        """Gets the number of rows.
+
+        Returns:
+            int: The number of rows.
+        """
+        return self._size
+
+    @property
+    def values(self) -> np.ndarray:
+        """np.ndarray: The values of all rows (read-only view)."""
+        values = self._values[:self._size]
+        values.flags.writeable = False
+        return values
+
+    def get_codes(self, column: str) -> np.ndarray:
+        """Gets the codes of a column, i.e. the indices into ``categories[column]``.
+
+        Args:
+            column (str): The column, i.e. 'subject', 'label', or 'metric'.
+
+        Returns:
+            np.ndarray: The codes of all rows (read-only view).
+        """
+        codes = self._codes[column][:self._size]
+        codes.flags.writeable = False
+        return codes
+
+    def get_column(self, column: str) -> np.ndarray:
+        """Gets the (decoded) entries of a column.
+
+        Args:
+            column (str): The column, i.e. 'subject', 'label', 'metric', or 'value'.
+
+        Returns:
+            np.ndarray: The entries of all rows.
+        """
+        if column == 'value':
+            return self.values
+        return np.array(self.categories[column], dtype=str)[self.get_codes(column)]
+
+    def append(self, subject: str, label: str, metric: str, value: float):
+        """Appends a row.
+
+        Args:
+            subject (str): The subject (evaluation identification).
+            label (str): The label description.
+            metric (str): The metric name.
+            value (float): The metric value.
+        """
+        self.extend([subject], [label], [metric], [value])
+
+    def extend(self, subjects: list, labels: list, metrics: list, values: list):
+        """Appends multiple rows.
+
+        Args:
+            subjects (list): The subjects.
+            labels (list): The label descriptions.
+            metrics (list): The metric names.
+            values (list): The metric values (non-numeric values are stored as NaN).
+        """
+        number_of_rows = len(values)
+        self._reserve(self._size + number_of_rows)
+
+        stop = self._size + number_of_rows
+        for column, entries in zip(EvaluationResults.COLUMNS, (subjects, labels, metrics)):
+            self._codes[column][self._size:stop] = [self._encode(column, entry) for entry in entries]
+        try:
+            self._values[self._size:stop] = values
+        except (TypeError, ValueError):
+            self._values[self._size:stop] = [_to_float(value) for value in values]
+        self._size = stop
+
+    def filter(self, subject=None, label=None, metric=None, mask: np.ndarray=None) -> 'EvaluationResults':
+        """Filters the rows.
+
+        Args:
+            subject: A subject or a list of subjects to keep (None keeps all).
+            label: A label or a list of labels to keep (None keeps all).
+            metric: A metric or a list of metrics to keep (None keeps all).
+            mask (np.ndarray): A boolean mask of the rows to keep (None keeps all).
+
+        Returns:
+            EvaluationResults: The filtered results (sharing the categories).
+        """
+        keep = np.ones(self._size, dtype=bool) if mask is None else np.array(mask, dtype=bool)
+
+        for column, entries in zip(EvaluationResults.COLUMNS, (subject, label, metric)):
+            if entries is None:
+                continue
+            if isinstance(entries, str) or not hasattr(entries, '__iter__'):
+                entries = [entries]
+            codes = [self._category_codes[column][entry] for entry in entries if entry in self._category_codes[column]]
+            keep &= np.isin(self.get_codes(column), codes)
+
+        return self._select(keep)
+
+    def aggregate(self, by: tuple=('label', 'metric'), functions: tuple=('mean', 'std')) -> np.ndarray:
+        """Aggregates the values grouped by one or multiple columns. NaN values are ignored.
+
+        Args:
+            by (tuple): The columns to group by.
+            functions (tuple): The aggregation functions, see :attr:`FUNCTIONS`.
+
+        Returns:
+            np.ndarray: A structured array with a row per group and a field per group column and function.
+        """
+
+        for function in functions:
+            if function not in EvaluationResults.FUNCTIONS:
+                raise ValueError('unknown aggregation function {}'.format(function))
+
+        # combine the codes of the group columns into a single key
+        key = np.zeros(self._size, dtype=np.int64)
+        for column in by:
+            key = key * len(self.categories[column]) + self.get_codes(column)
+        group_keys, groups = np.unique(key, return_inverse=True)
+        groups = groups.ravel()
+        number_of_groups = len(group_keys)
+
+        values = self.values
+        is_valid = ~np.isnan(values)
+        groups, values = groups[is_valid], values[is_valid]
+
+        count = np.bincount(groups, minlength=number_of_groups)
+        total = np.bincount(groups, values, minlength=number_of_groups)
+        # sort by group and value for the order statistics
+        order = np.lexsort((values, groups))
+        first = np.searchsorted(groups[order], np.arange(number_of_groups))
+        has_values = count > 0
+
+        dtype = [(column, 'U{}'.format(max([len(str(c)) for c in self.categories[column]] + [1]))) for column in by]
+        dtype += [(function, np.int64 if function == 'count' else np.float64) for function in functions]
+        result = np.zeros(number_of_groups, dtype=dtype)
+
+        # decode the group keys
+        remainder = group_keys
+        for column in reversed(by):
+            length = len(self.categories[column])
+            result[column] = np.array(self.categories[column], dtype=str)[remainder % length]
+            remainder = remainder // length
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = total / count
+            for function in functions:
+                if function == 'count':
+                    result[function] = count
+                elif function == 'sum':
+                    result[function] = total
+                elif function == 'mean':
+                    result[function] = mean
+                elif function == 'std':
+                    squared = np.bincount(groups, (values - mean[groups]) ** 2, minlength=number_of_groups)
+                    result[function] = np.sqrt(squared / count)
+                else:
+                    if function == 'min':
+                        positions = first
+                    elif function == 'max':
+                        positions = first + count - 1
+                    else:
+                        positions = first + (count - 1) // 2
+                    statistic = np.full(number_of_groups, np.nan)
+                    statistic[has_values] = values[order][positions[has_values]]
+                    if function == 'median':
+                        upper = values[order][(first + count // 2)[has_values]]
+                        statistic[has_values] = (statistic[has_values] + upper) / 2
+                    result[function] = statistic
+
+        return result
+
+    def pivot(self, metric: str) -> (list, list, np.ndarray):
+        """Gets the values of a metric as matrix of subjects and labels.
+
+        The matrix can be used for further analyses, e.g. with the :mod:`evaluation.statistics` module.
+
+        Args:
+            metric (str): The metric.
+
+        Returns:
+            (list, list, np.ndarray): The subjects, the labels, and the values of shape=(subjects, labels)
+                (NaN if missing).
+        """
+        results = self.filter(metric=metric)
+
+        subject_codes, subject_rows = np.unique(results.get_codes('subject'), return_inverse=True)
+        label_codes, label_columns = np.unique(results.get_codes('label'), return_inverse=True)
+
+        matrix = np.full((len(subject_codes), len(label_codes)), np.nan)
+        matrix[subject_rows.ravel(), label_columns.ravel()] = results.values
+
+        return [self.categories['subject'][code] for code in subject_codes], \
+               [self.categories['label'][code] for code in label_codes], matrix
+
+    def to_array(self) -> np.ndarray:
+        """Exports the results as structured array.
+
+        Returns:
+            np.ndarray: The results with the fields subject, label, metric, and value.
+        """
+        columns = [self.get_column(column) for column in EvaluationResults.COLUMNS]
+        dtype = [(column, entries.dtype if entries.size else 'U1')
+                 for column, entries in zip(EvaluationResults.COLUMNS, columns)]
+        result = np.empty(self._size, dtype=dtype + [('value', np.float64)])
+        for column, entries in zip(EvaluationResults.COLUMNS, columns):
+            result[column] = entries
+        result['value'] = self.values
+        return result
+
+    def to_dict(self) -> dict:
+        """Exports the results as dictionary of arrays.
+
+        Returns:
+            dict: The columns subject, label, metric, and value.
+        """
+        return {column: self.get_column(column) for column in EvaluationResults.COLUMNS + ('value', )}
+
+    def clear(self):
+        """Removes all rows (the categories are kept)."""
+        self._size = 0
+
+    def _encode(self, column: str, entry) -> int:
+        """Gets the code of an entry and adds it to the categories if necessary."""
+
+        codes = self._category_codes[column]
+        code = codes.get(entry)
+        if code is None:
+            code = codes[entry] = len(self.categories[column])
+            self.categories[column].append(entry)
+        return code
+
+    def _reserve(self, size: int):
+        """Grows the arrays to hold at least `size` rows."""
+
+        capacity = len(self._values)
+        if size <= capacity:
+            return
+
+        capacity = max(size, 2 * capacity)
+        for column in EvaluationResults.COLUMNS:
+            self._codes[column] = np.resize(self._codes[column], capacity)
+        self._values = np.resize(self._values, capacity)
+
+    def _select(self, keep: np.ndarray) -> 'EvaluationResults':
+        """Creates new results of the selected rows sharing the categories."""
+
+        result = EvaluationResults(capacity=0)
+        result.categories = self.categories
+        result._category_codes = self._category_codes
+        result._codes = {column: self.get_codes(column)[keep].copy() for column in EvaluationResults.COLUMNS}
+        result._values = self.values[keep].copy()
+        result._size = len(result._values)
+        return result
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'EvaluationResults:\n' \
+               ' rows:     {size}\n' \
+               ' subjects: {subjects}\n' \
+               ' labels:   {labels}\n' \
+               ' metrics:  {metrics}\n' \
+            .format(size=self._size, subjects=len(self.categories['subject']),
+                    labels=len(self.categories['label']), metrics=len(self.categories['metric']))
+
+
+def _to_float(value) -> float:
+    """Converts a value to float or NaN if it is non-numeric."""
+
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
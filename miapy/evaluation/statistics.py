@@ -0,0 +1,163 @@
+"""The statistics module enables the estimation of confidence intervals on evaluation results.
+
+Confidence intervals are estimated by bootstrapping over subjects, i.e. the subjects are resampled with replacement.
+All resamples are drawn as an index matrix and evaluated at once with vectorized NumPy operations. The results of
+the :class:`evaluator.Evaluator` can be used either as per-subject metric values (e.g. the Dice coefficient per
+subject and label) or as per-subject confusion counts (e.g. by adding the :class:`metric.TruePositive`,
+:class:`metric.TrueNegative`, :class:`metric.FalsePositive`, and :class:`metric.FalseNegative` metrics).
+
+Example usage:
+
+>>> dice = np.array([[0.91, 0.72], [0.88, 0.65], [0.93, 0.80]])  # shape=(subjects, labels)
+>>> result = bootstrap_mean(dice, number_of_resamples=10000, seed=42)
+>>> result.estimate, result.lower, result.upper
+"""
+import numpy as np
+
+import miapy.evaluation.metric as mtrc
+
+
+class BootstrapResult:
+    """Represents the result of a bootstrap estimation."""
+
+    def __init__(self, estimate: np.ndarray, samples: np.ndarray, confidence: float):
+        """Initializes a new instance of the BootstrapResult class.
+
+        Args:
+            estimate (np.ndarray): The estimate on the original (not resampled) data, e.g. shape=(labels,).
+            samples (np.ndarray): The estimates of all resamples, e.g. shape=(resamples, labels).
+            confidence (float): The confidence level of the interval, e.g. 0.95.
+        """
+        self.estimate = estimate
+        self.samples = samples
+        self.confidence = confidence
+
+        alpha = (1 - confidence) / 2
+        self.lower, self.upper = np.nanpercentile(samples, [100 * alpha, 100 * (1 - alpha)], axis=0)
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'BootstrapResult:\n' \
+               ' estimate:   {self.estimate}\n' \
+               ' lower:      {self.lower}\n' \
+               ' upper:      {self.upper}\n' \
+               ' confidence: {self.confidence}\n' \
+               ' resamples:  {resamples}\n' \
+            .format(self=self, resamples=self.samples.shape[0])
+
+
+def bootstrap_indices(number_of_subjects: int, number_of_resamples: int, seed: int=None) -> np.ndarray:
+    """Draws bootstrap resamples as an index matrix.
+
+    Args:
+        number_of_subjects (int): The number of subjects (i.e. the size of each resample).
+        number_of_resamples (int): The number of resamples.
+        seed (int): The seed of the random number generator.
+
+    Returns:
+        np.ndarray: The subject indices of shape=(number_of_resamples, number_of_subjects).
+    """
+    random_state = np.random.RandomState(seed)
+    return random_state.randint(0, number_of_subjects, (number_of_resamples, number_of_subjects))
+
+
+def _get_resample_weights(indices: np.ndarray) -> np.ndarray:
+    """Converts an index matrix into a matrix counting how often a subject occurs in each resample."""
+
+    number_of_resamples, number_of_subjects = indices.shape
+    offsets = np.arange(number_of_resamples)[:, np.newaxis] * number_of_subjects
+    weights = np.bincount((indices + offsets).ravel(), minlength=number_of_resamples * number_of_subjects)
+    return weights.reshape(number_of_resamples, number_of_subjects).astype(np.float64)
+
+
+def _resample_sums(data: np.ndarray, number_of_resamples: int, seed: int, chunk_size: int) -> np.ndarray:
+    """Calculates the column sums of all resamples of the rows of `data`.
+
+    The resamples are processed in chunks such that the index matrix never exceeds `chunk_size` rows.
+    The sums of a chunk are obtained by a single matrix multiplication of the resample weights with the data.
+    """
+
+    random_state = np.random.RandomState(seed)
+    number_of_subjects = data.shape[0]
+    sums = np.empty((number_of_resamples, data.shape[1]), dtype=np.float64)
+
+    for start in range(0, number_of_resamples, chunk_size):
+        stop = min(start + chunk_size, number_of_resamples)
+        indices = random_state.randint(0, number_of_subjects, (stop - start, number_of_subjects))
+        sums[start:stop] = _get_resample_weights(indices) @ data
+
+    return sums
+
+
+def bootstrap_mean(values: np.ndarray, number_of_resamples: int=1000, confidence: float=0.95, seed: int=None,
+                   chunk_size: int=1000) -> BootstrapResult:
+    """Estimates the confidence interval of the mean of per-subject metric values.
+
+    NaN values (e.g. undefined metrics for empty labels) are ignored.
+
+    Args:
+        values (np.ndarray): The metric values of shape=(subjects,) or shape=(subjects, labels).
+        number_of_resamples (int): The number of bootstrap resamples.
+        confidence (float): The confidence level of the interval.
+        seed (int): The seed of the random number generator.
+        chunk_size (int): The number of resamples evaluated at once (limits the memory consumption).
+
+    Returns:
+        BootstrapResult: The estimated mean and its confidence interval.
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    data = values.reshape(values.shape[0], -1)
+
+    is_valid = ~np.isnan(data)
+    data = np.concatenate([np.where(is_valid, data, 0), is_valid], axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        estimate = data[:, :data.shape[1] // 2].sum(axis=0) / data[:, data.shape[1] // 2:].sum(axis=0)
+        sums = _resample_sums(data, number_of_resamples, seed, chunk_size)
+        samples = sums[:, :sums.shape[1] // 2] / sums[:, sums.shape[1] // 2:]
+
+    return BootstrapResult(estimate.reshape(values.shape[1:]),
+                           samples.reshape((number_of_resamples, ) + values.shape[1:]),
+                           confidence)
+
+
+def bootstrap_pooled(tp: np.ndarray, tn: np.ndarray, fp: np.ndarray, fn: np.ndarray,
+                     metric: mtrc.IConfusionMatrixMetric=None, number_of_resamples: int=1000,
+                     confidence: float=0.95, seed: int=None, chunk_size: int=1000) -> BootstrapResult:
+    """Estimates the confidence interval of a pooled confusion matrix metric.
+
+    The confusion counts of the subjects of each resample are summed up before the metric is calculated,
+    e.g. the pooled Dice coefficient is :math:`2 \\sum TP / (2 \\sum TP + \\sum FP + \\sum FN)`.
+
+    Args:
+        tp (np.ndarray): The true positives of shape=(subjects,) or shape=(subjects, labels).
+        tn (np.ndarray): The true negatives (same shape as `tp`).
+        fp (np.ndarray): The false positives (same shape as `tp`).
+        fn (np.ndarray): The false negatives (same shape as `tp`).
+        metric (IConfusionMatrixMetric): The metric to calculate on the pooled counts (default Dice coefficient).
+        number_of_resamples (int): The number of bootstrap resamples.
+        confidence (float): The confidence level of the interval.
+        seed (int): The seed of the random number generator.
+        chunk_size (int): The number of resamples evaluated at once (limits the memory consumption).
+
+    Returns:
+        BootstrapResult: The pooled metric and its confidence interval.
+    """
+
+    if metric is None:
+        metric = mtrc.DiceCoefficient()
+
+    counts = np.stack(np.broadcast_arrays(tp, tn, fp, fn)).astype(np.float64)  # shape=(4, subjects, ...)
+    shape = counts.shape[2:]
+    data = counts.reshape(4, counts.shape[1], -1).transpose(1, 0, 2).reshape(counts.shape[1], -1)
+
+    estimate = mtrc.calculate_confusion_matrix_metric(metric, *counts.sum(axis=1))
+    sums = _resample_sums(data, number_of_resamples, seed, chunk_size).reshape(number_of_resamples, 4, -1)
+    samples = mtrc.calculate_confusion_matrix_metric(metric, *sums.transpose(1, 0, 2))
+
+    return BootstrapResult(estimate, samples.reshape((number_of_resamples, ) + shape), confidence)
@@ -11,6 +11,24 @@ Filter pipeline (:mod:`filtering.filter`)
 .. automodule:: filtering.filter
     :members:
 
+Filter graph (:mod:`filtering.graph`)
+-------------------------------------
+
+.. automodule:: filtering.graph
+    :members:
+
+Filter cache (:mod:`filtering.cache`)
+-------------------------------------
+
+.. automodule:: filtering.cache
+    :members:
+
+Profiling (:mod:`filtering.profiling`)
+--------------------------------------
+
+.. automodule:: filtering.profiling
+    :members:
+
 Pre-processing (:mod:`filtering.preprocessing`)
 -----------------------------------------------
 
@@ -23,6 +41,12 @@ Post-processing (:mod:`filtering.postprocessing`)
 .. automodule:: filtering.postprocessing
     :members:
 
+Feature extraction (:mod:`filtering.feature`)
+---------------------------------------------
+
+.. automodule:: filtering.feature
+    :members:
+
 Registration (:mod:`filtering.registration`)
 --------------------------------------------
 
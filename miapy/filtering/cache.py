@@ -0,0 +1,309 @@
+"""The cache module stores the outputs of filter pipeline stages on disk to avoid their re-execution.
+
+A :class:`FilterCache` identifies the output of a pipeline stage by a key, which chains the content hash of the
+pipeline's input image with the configuration and the parameters of each filter up to that stage. A stage's output
+is therefore only reused if the input image and all filters and parameters up to the stage are unchanged. When only
+the last filter of a pipeline is modified, the pipeline continues from the cached output of the previous stage
+instead of re-executing, e.g., a bias field correction and a registration.
+
+The outputs are stored as MetaImage files in a cache directory, which can be shared by processes (e.g. the workers
+of :meth:`filter.FilterPipeline.execute_many`). The least recently used outputs are evicted when the size of the
+directory exceeds a limit.
+
+Example usage:
+
+>>> pipeline = FilterPipeline(cache=FilterCache('/path/to/cache'))
+>>> pipeline.add_filter(BiasFieldCorrector())
+>>> pipeline.add_filter(RigidMultiModalRegistration())
+>>> pipeline.add_filter(RescaleIntensity(0, 1), cache=False)  # cheap, not worth caching
+>>> pipeline.set_param(RigidMultiModalRegistrationParams(fixed_image), 1)
+>>> image = pipeline.execute(image)  # executes only the stages whose input or settings changed since the last run
+"""
+import hashlib
+import os
+import threading
+import types
+import uuid
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.image.cache as cache
+import miapy.image.image as img
+
+
+def get_image_digest(image: sitk.Image) -> str:
+    """Gets the content hash of an image, i.e. of its pixel data and physical properties.
+
+    Args:
+        image (sitk.Image): The image.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    hasher = hashlib.sha256()
+    _update_image(hasher, image)
+    return hasher.hexdigest()
+
+
+def get_digest(value) -> str:
+    """Gets the content hash of a value, e.g. of a filter or of filter parameters.
+
+    Images and arrays are hashed by their content, lists, tuples, and dictionaries by their items, classes and
+    functions by their qualified name, and other objects by their type and (picklable) state. Primitive values are
+    hashed by their representation. The digest is therefore the same in all processes.
+
+    Args:
+        value: The value.
+
+    Returns:
+        str: The hexadecimal digest.
+
+    Raises:
+        ValueError: If the value contains local or anonymous functions or objects whose state is not accessible
+            (e.g. SimpleITK filters), which cannot be identified across processes.
+    """
+    hasher = hashlib.sha256()
+    _update(hasher, value)
+    return hasher.hexdigest()
+
+
+class FilterCache:
+    """Represents a size-bounded on-disk cache of filter outputs."""
+
+    FILE_EXTENSION = '.mha'
+
+    def __init__(self, directory: str, max_bytes: int=10 * 2 ** 30, use_compression: bool=False):
+        """Initializes a new instance of the FilterCache class.
+
+        Args:
+            directory (str): The cache directory, which is created if it does not exist.
+            max_bytes (int): The maximum size of the cached outputs in bytes.
+            use_compression (bool): Whether to compress the cached outputs (smaller but slower).
+        """
+        if max_bytes < 0:
+            raise ValueError('max_bytes must not be negative')
+
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self.use_compression = use_compression
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_input_key(image: sitk.Image) -> str:
+        """Gets the key of a pipeline's input image.
+
+        Args:
+            image (sitk.Image): The image.
+
+        Returns:
+            str: The key.
+        """
+        return get_image_digest(image)
+
+    @staticmethod
+    def get_key(input_key: str, filter_, params=None) -> str:
+        """Gets the key of a filter's output.
+
+        Args:
+            input_key (str): The key of the filter's input, i.e. the output key of the previous stage or the digest
+                of the pipeline's input image (see :meth:`get_input_key`).
+            filter_ (IFilter): The filter.
+            params (IFilterParams): The filter parameters.
+
+        Returns:
+            str: The key.
+        """
+        hasher = hashlib.sha256()
+        hasher.update(input_key.encode())
+        hasher.update(str(filter_).encode())
+        _update(hasher, filter_)
+        _update(hasher, params)
+        return hasher.hexdigest()
+
+    def get(self, key: str):
+        """Gets a cached output.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            sitk.Image: The image or None if the key is not cached.
+        """
+        path = self._get_path(key)
+        try:
+            if not os.path.exists(path):
+                raise FileNotFoundError(path)
+            image = sitk.ReadImage(path)
+            os.utime(path)  # marks the output as recently used
+        except (RuntimeError, OSError):  # not cached or evicted meanwhile
+            with self._lock:
+                self._misses += 1
+            return None
+
+        with self._lock:
+            self._hits += 1
+        return image
+
+    def put(self, key: str, image: sitk.Image):
+        """Caches an output and evicts the least recently used outputs if the cache exceeds its size.
+
+        Args:
+            key (str): The key.
+            image (sitk.Image): The image.
+        """
+        if img.get_size_in_bytes(image) > self.max_bytes:
+            return
+
+        path = self._get_path(key)
+        temporary_path = os.path.join(self.directory, '.tmp-{}-{}'.format(uuid.uuid4().hex, os.path.basename(path)))
+        try:
+            sitk.WriteImage(image, temporary_path, self.use_compression)
+            os.replace(temporary_path, path)  # atomic, such that other processes never read partial files
+        except Exception:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+        self._evict()
+
+    def clear(self):
+        """Removes all cached outputs."""
+        for path, _, _ in self._get_entries():
+            _remove(path)
+
+    @property
+    def statistics(self) -> cache.CacheStatistics:
+        """CacheStatistics: The usage statistics of this instance and the current content of the cache directory."""
+        entries = self._get_entries()
+        with self._lock:
+            return cache.CacheStatistics(self._hits, self._misses, self._evictions, len(entries),
+                                         sum(size for _, size, _ in entries))
+
+    def reset_statistics(self):
+        """Resets the hit, miss, and eviction counts."""
+        with self._lock:
+            self._hits = self._misses = self._evictions = 0
+
+    def __contains__(self, key: str):
+        return os.path.exists(self._get_path(key))
+
+    def __getstate__(self):
+        # the lock cannot be pickled (e.g. to use the cache in worker processes)
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + FilterCache.FILE_EXTENSION)
+
+    def _get_entries(self) -> list:
+        """Gets the (path, size, modification time) of the cached outputs."""
+
+        entries = []
+        with os.scandir(self.directory) as iterator:
+            for entry in iterator:
+                if entry.name.startswith('.tmp-') or not entry.name.endswith(FilterCache.FILE_EXTENSION):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:  # removed by another process
+                    continue
+                entries.append((entry.path, stat.st_size, stat.st_mtime_ns))
+        return entries
+
+    def _evict(self):
+        """Removes the least recently used outputs until the cache does not exceed its size."""
+
+        entries = self._get_entries()
+        size_in_bytes = sum(size for _, size, _ in entries)
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if size_in_bytes <= self.max_bytes:
+                break
+            if _remove(path):
+                with self._lock:
+                    self._evictions += 1
+            size_in_bytes -= size
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'FilterCache:\n' \
+               ' directory:       {self.directory}\n' \
+               ' max_bytes:       {self.max_bytes}\n' \
+               ' use_compression: {self.use_compression}\n' \
+            .format(self=self)
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:  # removed by another process
+        return False
+
+
+def _update_image(hasher, image: sitk.Image):
+    hasher.update(repr((image.GetPixelIDValue(), image.GetNumberOfComponentsPerPixel(), image.GetSize(),
+                        image.GetOrigin(), image.GetSpacing(), image.GetDirection())).encode())
+    hasher.update(np.ascontiguousarray(sitk.GetArrayViewFromImage(image)).data)
+
+
+def _update(hasher, value):
+    """Updates a hash with a value (see :func:`get_digest`)."""
+
+    if isinstance(value, sitk.Image):
+        _update_image(hasher, value)
+    elif isinstance(value, np.ndarray):
+        hasher.update(repr((value.dtype.str, value.shape)).encode())
+        hasher.update(np.ascontiguousarray(value).data)
+    elif isinstance(value, (list, tuple)):
+        hasher.update('{}({})'.format(type(value).__name__, len(value)).encode())
+        for item in value:
+            _update(hasher, item)
+    elif isinstance(value, (set, frozenset)):
+        hasher.update('{}({})'.format(type(value).__name__, len(value)).encode())
+        for item in sorted(value, key=repr):
+            _update(hasher, item)
+    elif isinstance(value, dict):
+        hasher.update('dict({})'.format(len(value)).encode())
+        for item_key, item in sorted(value.items(), key=lambda item_: repr(item_[0])):
+            _update(hasher, item_key)
+            _update(hasher, item)
+    elif value is None or isinstance(value, (bool, int, float, complex, str, bytes, np.generic)):
+        hasher.update(repr(value).encode())
+    elif isinstance(value, (type, types.FunctionType, types.BuiltinFunctionType)):
+        # only classes and functions defined at module level are identified by their qualified name across processes
+        if '<' in value.__qualname__:
+            raise ValueError('cannot hash the local or anonymous {} {}'.format(type(value).__name__,
+                                                                                value.__qualname__))
+        hasher.update('{}({}.{})'.format(type(value).__name__, value.__module__, value.__qualname__).encode())
+    elif isinstance(value, types.MethodType):
+        hasher.update(b'method')
+        _update(hasher, value.__self__)
+        _update(hasher, value.__func__)
+    else:
+        cls = type(value)
+        hasher.update('{}.{}'.format(cls.__module__, cls.__qualname__).encode())
+        state = value.__getstate__() if hasattr(value, '__getstate__') else getattr(value, '__dict__', None)
+        if state is None:
+            if not hasattr(value, '__dict__'):  # e.g. extension objects, whose state is not accessible
+                raise ValueError('cannot hash the state of {}.{}'.format(cls.__module__, cls.__qualname__))
+            state = {}  # an empty instance dictionary
+        if isinstance(state, dict):
+            # the verbosity of a filter does not change its output
+            _update(hasher, {key: item for key, item in state.items() if key != 'verbose'})
+        else:
+            _update(hasher, state)
@@ -0,0 +1,365 @@
+"""The feature module enables the extraction of voxel-wise features for voxel classification.
+
+The :class:`VoxelFeatureExtractor` calculates a configurable set of features (e.g. the intensity, the mean of a
+neighborhood, the gradient magnitude, and the coordinates) of one or multiple modalities. The image is processed in
+slabs along the first array axis (z), where all features are calculated from the same slab (including a halo of
+neighboring voxels) and written straight into a preallocated float32 array of shape=(n, v), with n voxels and v
+features. The memory of the intermediate results is therefore bounded by the slab size. The feature array can be
+restricted to the voxels of a mask and (without mask) converted to a vector image by
+``NumpySimpleITKImageBridge.convert_to_vector_image``.
+
+Example usage:
+
+>>> extractor = VoxelFeatureExtractor([IntensityFeature(0), IntensityFeature(1), NeighborhoodMeanFeature(0, radius=2),
+>>>                                    GradientMagnitudeFeature(0), CoordinateFeature()])
+>>> features = extractor.execute([t1_image, t2_image])  # shape=(n, 7)
+>>> feature_image = NumpySimpleITKImageBridge.convert_to_vector_image(features, ImageProperties(t1_image))
+"""
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.image.image as img
+
+
+class IVoxelFeature(metaclass=ABCMeta):
+    """Represents a voxel feature calculated slab-wise."""
+
+    def __init__(self, halo: int=0):
+        """Initializes a new instance of the IVoxelFeature class.
+
+        Args:
+            halo (int): The number of neighboring voxels along each axis required to calculate the feature.
+        """
+        self.halo = halo
+
+    @property
+    @abstractmethod
+    def names(self) -> list:
+        """list: The names of the features (one per column)."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def calculate(self, slabs: list, start: int, properties: img.ImageProperties) -> list:
+        """Calculates the feature of a slab.
+
+        Args:
+            slabs (list): The float32 slab of each modality padded by the halo along each axis (replicating the
+                border voxels outside the image).
+            start (int): The index of the first slice (first array axis) of the slab.
+            properties (ImageProperties): The image properties.
+
+        Returns:
+            list: An array per feature column of the shape of the slab without halo.
+        """
+        raise NotImplementedError()
+
+
+class IntensityFeature(IVoxelFeature):
+    """Represents the intensity feature."""
+
+    def __init__(self, modality: int=0):
+        """Initializes a new instance of the IntensityFeature class.
+
+        Args:
+            modality (int): The index of the modality.
+        """
+        super().__init__()
+        self.modality = modality
+
+    @property
+    def names(self) -> list:
+        """list: The names of the features (one per column)."""
+        return ['INTENSITY_{}'.format(self.modality)]
+
+    def calculate(self, slabs: list, start: int, properties: img.ImageProperties) -> list:
+        """Calculates the intensity of a slab (see :meth:`IVoxelFeature.calculate`)."""
+        return [slabs[self.modality]]
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'IntensityFeature:\n' \
+               ' modality: {self.modality}\n' \
+            .format(self=self)
+
+
+class NeighborhoodMeanFeature(IVoxelFeature):
+    """Represents the mean intensity of a cubic neighborhood (replicating the border voxels outside the image)."""
+
+    def __init__(self, modality: int=0, radius: int=1):
+        """Initializes a new instance of the NeighborhoodMeanFeature class.
+
+        Args:
+            modality (int): The index of the modality.
+            radius (int): The radius of the neighborhood, i.e. the neighborhood has 2 * radius + 1 voxels per axis.
+        """
+        if radius < 1:
+            raise ValueError('radius must be at least 1')
+        super().__init__(radius)
+        self.modality = modality
+        self.radius = radius
+
+    @property
+    def names(self) -> list:
+        """list: The names of the features (one per column)."""
+        return ['MEAN_{}_R{}'.format(self.modality, self.radius)]
+
+    def calculate(self, slabs: list, start: int, properties: img.ImageProperties) -> list:
+        """Calculates the neighborhood mean of a slab (see :meth:`IVoxelFeature.calculate`)."""
+
+        # separable box filter by cumulative sums along each axis
+        values = slabs[self.modality].astype(np.float64)
+        width = 2 * self.radius + 1
+        for axis in range(values.ndim):
+            shape = list(values.shape)
+            shape[axis] = 1
+            cumulative = np.concatenate([np.zeros(shape), np.cumsum(values, axis=axis)], axis=axis)
+            upper, lower = [slice(None)] * values.ndim, [slice(None)] * values.ndim
+            upper[axis], lower[axis] = slice(width, None), slice(None, -width)
+            values = cumulative[tuple(upper)] - cumulative[tuple(lower)]
+        return [(values / width ** values.ndim).astype(np.float32)]
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'NeighborhoodMeanFeature:\n' \
+               ' modality: {self.modality}\n' \
+               ' radius:   {self.radius}\n' \
+            .format(self=self)
+
+
+class GradientMagnitudeFeature(IVoxelFeature):
+    """Represents the gradient magnitude by central differences considering the spacing."""
+
+    def __init__(self, modality: int=0):
+        """Initializes a new instance of the GradientMagnitudeFeature class.
+
+        Args:
+            modality (int): The index of the modality.
+        """
+        super().__init__(1)
+        self.modality = modality
+
+    @property
+    def names(self) -> list:
+        """list: The names of the features (one per column)."""
+        return ['GRADMAG_{}'.format(self.modality)]
+
+    def calculate(self, slabs: list, start: int, properties: img.ImageProperties) -> list:
+        """Calculates the gradient magnitude of a slab (see :meth:`IVoxelFeature.calculate`)."""
+
+        slab = slabs[self.modality]
+        interior = tuple(slice(1, -1) for _ in range(slab.ndim))
+        magnitude = np.zeros(tuple(length - 2 for length in slab.shape), dtype=np.float32)
+        for axis, spacing in enumerate(reversed(properties.spacing)):
+            forward, backward = list(interior), list(interior)
+            forward[axis], backward[axis] = slice(2, None), slice(None, -2)
+            difference = (slab[tuple(forward)] - slab[tuple(backward)]) / np.float32(2 * spacing)
+            magnitude += difference * difference
+        return [np.sqrt(magnitude, out=magnitude)]
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'GradientMagnitudeFeature:\n' \
+               ' modality: {self.modality}\n' \
+            .format(self=self)
+
+
+class CoordinateFeature(IVoxelFeature):
+    """Represents the coordinates of the voxels (one feature per dimension)."""
+
+    def __init__(self, physical: bool=True):
+        """Initializes a new instance of the CoordinateFeature class.
+
+        Args:
+            physical (bool): If True, the physical coordinates are calculated; otherwise, the voxel indices.
+        """
+        super().__init__()
+        self.physical = physical
+
+    @property
+    def names(self) -> list:
+        """list: The names of the features (one per column)."""
+        return ['COORD_X', 'COORD_Y', 'COORD_Z']
+
+    def calculate(self, slabs: list, start: int, properties: img.ImageProperties) -> list:
+        """Calculates the coordinates of a slab (see :meth:`IVoxelFeature.calculate`)."""
+
+        shape = slabs[0].shape
+        # voxel indices in image order (x, y, z)
+        indices = [np.arange(length, dtype=np.float64) for length in reversed(shape)]
+        indices[-1] += start
+        if not self.physical:
+            return [np.broadcast_to(_expand(index, axis, len(shape)), shape).astype(np.float32)
+                    for axis, index in enumerate(indices)]
+
+        dimensions = properties.dimensions
+        direction = np.array(properties.direction).reshape(dimensions, dimensions)
+        coordinates = []
+        for row in range(dimensions):
+            coordinate = np.full(shape, properties.origin[row], dtype=np.float64)
+            for axis, index in enumerate(indices):
+                coordinate += _expand(direction[row, axis] * properties.spacing[axis] * index, axis, dimensions)
+            coordinates.append(coordinate.astype(np.float32))
+        return coordinates
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'CoordinateFeature:\n' \
+               ' physical: {self.physical}\n' \
+            .format(self=self)
+
+
+class VoxelFeatureExtractor:
+    """Represents a slab-wise extractor of voxel features into a (n, v) array."""
+
+    def __init__(self, features: list=None, slab_size: int=16):
+        """Initializes a new instance of the VoxelFeatureExtractor class.
+
+        Args:
+            features (list): The features (IVoxelFeature).
+            slab_size (int): The number of slices (first array axis) processed at once.
+        """
+        if slab_size < 1:
+            raise ValueError('slab_size must be at least 1')
+
+        self.features = [] if features is None else list(features)
+        self.slab_size = slab_size
+
+    def add_feature(self, feature: IVoxelFeature):
+        """Adds a feature.
+
+        Args:
+            feature (IVoxelFeature): The feature.
+        """
+        self.features.append(feature)
+
+    def get_feature_names(self, dimensions: int=3) -> list:
+        """Gets the names of the feature columns.
+
+        Args:
+            dimensions (int): The number of image dimensions.
+
+        Returns:
+            list: The names.
+        """
+        return [name for feature in self.features for name in self._get_names(feature, dimensions)]
+
+    def execute(self, images: list, mask=None, properties: img.ImageProperties=None,
+                out: np.ndarray=None) -> np.ndarray:
+        """Extracts the features.
+
+        Args:
+            images (list): The images (sitk.Image) or arrays (of shape=(z, y, x)) of the modalities.
+            mask: A mask (sitk.Image or np.ndarray) of the voxels to extract or None for all voxels.
+            properties (ImageProperties): The image properties, which are required if `images` are arrays.
+            out (np.ndarray): A preallocated float32 array of shape=(n, v) or None.
+
+        Returns:
+            np.ndarray: The features of shape=(n, v) in the voxel order of the flattened arrays.
+        """
+        if not self.features:
+            raise ValueError('no features added')
+
+        arrays = []
+        for image in images:
+            if isinstance(image, sitk.Image):
+                array, image_properties = img.SimpleITKNumpyImageBridge.convert(image, view=True)
+                properties = image_properties if properties is None else properties
+            else:
+                array = np.asarray(image)
+            arrays.append(array)
+        if properties is None:
+            raise ValueError('properties are required for arrays')
+        if any(array.shape != tuple(reversed(properties.size)) for array in arrays):
+            raise ValueError('all images need to be scalar images of size {}'.format(properties.size))
+
+        if mask is not None:
+            mask = (img.SimpleITKNumpyImageBridge.convert(mask, view=True)[0] if isinstance(mask, sitk.Image)
+                    else np.asarray(mask)).astype(bool, copy=False)
+            number_of_voxels = int(np.count_nonzero(mask))
+        else:
+            number_of_voxels = int(np.prod(properties.size))
+
+        number_of_columns = len(self.get_feature_names(properties.dimensions))
+        if out is None:
+            out = np.empty((number_of_voxels, number_of_columns), dtype=np.float32)
+        elif out.shape != (number_of_voxels, number_of_columns):
+            raise ValueError('out needs to be of shape {}'.format((number_of_voxels, number_of_columns)))
+
+        halo = max(feature.halo for feature in self.features)
+        length = arrays[0].shape[0]
+        row = 0
+        for start in range(0, length, self.slab_size):
+            stop = min(start + self.slab_size, length)
+            slab_mask = None if mask is None else mask[start:stop]
+            number_of_rows = (stop - start) * int(np.prod(arrays[0].shape[1:])) if slab_mask is None else \
+                int(np.count_nonzero(slab_mask))
+            if number_of_rows == 0:
+                continue
+
+            padded_slabs = [_get_padded_slab(array, start, stop, halo) for array in arrays]
+            column = 0
+            for feature in self.features:
+                offset = halo - feature.halo
+                slabs = padded_slabs if offset == 0 else \
+                    [slab[(slice(offset, -offset), ) * slab.ndim] for slab in padded_slabs]
+                for values in feature.calculate(slabs, start, properties):
+                    out[row:row + number_of_rows, column] = values.ravel() if slab_mask is None else values[slab_mask]
+                    column += 1
+            row += number_of_rows
+
+        return out
+
+    @staticmethod
+    def _get_names(feature: IVoxelFeature, dimensions: int) -> list:
+        """Gets the names of a feature's columns."""
+
+        return feature.names[:dimensions] if isinstance(feature, CoordinateFeature) else feature.names
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'VoxelFeatureExtractor:\n' \
+               ' features:  {features}\n' \
+               ' slab_size: {self.slab_size}\n' \
+            .format(self=self, features=', '.join(self.get_feature_names()))
+
+
+def _get_padded_slab(array: np.ndarray, start: int, stop: int, halo: int) -> np.ndarray:
+    """Gets a float32 slab padded by the halo, with the neighboring slices inside and replicated voxels outside."""
+
+    padded_start, padded_stop = max(start - halo, 0), min(stop + halo, array.shape[0])
+    slab = array[padded_start:padded_stop].astype(np.float32)
+    if halo == 0:
+        return slab
+
+    padding = [(halo - (start - padded_start), halo - (padded_stop - stop))] + [(halo, halo)] * (array.ndim - 1)
+    return np.pad(slab, padding, mode='edge')
+
+
+def _expand(values: np.ndarray, axis: int, dimensions: int) -> np.ndarray:
+    """Expands the values along an axis in image order (x, y, z) to broadcast to an array of shape=(z, y, x)."""
+
+    shape = [1] * dimensions
+    shape[dimensions - 1 - axis] = len(values)
+    return values.reshape(shape)
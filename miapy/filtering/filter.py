@@ -1,7 +1,19 @@
 """We provide an easy way to set up a filtering pipeline. All modules in this package implement..."""
+import collections
+import concurrent.futures as futures
+import copy
+import itertools
+import os
+import time
+import typing
+
+import numpy as np
 import SimpleITK as sitk
 from abc import ABCMeta, abstractmethod
 
+import miapy.image.image as img
+import miapy.image.shared as shared
+
 
 class IFilterParams(metaclass=ABCMeta):
     """Represents a filter parameters interface.
@@ -28,23 +40,201 @@ class IFilter(metaclass=ABCMeta):
         raise NotImplementedError()
 
 
+class IntensityStatistics:
+    """Represents the intensity statistics of an image, which are accumulated over chunks of its pixels.
+    """
+
+    def __init__(self):
+        """Initializes a new instance of the IntensityStatistics class.
+        """
+        self.number_of_pixels = 0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.mean = 0.0
+        self._sum_of_squared_deviations = 0.0
+
+    def update(self, array: np.ndarray):
+        """Adds the pixels of a chunk.
+
+        :param array: The pixels.
+        """
+        if array.size == 0:
+            return
+
+        array = array.astype(np.float64, copy=False)
+        mean = array.mean()
+        sum_of_squared_deviations = np.square(array - mean).sum()
+
+        # combines the (mean, sum of squared deviations) of the chunks (Chan et al.), which is more accurate than
+        # accumulating the sums of squares
+        number_of_pixels = self.number_of_pixels + array.size
+        delta = mean - self.mean
+        self._sum_of_squared_deviations += sum_of_squared_deviations + \
+            delta ** 2 * self.number_of_pixels * array.size / number_of_pixels
+        self.mean += delta * array.size / number_of_pixels
+        self.number_of_pixels = number_of_pixels
+        self.minimum = min(self.minimum, float(array.min()))
+        self.maximum = max(self.maximum, float(array.max()))
+
+    @property
+    def standard_deviation(self) -> float:
+        """The (sample) standard deviation."""
+        if self.number_of_pixels < 2:
+            return 0.0
+        return float(np.sqrt(self._sum_of_squared_deviations / (self.number_of_pixels - 1)))
+
+    def __str__(self):
+        """Gets a nicely printable string representation.
+
+        :return: String representation.
+        """
+        return 'IntensityStatistics:\n' \
+               ' number_of_pixels:   {self.number_of_pixels}\n' \
+               ' minimum:            {self.minimum}\n' \
+               ' maximum:            {self.maximum}\n' \
+               ' mean:               {self.mean}\n' \
+               ' standard_deviation: {self.standard_deviation}\n' \
+            .format(self=self)
+
+
+class IPointwiseFilter(IFilter):
+    """Pointwise filter base class.
+
+    The output pixel of a pointwise filter only depends on the corresponding input pixel and, optionally, on the
+    intensity statistics of the whole input image (e.g. intensity rescaling, clipping, or normalization).
+    `FilterPipeline` executes runs of consecutive pointwise filters fused as one pass over chunks of the pixels
+    into a single output image instead of allocating an intermediate image per filter (unless it has hooks).
+    """
+
+    requires_statistics = False  # whether `execute_array` needs the `IntensityStatistics` of the input image
+
+    def get_output_data_type(self, dtype: np.dtype) -> typing.Optional[np.dtype]:
+        """Gets the data type of the pixels `execute_array` returns for pixels of a data type.
+
+        :param dtype: The numpy data type of the input pixels.
+        :return: The numpy data type of the filtered pixels or None if `execute_array` is not equivalent to `execute`
+            for the data type (e.g. for intensities exceeding the range of an integer type), in which case the filter
+            is not fused.
+        """
+        return np.dtype(dtype)
+
+    @abstractmethod
+    def execute_array(self, array: np.ndarray, statistics: IntensityStatistics=None,
+                      params: IFilterParams=None) -> np.ndarray:
+        """Executes the filter on a chunk of the pixels of an image (equivalent to `execute`).
+
+        :param array: The one-dimensional pixels, which must not be modified (might be a read-only view).
+        :param statistics: The intensity statistics of the whole input image if `requires_statistics`.
+        :param params: The filter parameters.
+        :return: The filtered pixels with the data type of the image `execute` returns.
+        """
+        raise NotImplementedError()
+
+
+class FilterRecord:
+    """Represents the measurements of a filter execution in a pipeline.
+    """
+
+    def __init__(self, filter_index: int, filter_name: str, wall_time: float, size_in_bytes: int, pixel_type: str,
+                 memory_delta: int=None):
+        """Initializes a new instance of the FilterRecord class.
+
+        :param filter_index: The filter's index in the pipeline.
+        :param filter_name: The filter's class name.
+        :param wall_time: The wall time of the execution in seconds.
+        :param size_in_bytes: The size of the filtered image in bytes.
+        :param pixel_type: The pixel type of the filtered image.
+        :param memory_delta: The change of the process' resident memory in bytes or None if not available.
+        """
+        self.filter_index = filter_index
+        self.filter_name = filter_name
+        self.wall_time = wall_time
+        self.size_in_bytes = size_in_bytes
+        self.pixel_type = pixel_type
+        self.memory_delta = memory_delta
+
+    def __str__(self):
+        """Gets a nicely printable string representation.
+
+        :return: String representation.
+        """
+        return 'FilterRecord:\n' \
+               ' filter_index:  {self.filter_index}\n' \
+               ' filter_name:   {self.filter_name}\n' \
+               ' wall_time:     {self.wall_time}\n' \
+               ' size_in_bytes: {self.size_in_bytes}\n' \
+               ' pixel_type:    {self.pixel_type}\n' \
+               ' memory_delta:  {self.memory_delta}\n' \
+            .format(self=self)
+
+
+class IFilterHook(metaclass=ABCMeta):
+    """Represents a hook called before and after each filter execution of a pipeline.
+
+    Override the methods of interest, e.g. to profile (see `profiling.ProfilingHook`) or to report the progress.
+    """
+
+    def before_execute(self, filter_index: int, filter_: IFilter):
+        """Called before a filter is executed.
+
+        :param filter_index: The filter's index in the pipeline.
+        :param filter_: The filter.
+        """
+        pass
+
+    def after_execute(self, record: FilterRecord):
+        """Called after a filter is executed.
+
+        :param record: The measurements of the execution.
+        """
+        pass
+
+
 class FilterPipeline:
     """Represents a filter pipeline, which can be executed on images.
     """
 
-    def __init__(self):
+    CHUNK_SIZE = 2 ** 16  # the number of pixels processed at once by fused pointwise filters (fits the CPU caches)
+
+    def __init__(self, cache=None, fuse_pointwise: bool=True):
         """Initializes a new instance of the `FilterPipeline` class.
+
+        :param cache: The `cache.FilterCache` to store the outputs of the filters or None to disable caching.
+        :param fuse_pointwise: Whether to execute runs of consecutive `IPointwiseFilter`s fused (see
+            `IPointwiseFilter`). The filters are not fused while hooks are added, such that each filter is measured.
         """
         self.filters = []  # holds the `IFilter`s
         self.params = []  # holds image-specific parameters
+        self.cache = cache
+        self.fuse_pointwise = fuse_pointwise
+        self.is_cached = []  # holds whether the filters' outputs are cached
+        self.hooks = []  # holds the `IFilterHook`s
 
-    def add_filter(self, filter_: IFilter):
+    def add_filter(self, filter_: IFilter, cache: bool=True):
+        """Adds a filter to the pipeline.
+
+        :param filter_: The filter.
+        :param cache: Whether to cache the filter's output if the pipeline has a cache (e.g. False for cheap filters).
+        """
 
         if filter_ is None:
             raise ValueError("The parameter filter needs to be specified.")
 
         self.filters.append(filter_)
         self.params.append(None)  # params must have the same length as filters
+        self.is_cached.append(cache)
+
+    def add_hook(self, hook: IFilterHook):
+        """Adds a hook, which is called before and after each filter execution.
+
+        Pointwise filters are not fused while the pipeline has hooks, such that the hooks are called for each filter.
+
+        :param hook: The hook.
+        """
+        if hook is None:
+            raise ValueError("The parameter hook needs to be specified.")
+
+        self.hooks.append(hook)
 
     def set_param(self, params, filter_index):
         """Sets an image-specific parameter for a filter.
@@ -54,17 +244,178 @@ class FilterPipeline:
         """
         self.params[filter_index] = params
 
-    def execute(self, image: sitk.Image) -> sitk.Image:
+    def execute(self, image: sitk.Image, params: dict=None) -> sitk.Image:
         """Executes the filter pipeline on an image.
 
         :param image: The image.
+        :param params: Image-specific parameters by filter index, which replace the parameters set by `set_param`.
         :return: The filtered image.
         """
-        for param_index, filter_ in enumerate(self.filters):
-            image = filter_.execute(image, self.params[param_index])
+        filter_params = [params[param_index] if params is not None and param_index in params else param
+                         for param_index, param in enumerate(self.params)]
+
+        start = 0
+        keys = []
+        if self.cache is not None and any(self.is_cached):
+            keys = self._get_keys(image, filter_params)
+            # continue from the output of the last cached stage
+            for filter_index in reversed(range(len(self.filters))):
+                if self.is_cached[filter_index]:
+                    cached_image = self.cache.get(keys[filter_index])
+                    if cached_image is not None:
+                        image, start = cached_image, filter_index + 1
+                        break
+
+        param_index = start
+        while param_index < len(self.filters):
+            end = self._get_pointwise_run_end(param_index, image, bool(keys))
+            image = self._execute_filters(range(param_index, end), image, filter_params)
+            param_index = end
+            if keys and self.is_cached[param_index - 1]:
+                self.cache.put(keys[param_index - 1], image)
+
+        return image
+
+    def execute_many(self, images: typing.Iterable[sitk.Image], params: typing.Iterable[dict]=None,
+                     max_workers: int=None, number_of_threads: int=1, max_in_flight: int=None,
+                     mp_context=None) -> typing.Iterator[sitk.Image]:
+        """Executes the filter pipeline on multiple images in worker processes.
+
+        The pipeline (including the parameters set by `set_param`) is sent once to each worker, the images and their
+        parameters are sent per image. The images and the filtered images are transported through shared memory
+        (see `shared.SharedImage`) instead of being pickled through the pipes to the workers, the parameters are
+        pickled. The filtered images are yielded in the order of the images as soon as they are available, while at
+        most `max_in_flight` images are processed or waiting to be yielded at a time.
+        The filters and parameters need to be picklable.
+
+        The hooks are not sent to the workers. Instead, the workers measure the filter executions and the hooks are
+        called with these measurements when the filtered image is yielded.
+
+        Example usage:
+
+        >>> params = ({2: RigidMultiModalRegistrationParams(fixed_image)} for fixed_image in fixed_images)
+        >>> for image in pipeline.execute_many(moving_images, params, max_workers=4):
+        >>>     ...
+
+        :param images: The images.
+        :param params: The image-specific parameters, i.e. one dict of filter index: parameter(s) (or None) per image,
+            which replace the parameters set by `set_param` for that image.
+        :param max_workers: The number of worker processes (defaults to the number of processors).
+        :param number_of_threads: The number of threads of the SimpleITK filters per worker (avoids the
+            oversubscription of the processors by workers times threads) or None to keep the SimpleITK default.
+        :param max_in_flight: The maximum number of submitted images not yet yielded (defaults to twice the number of
+            workers).
+        :param mp_context: The multiprocessing context of the workers (see `concurrent.futures.ProcessPoolExecutor`).
+        :return: The filtered images.
+        """
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_in_flight is None:
+            max_in_flight = 2 * max_workers
+        if max_in_flight < 1:
+            raise ValueError('max_in_flight must be at least 1')
+
+        # the hooks might not be picklable (e.g. callbacks), the workers record the measurements for them instead
+        worker_pipeline = copy.copy(self)
+        worker_pipeline.hooks = [_RecordingHook()] if self.hooks else []
+
+        executor = futures.ProcessPoolExecutor(max_workers, mp_context=mp_context, initializer=_initialize_worker,
+                                               initargs=(worker_pipeline, number_of_threads))
+
+        sentinel = object()
+        tasks = zip(images, itertools.repeat(None)) if params is None else \
+            itertools.zip_longest(images, params, fillvalue=sentinel)
+        in_flight = collections.deque()  # (future, shared input image)
+        try:
+            for image, image_params in tasks:
+                if image is sentinel or image_params is sentinel:
+                    raise ValueError('images and params need to have the same length')
+                shared_image = shared.SharedImage.from_image(image)
+                in_flight.append((executor.submit(_execute_in_worker, shared_image.descriptor, image_params),
+                                  shared_image))
+                if len(in_flight) >= max_in_flight:
+                    yield self._replay(*_receive(*in_flight.popleft()))
+
+            while in_flight:
+                yield self._replay(*_receive(*in_flight.popleft()))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for future, shared_image in in_flight:  # release the shared memory of the abandoned images
+                try:
+                    _receive(future, shared_image)
+                except Exception:
+                    pass  # e.g. cancelled or failed
+
+    def _get_pointwise_run_end(self, start: int, image: sitk.Image, is_caching: bool) -> int:
+        """Gets the end index of the run of pointwise filters to fuse starting at a filter (start + 1 if none)."""
+
+        if not self.fuse_pointwise or self.hooks or image.GetNumberOfComponentsPerPixel() != 1:
+            return start + 1
+
+        try:
+            dtype = img.get_numpy_data_type(image.GetPixelID())
+        except ValueError:  # e.g. label maps
+            return start + 1
+
+        end = start
+        while end < len(self.filters) and isinstance(self.filters[end], IPointwiseFilter):
+            dtype = self.filters[end].get_output_data_type(dtype)
+            if dtype is None:
+                break  # the filter needs to be executed by SimpleITK
+            end += 1
+            if is_caching and self.is_cached[end - 1]:
+                break  # the cache needs the output of this filter
+        return max(end, start + 1)
+
+    def _execute_filters(self, filter_indices: range, image: sitk.Image, params: list) -> sitk.Image:
+        """Executes a filter or a fused run of pointwise filters (only without hooks) and calls the hooks."""
+
+        if len(filter_indices) > 1:
+            return _execute_pointwise([self.filters[filter_index] for filter_index in filter_indices], image,
+                                      params[filter_indices.start:filter_indices.stop], self.CHUNK_SIZE)
+
+        filter_index = filter_indices[0]
+        filter_ = self.filters[filter_index]
+        if not self.hooks:
+            return filter_.execute(image, params[filter_index])
+
+        for hook in self.hooks:
+            hook.before_execute(filter_index, filter_)
+
+        memory_before = _get_resident_set_size()
+        start_time = time.perf_counter()
+        image = filter_.execute(image, params[filter_index])
+        wall_time = time.perf_counter() - start_time
+        memory_after = _get_resident_set_size()
+
+        record = FilterRecord(filter_index, type(filter_).__name__, wall_time, img.get_size_in_bytes(image),
+                              image.GetPixelIDTypeAsString(),
+                              None if memory_before is None or memory_after is None else memory_after - memory_before)
+        for hook in self.hooks:
+            hook.after_execute(record)
+
+        return image
+
+    def _replay(self, image: sitk.Image, records: list) -> sitk.Image:
+        """Calls the hooks with the records of a worker process."""
 
+        for record in records:
+            for hook in self.hooks:
+                hook.before_execute(record.filter_index, self.filters[record.filter_index])
+            for hook in self.hooks:
+                hook.after_execute(record)
         return image
 
+    def _get_keys(self, image: sitk.Image, params: list) -> list:
+        """Gets the cache keys of the filters' outputs, which chain the input image's digest with the filters."""
+
+        keys = []
+        key = self.cache.get_input_key(image)
+        for filter_, param in zip(self.filters, params):
+            key = self.cache.get_key(key, filter_, param)
+            keys.append(key)
+        return keys
+
     def __str__(self):
         """Gets a nicely printable string representation.
 
@@ -77,3 +428,99 @@ class FilterPipeline:
             string += " " + str(filter_no + 1) + ". " + "    ".join(str(filter_).splitlines(True))
 
         return string.format(self=self)
+
+
+_worker_pipeline = None  # the pipeline of a worker process of `FilterPipeline.execute_many`
+
+
+def _initialize_worker(pipeline: FilterPipeline, number_of_threads: int):
+    global _worker_pipeline
+    _worker_pipeline = pipeline
+    if number_of_threads is not None:
+        sitk.ProcessObject.SetGlobalDefaultNumberOfThreads(number_of_threads)
+
+
+def _execute_pointwise(filters: list, image: sitk.Image, params: list, chunk_size: int) -> sitk.Image:
+    """Executes pointwise filters fused in chunks into a single output image."""
+
+    if image.GetNumberOfPixels() == 0:  # the output data type is only known from a chunk
+        for filter_, param in zip(filters, params):
+            image = filter_.execute(image, param)
+        return image
+
+    array, properties = img.SimpleITKNumpyImageBridge.convert(image, view=True)
+    pixels = array.reshape(-1)
+
+    def execute_chunk(number_of_filters: int, start: int) -> np.ndarray:
+        chunk = pixels[start:start + chunk_size]
+        for filter_, param, filter_statistics in zip(filters[:number_of_filters], params, statistics):
+            chunk = filter_.execute_array(chunk, filter_statistics, param)
+        return chunk
+
+    # the statistics of a filter's input require a pass through the previous filters
+    statistics = [None] * len(filters)
+    for filter_index, filter_ in enumerate(filters):
+        if filter_.requires_statistics:
+            filter_statistics = IntensityStatistics()
+            for start in range(0, pixels.size, chunk_size):
+                filter_statistics.update(execute_chunk(filter_index, start))
+            statistics[filter_index] = filter_statistics
+
+    output_image, output = None, None
+    for start in range(0, pixels.size, chunk_size):
+        chunk = execute_chunk(len(filters), start)
+        if output is None:  # the output data type is known after the first chunk
+            output_image, output = img.create_image_array(properties, chunk.dtype)
+            output = output.reshape(-1)
+        output[start:start + chunk.size] = chunk
+
+    del output, array, pixels
+    return output_image
+
+
+def _execute_in_worker(descriptor: shared.SharedImageDescriptor, params: dict) -> tuple:
+    with shared.SharedImage.attach(descriptor) as shared_image:
+        image = shared_image.get_image()
+    image = _worker_pipeline.execute(image, params)
+
+    records = []
+    for hook in _worker_pipeline.hooks:
+        records.extend(hook.records)
+        hook.records.clear()
+
+    shared_image = shared.SharedImage.from_image(image)
+    shared_image.close()  # the parent process takes over the block
+    return shared_image.descriptor, records
+
+
+def _receive(future: futures.Future, shared_image: shared.SharedImage) -> tuple:
+    """Gets the filtered image and records of a worker and releases the shared memory of the input and output."""
+
+    try:
+        descriptor, records = future.result()
+    finally:
+        shared_image.close()
+        shared_image.unlink()
+
+    with shared.SharedImage.attach(descriptor, take_ownership=True) as shared_image:
+        return shared_image.get_image(), records
+
+
+class _RecordingHook(IFilterHook):
+    """Collects the records of a worker process to send them to the hooks of the parent process."""
+
+    def __init__(self):
+        self.records = []
+
+    def after_execute(self, record: FilterRecord):
+        self.records.append(record)
+
+
+def _get_resident_set_size() -> typing.Optional[int]:
+    """Gets the resident memory of the process in bytes or None if not available (only on Linux)."""
+
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
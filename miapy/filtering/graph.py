@@ -0,0 +1,232 @@
+"""The graph module enables filter pipelines with shared intermediate images.
+
+A :class:`FilterGraph` is a directed acyclic graph of filters. Each node executes a filter on the image of an input
+or of another node, and its parameters can be created from the images of further nodes. For instance, a brain mask
+computed once can be used for the bias field correction and for a later masking step, or a fixed image can be used
+for the registration and be normalized itself.
+
+Each node is executed once per execution of the graph and only if it is required for the requested outputs.
+Independent nodes are executed concurrently in threads (SimpleITK filters release the global interpreter lock),
+and the image of a node is released as soon as all its consumers are executed.
+
+Example usage:
+
+>>> graph = FilterGraph()
+>>> graph.add_input('t1')
+>>> graph.add_input('atlas')
+>>> graph.add_node('mask', SkullStripping(), 't1')  # any filters computing and applying a brain mask
+>>> graph.add_node('corrected', BiasFieldCorrector(), 't1', BiasFieldCorrectorParams, ['mask'])
+>>> graph.add_node('registered', RigidMultiModalRegistration(), 'corrected', RigidMultiModalRegistrationParams,
+>>>                ['atlas'])
+>>> graph.add_node('masked', Masking(), 'corrected', MaskingParams, ['mask'])
+>>> outputs = graph.execute({'t1': t1_image, 'atlas': atlas_image}, ['registered', 'masked'])
+"""
+import concurrent.futures as futures
+import typing
+
+import SimpleITK as sitk
+
+import miapy.filtering.filter as fltr
+
+
+class FilterNode:
+    """Represents a node of a filter graph."""
+
+    def __init__(self, name: str, filter_: fltr.IFilter, image: str, params=None, dependencies: tuple=()):
+        """Initializes a new instance of the FilterNode class.
+
+        Args:
+            name (str): The unique name of the node.
+            filter_ (IFilter): The filter.
+            image (str): The name of the input or node whose image is filtered.
+            params: The filter parameters, either an IFilterParams, None, or a callable creating the parameters from
+                the images of the dependencies (passed as positional arguments).
+            dependencies (tuple of str): The names of the inputs or nodes whose images are passed to `params`.
+        """
+        self.name = name
+        self.filter = filter_
+        self.image = image
+        self.params = params
+        self.dependencies = tuple(dependencies)
+
+    @property
+    def inputs(self) -> tuple:
+        """tuple of str: The names of all inputs or nodes the node consumes."""
+        return (self.image, ) + self.dependencies
+
+    def execute(self, images: dict) -> sitk.Image:
+        """Executes the node's filter.
+
+        Args:
+            images (dict): The images of (at least) the node's inputs by name.
+
+        Returns:
+            sitk.Image: The filtered image.
+        """
+        params = self.params
+        if callable(params):
+            params = params(*(images[dependency] for dependency in self.dependencies))
+        return self.filter.execute(images[self.image], params)
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'FilterNode:\n' \
+               ' name:         {self.name}\n' \
+               ' filter:       {filter_name}\n' \
+               ' image:        {self.image}\n' \
+               ' dependencies: {self.dependencies}\n' \
+            .format(self=self, filter_name=type(self.filter).__name__)
+
+
+class FilterGraph:
+    """Represents a directed acyclic graph of filters, which can be executed on images."""
+
+    def __init__(self, max_workers: int=None):
+        """Initializes a new instance of the FilterGraph class.
+
+        Args:
+            max_workers (int): The maximum number of concurrently executed nodes (see
+                `concurrent.futures.ThreadPoolExecutor`).
+        """
+        self.max_workers = max_workers
+        self.inputs = []  # holds the input names
+        self.nodes = {}  # holds the `FilterNode`s by name in the order of addition
+
+    def add_input(self, name: str):
+        """Adds an input image.
+
+        Args:
+            name (str): The unique name of the input.
+        """
+        self._check_name(name)
+        self.inputs.append(name)
+
+    def add_node(self, name: str, filter_: fltr.IFilter, image: str, params=None,
+                 dependencies: typing.Iterable[str]=()) -> FilterNode:
+        """Adds a node, which can only consume inputs and nodes added before (such that the graph is acyclic).
+
+        Args:
+            name (str): The unique name of the node.
+            filter_ (IFilter): The filter.
+            image (str): The name of the input or node whose image is filtered.
+            params: The filter parameters, either an IFilterParams, None, or a callable creating the parameters from
+                the images of the dependencies (passed as positional arguments).
+            dependencies (iterable of str): The names of the inputs or nodes whose images are passed to `params`.
+
+        Returns:
+            FilterNode: The node.
+        """
+        if filter_ is None:
+            raise ValueError('filter_ needs to be specified')
+        self._check_name(name)
+
+        node = FilterNode(name, filter_, image, params, tuple(dependencies))
+        for input_name in node.inputs:
+            if input_name not in self.nodes and input_name not in self.inputs:
+                raise ValueError('unknown input or node "{}" of node "{}"'.format(input_name, name))
+        if node.dependencies and not callable(params):
+            raise ValueError('params needs to be callable to consume the dependencies of node "{}"'.format(name))
+
+        self.nodes[name] = node
+        return node
+
+    def get_outputs(self) -> list:
+        """Gets the names of the nodes not consumed by other nodes, i.e. the default outputs.
+
+        Returns:
+            list of str: The node names.
+        """
+        consumed = {input_name for node in self.nodes.values() for input_name in node.inputs}
+        return [name for name in self.nodes if name not in consumed]
+
+    def execute(self, images: dict, outputs: typing.Iterable[str]=None) -> dict:
+        """Executes the graph on input images.
+
+        Args:
+            images (dict): The input images by name.
+            outputs (iterable of str): The names of the nodes (or inputs) to return or None for the nodes not
+                consumed by other nodes. Only the nodes required for the outputs are executed.
+
+        Returns:
+            dict: The output images by name.
+        """
+        missing_inputs = [name for name in self.inputs if name not in images]
+        if missing_inputs:
+            raise ValueError('missing input images {}'.format(missing_inputs))
+
+        outputs = self.get_outputs() if outputs is None else list(outputs)
+        for output in outputs:
+            if output not in self.nodes and output not in self.inputs:
+                raise ValueError('unknown output "{}"'.format(output))
+
+        nodes = self._get_required_nodes(outputs)
+
+        # the number of consumers of each image not yet executed (an image is released once this reaches zero)
+        number_of_consumers = {name: outputs.count(name) for name in self.inputs + nodes}
+        for name in nodes:
+            for input_name in self.nodes[name].inputs:
+                number_of_consumers[input_name] += 1
+
+        available = {name: images[name] for name in self.inputs}
+        waiting = {name: set(self.nodes[name].inputs) - set(self.inputs) for name in nodes}
+        running = {}  # future: node name
+
+        with futures.ThreadPoolExecutor(self.max_workers) as executor:
+            try:
+                while waiting or running:
+                    for name in [name for name, upstream in waiting.items() if not upstream]:
+                        del waiting[name]
+                        node = self.nodes[name]
+                        running[executor.submit(node.execute, {input_name: available[input_name]
+                                                               for input_name in node.inputs})] = name
+
+                    done, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+                    for future in done:
+                        name = running.pop(future)
+                        available[name] = future.result()
+                        for upstream in waiting.values():
+                            upstream.discard(name)
+
+                        for input_name in self.nodes[name].inputs:
+                            number_of_consumers[input_name] -= 1
+                            if number_of_consumers[input_name] == 0:
+                                del available[input_name]  # release the intermediate image
+            except BaseException:
+                for future in running:
+                    future.cancel()
+                raise
+
+        return {output: available[output] for output in outputs}
+
+    def _get_required_nodes(self, outputs: list) -> list:
+        """Gets the names of the nodes required for the outputs in the order of addition (a topological order)."""
+
+        required = set()
+        stack = [output for output in outputs if output in self.nodes]
+        while stack:
+            name = stack.pop()
+            if name not in required:
+                required.add(name)
+                stack.extend(input_name for input_name in self.nodes[name].inputs if input_name in self.nodes)
+        return [name for name in self.nodes if name in required]
+
+    def _check_name(self, name: str):
+        if name in self.nodes or name in self.inputs:
+            raise ValueError('the name "{}" is already used'.format(name))
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        string = 'FilterGraph:\n' \
+                 ' inputs: {}\n'.format(self.inputs)
+        for node in self.nodes.values():
+            string += ' {} = {}({}{})\n'.format(node.name, type(node.filter).__name__, node.image,
+                                               ''.join(', ' + dependency for dependency in node.dependencies))
+        return string
@@ -5,6 +5,7 @@ Image post-processing aims to alter images such that they depict a desired repre
 import SimpleITK as sitk
 
 import miapy.filtering.filter as fltr
+import miapy.image.image as img
 
 
 class LargestNConnectedComponents(fltr.IFilter):
@@ -14,6 +15,7 @@ class LargestNConnectedComponents(fltr.IFilter):
     By default the N components will all have the value 1 in the output image.
     Use the `consecutive_component_labels` option such that the largest has value 1,
     the second largest has value 2, etc. Background is always assumed to be 0.
+    The output image has the smallest unsigned integer pixel type holding the labels.
     """
 
     def __init__(self, number_of_components: int = 1, consecutive_component_labels: bool = False):
@@ -47,7 +49,9 @@ class LargestNConnectedComponents(fltr.IFilter):
         image = sitk.RelabelComponent(image)
 
         if self.consecutive_component_labels:
-            return sitk.Threshold(image, lower=1, upper=self.number_of_components, outsideValue=0)
+            image = sitk.Threshold(image, lower=1, upper=self.number_of_components, outsideValue=0)
+            # the connected components are labeled as UInt32, which is more than needed for a few components
+            return sitk.Cast(image, img.get_simpleitk_data_type(img.get_label_data_type(self.number_of_components)))
         else:
             return sitk.BinaryThreshold(image, lowerThreshold=1, upperThreshold=self.number_of_components,
                                         insideValue=1, outsideValue=0)
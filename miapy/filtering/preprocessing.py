@@ -1,6 +1,8 @@
 """Enables the enhancement of images before their use with other algorithms."""
+import numpy as np
 import SimpleITK as sitk
-from miapy.filtering.filter import IFilter, IFilterParams
+from miapy.filtering.filter import IFilter, IFilterParams, IPointwiseFilter, IntensityStatistics
+import miapy.image.image as img
 
 
 class BiasFieldCorrectorParams(IFilterParams):
@@ -127,10 +129,13 @@ class GradientAnisotropicDiffusion(IFilter):
             .format(self=self)
 
 
-class RescaleIntensity(IFilter):
+class RescaleIntensity(IPointwiseFilter):
     """
     Represents a rescale intensity filter.
     """
+
+    requires_statistics = True
+
     def __init__(self, min_intensity, max_intensity):
         """
         Initializes a new instance of the RescaleIntensity class.
@@ -153,6 +158,51 @@ class RescaleIntensity(IFilter):
 
         return sitk.RescaleIntensity(image, self.min_intensity, self.max_intensity)
 
+    def get_output_data_type(self, dtype: np.dtype):
+        """
+        Gets the data type of the rescaled pixels.
+
+        :param dtype: The numpy data type of the pixels.
+        :return: The data type or None if it cannot hold the intensity range (sitk.RescaleIntensity casts the range
+            to the pixel type, which is not reproduced).
+        """
+        dtype = np.dtype(dtype)
+        if dtype.kind in 'iu':
+            info = np.iinfo(dtype)
+            if self.min_intensity < info.min or self.max_intensity > info.max:
+                return None
+        return dtype
+
+    def execute_array(self, array: np.ndarray, statistics: IntensityStatistics=None,
+                      params: IFilterParams=None) -> np.ndarray:
+        """
+        Executes an intensity rescaling on a chunk of the pixels of an image.
+
+        :param array: The pixels.
+        :param statistics: The intensity statistics of the image.
+        :param params: The intensity rescaling filter parameters (None since no parameters are used).
+        :return: The intensity rescaled pixels.
+        """
+
+        if self.get_output_data_type(array.dtype) is None:
+            raise ValueError('the intensity range [{}, {}] exceeds the range of the pixel type {}'
+                             .format(self.min_intensity, self.max_intensity, array.dtype))
+
+        # same as sitk.RescaleIntensity, which computes in double precision and truncates to the pixel type
+        if statistics.minimum != statistics.maximum:
+            scale = (self.max_intensity - self.min_intensity) / (statistics.maximum - statistics.minimum)
+        elif statistics.maximum != 0:
+            scale = (self.max_intensity - self.min_intensity) / statistics.maximum
+        else:
+            scale = 0.0
+        shift = self.min_intensity - statistics.minimum * scale
+
+        result = array.astype(np.float64)
+        result *= scale
+        result += shift
+        np.clip(result, self.min_intensity, self.max_intensity, out=result)
+        return result.astype(array.dtype, copy=False)
+
     def __str__(self):
         """
         Gets a nicely printable string representation.
@@ -165,5 +215,274 @@ class RescaleIntensity(IFilter):
             .format(self=self)
 
 
+class ClipIntensity(IPointwiseFilter):
+    """
+    Represents an intensity clipping filter.
+    """
+    def __init__(self, min_intensity, max_intensity):
+        """
+        Initializes a new instance of the ClipIntensity class.
+
+        :param min_intensity: The min intensity value, lower intensities are set to it.
+        :param max_intensity: The max intensity value, higher intensities are set to it.
+        """
+        super().__init__()
+        if min_intensity > max_intensity:
+            raise ValueError('min_intensity must not be greater than max_intensity')
+
+        self.min_intensity = min_intensity
+        self.max_intensity = max_intensity
+
+    def execute(self, image: sitk.Image, params: IFilterParams=None) -> sitk.Image:
+        """
+        Executes an intensity clipping on an image.
+
+        :param image: The image.
+        :param params: The intensity clipping filter parameters (None since no parameters are used).
+        :return: The intensity clipped image.
+        """
+
+        return sitk.Clamp(image, lowerBound=self.min_intensity, upperBound=self.max_intensity)
+
+    def execute_array(self, array: np.ndarray, statistics: IntensityStatistics=None,
+                      params: IFilterParams=None) -> np.ndarray:
+        """
+        Executes an intensity clipping on a chunk of the pixels of an image.
+
+        :param array: The pixels.
+        :param statistics: Not used.
+        :param params: The intensity clipping filter parameters (None since no parameters are used).
+        :return: The intensity clipped pixels.
+        """
+
+        # same as sitk.Clamp, which casts the bounds to the pixel type (bounds beyond the type's range do not clip)
+        min_intensity, max_intensity = self.min_intensity, self.max_intensity
+        if array.dtype.kind in 'iu':
+            info = np.iinfo(array.dtype)
+            min_intensity = min(max(min_intensity, info.min), info.max)
+            max_intensity = min(max(max_intensity, info.min), info.max)
+        return np.clip(array, array.dtype.type(min_intensity), array.dtype.type(max_intensity))
+
+    def __str__(self):
+        """
+        Gets a nicely printable string representation.
+
+        :return: String representation.
+        """
+        return 'ClipIntensity:\n' \
+               ' min_intensity: {self.min_intensity}\n' \
+               ' max_intensity: {self.max_intensity}\n' \
+            .format(self=self)
+
+
+class NormalizeZScore(IPointwiseFilter):
+    """
+    Represents a z-score normalization filter, i.e. the intensities have zero mean and unit variance afterwards.
+    """
+
+    requires_statistics = True
+
+    def execute(self, image: sitk.Image, params: IFilterParams=None) -> sitk.Image:
+        """
+        Executes a z-score normalization on an image.
+
+        :param image: The image.
+        :param params: The z-score normalization filter parameters (None since no parameters are used).
+        :return: The normalized image (64-bit float).
+        """
+
+        return sitk.Normalize(image)
+
+    def get_output_data_type(self, dtype: np.dtype):
+        """
+        Gets the data type of the normalized pixels.
+
+        :param dtype: The numpy data type of the pixels.
+        :return: The data type (64-bit float).
+        """
+        return np.dtype(np.float64)
+
+    def execute_array(self, array: np.ndarray, statistics: IntensityStatistics=None,
+                      params: IFilterParams=None) -> np.ndarray:
+        """
+        Executes a z-score normalization on a chunk of the pixels of an image.
+
+        :param array: The pixels.
+        :param statistics: The intensity statistics of the image.
+        :param params: The z-score normalization filter parameters (None since no parameters are used).
+        :return: The normalized pixels (64-bit float).
+        """
+
+        with np.errstate(divide='ignore', invalid='ignore'):  # same as sitk.Normalize for constant images
+            result = array.astype(np.float64)
+            result -= statistics.mean
+            result /= statistics.standard_deviation
+            return result
+
+    def __str__(self):
+        """
+        Gets a nicely printable string representation.
+
+        :return: String representation.
+        """
+        return 'NormalizeZScore:\n'
+
+
+class Cast(IPointwiseFilter):
+    """
+    Represents a cast filter, which converts the pixels to another (scalar) pixel type.
+    """
+
+    def __init__(self, pixel_type: int):
+        """
+        Initializes a new instance of the Cast class.
+
+        :param pixel_type: The SimpleITK pixel type to cast to (e.g. sitk.sitkFloat32).
+        """
+        super().__init__()
+        self.pixel_type = pixel_type
+
+    def execute(self, image: sitk.Image, params: IFilterParams=None) -> sitk.Image:
+        """
+        Executes a cast on an image.
+
+        :param image: The image.
+        :param params: The cast filter parameters (None since no parameters are used).
+        :return: The cast image.
+        """
+
+        return sitk.Cast(image, self.pixel_type)
+
+    def get_output_data_type(self, dtype: np.dtype):
+        """
+        Gets the data type of the cast pixels.
+
+        :param dtype: The numpy data type of the pixels.
+        :return: The data type or None if the pixel type is not a scalar type with numpy equivalent or if complex
+            pixels are cast to real ones.
+        """
+        try:
+            output_dtype = img.get_numpy_data_type(self.pixel_type)
+        except ValueError:
+            return None
+        if img.get_simpleitk_data_type(output_dtype) != self.pixel_type:
+            return None  # vector pixel type
+        if np.dtype(dtype).kind == 'c' and output_dtype.kind != 'c':
+            return None
+        return output_dtype
+
+    def execute_array(self, array: np.ndarray, statistics: IntensityStatistics=None,
+                      params: IFilterParams=None) -> np.ndarray:
+        """
+        Executes a cast on a chunk of the pixels of an image.
+
+        :param array: The pixels.
+        :param statistics: Not used.
+        :param params: The cast filter parameters (None since no parameters are used).
+        :return: The cast pixels.
+        """
+
+        # same as sitk.Cast, which truncates floating-point values towards zero (values exceeding the range of an
+        # integer type are undefined)
+        return array.astype(self.get_output_data_type(array.dtype))
+
+    def __str__(self):
+        """
+        Gets a nicely printable string representation.
+
+        :return: String representation.
+        """
+        return 'Cast:\n' \
+               ' pixel_type: {pixel_type}\n' \
+            .format(pixel_type=sitk.GetPixelIDValueAsString(self.pixel_type))
+
+
+class BinaryThreshold(IPointwiseFilter):
+    """
+    Represents a binary threshold filter, i.e. intensities within the thresholds are set to the inside value and all
+    other intensities to the outside value (8-bit unsigned integer).
+    """
+
+    def __init__(self, lower_threshold: float, upper_threshold: float, inside_value: int=1, outside_value: int=0):
+        """
+        Initializes a new instance of the BinaryThreshold class.
+
+        :param lower_threshold: The lower threshold (inclusive).
+        :param upper_threshold: The upper threshold (inclusive).
+        :param inside_value: The value of intensities within the thresholds.
+        :param outside_value: The value of intensities outside the thresholds.
+        """
+        super().__init__()
+        if lower_threshold > upper_threshold:
+            raise ValueError('lower_threshold must not be greater than upper_threshold')
+
+        self.lower_threshold = lower_threshold
+        self.upper_threshold = upper_threshold
+        self.inside_value = inside_value
+        self.outside_value = outside_value
+
+    def execute(self, image: sitk.Image, params: IFilterParams=None) -> sitk.Image:
+        """
+        Executes a binary thresholding on an image.
+
+        :param image: The image.
+        :param params: The binary threshold filter parameters (None since no parameters are used).
+        :return: The thresholded image (8-bit unsigned integer).
+        """
+
+        return sitk.BinaryThreshold(image, self.lower_threshold, self.upper_threshold, self.inside_value,
+                                    self.outside_value)
+
+    def get_output_data_type(self, dtype: np.dtype):
+        """
+        Gets the data type of the thresholded pixels.
+
+        :param dtype: The numpy data type of the pixels.
+        :return: The data type (8-bit unsigned integer) or None if the thresholds exceed the range of an integer
+            type (sitk.BinaryThreshold casts the thresholds to the pixel type, which is not reproduced).
+        """
+        dtype = np.dtype(dtype)
+        if dtype.kind == 'c':
+            return None
+        if dtype.kind in 'iu':
+            info = np.iinfo(dtype)
+            if not info.min <= self.lower_threshold <= info.max or not info.min <= self.upper_threshold <= info.max:
+                return None
+        return np.dtype(np.uint8)
+
+    def execute_array(self, array: np.ndarray, statistics: IntensityStatistics=None,
+                      params: IFilterParams=None) -> np.ndarray:
+        """
+        Executes a binary thresholding on a chunk of the pixels of an image.
+
+        :param array: The pixels.
+        :param statistics: Not used.
+        :param params: The binary threshold filter parameters (None since no parameters are used).
+        :return: The thresholded pixels (8-bit unsigned integer).
+        """
+
+        # same as sitk.BinaryThreshold, which casts the thresholds to the pixel type (truncation towards zero)
+        lower_threshold = array.dtype.type(np.trunc(self.lower_threshold) if array.dtype.kind in 'iu'
+                                           else self.lower_threshold)
+        upper_threshold = array.dtype.type(np.trunc(self.upper_threshold) if array.dtype.kind in 'iu'
+                                           else self.upper_threshold)
+        result = np.full(array.shape, self.outside_value, dtype=np.uint8)
+        result[(array >= lower_threshold) & (array <= upper_threshold)] = self.inside_value
+        return result
+
+    def __str__(self):
+        """
+        Gets a nicely printable string representation.
+
+        :return: String representation.
+        """
+        return 'BinaryThreshold:\n' \
+               ' lower_threshold: {self.lower_threshold}\n' \
+               ' upper_threshold: {self.upper_threshold}\n' \
+               ' inside_value:    {self.inside_value}\n' \
+               ' outside_value:   {self.outside_value}\n' \
+            .format(self=self)
+
+
 class HistogramMatcher:
     """A learning method to align the intensity ranges of images."""
@@ -0,0 +1,168 @@
+"""The profiling module provides hooks to measure and report the filter executions of pipelines.
+
+The :class:`ProfilingHook` collects the :class:`filter.FilterRecord` of each filter execution, i.e. the wall time,
+the size and pixel type of the filtered image, and the change of the process' resident memory, and aggregates them
+per filter, e.g. over all images of a batch. The :class:`ProgressHook` reports the progress of the pipeline to a
+callback. Pipelines with hooks execute each filter separately, i.e. pointwise filters are not fused, such that the
+measurements of each filter are available.
+
+Example usage:
+
+>>> profiler = ProfilingHook()
+>>> pipeline.add_hook(profiler)
+>>> pipeline.add_hook(ProgressHook(len(images) * len(pipeline.filters)))
+>>> images = list(pipeline.execute_many(images))
+>>> print(profiler.get_report())
+"""
+import typing
+
+import miapy.filtering.filter as fltr
+
+
+class FilterSummary:
+    """Represents the aggregated measurements of a filter's executions."""
+
+    def __init__(self, filter_index: int, filter_name: str, records: list):
+        """Initializes a new instance of the FilterSummary class.
+
+        Args:
+            filter_index (int): The filter's index in the pipeline.
+            filter_name (str): The filter's class name.
+            records (list of FilterRecord): The records of the filter's executions.
+        """
+        self.filter_index = filter_index
+        self.filter_name = filter_name
+        self.number_of_executions = len(records)
+        self.total_time = sum(record.wall_time for record in records)
+        self.max_time = max((record.wall_time for record in records), default=0.0)
+        self.mean_size_in_bytes = sum(record.size_in_bytes for record in records) / max(len(records), 1)
+        self.pixel_types = sorted({record.pixel_type for record in records})
+        memory_deltas = [record.memory_delta for record in records if record.memory_delta is not None]
+        self.max_memory_delta = max(memory_deltas) if memory_deltas else None
+
+    @property
+    def mean_time(self) -> float:
+        """float: The mean wall time of an execution in seconds."""
+        return self.total_time / max(self.number_of_executions, 1)
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'FilterSummary:\n' \
+               ' filter_index:         {self.filter_index}\n' \
+               ' filter_name:          {self.filter_name}\n' \
+               ' number_of_executions: {self.number_of_executions}\n' \
+               ' total_time:           {self.total_time}\n' \
+               ' mean_time:            {self.mean_time}\n' \
+               ' max_memory_delta:     {self.max_memory_delta}\n' \
+            .format(self=self)
+
+
+class ProfilingHook(fltr.IFilterHook):
+    """Represents a hook collecting the measurements of all filter executions."""
+
+    def __init__(self):
+        """Initializes a new instance of the ProfilingHook class."""
+        self.records = []
+
+    def after_execute(self, record: fltr.FilterRecord):
+        """Collects the measurements of a filter execution.
+
+        Args:
+            record (FilterRecord): The measurements.
+        """
+        self.records.append(record)
+
+    def get_summaries(self) -> typing.List[FilterSummary]:
+        """Gets the aggregated measurements per filter.
+
+        Returns:
+            list of FilterSummary: The summaries sorted by the filter index.
+        """
+        records_by_filter = {}
+        for record in self.records:
+            records_by_filter.setdefault((record.filter_index, record.filter_name), []).append(record)
+
+        return [FilterSummary(filter_index, filter_name, records)
+                for (filter_index, filter_name), records in sorted(records_by_filter.items())]
+
+    def get_report(self) -> str:
+        """Gets a table of the aggregated measurements per filter, i.e. the cost breakdown of the pipeline.
+
+        Returns:
+            str: The report.
+        """
+        summaries = self.get_summaries()
+        total_time = sum(summary.total_time for summary in summaries)
+
+        lines = ['{:>3} {:<30} {:>6} {:>11} {:>6} {:>11} {:>12} {:>14}  {}'.format(
+            '#', 'FILTER', 'COUNT', 'TOTAL [s]', '%', 'MEAN [s]', 'OUTPUT [MB]', 'MAX MEM [MB]', 'PIXEL TYPES')]
+        for summary in summaries:
+            lines.append('{:>3} {:<30} {:>6} {:>11.3f} {:>6.1f} {:>11.3f} {:>12.1f} {:>14}  {}'.format(
+                summary.filter_index, summary.filter_name[:30], summary.number_of_executions, summary.total_time,
+                100 * summary.total_time / total_time if total_time > 0 else 0.0, summary.mean_time,
+                summary.mean_size_in_bytes / 2 ** 20,
+                'n/a' if summary.max_memory_delta is None else '{:.1f}'.format(summary.max_memory_delta / 2 ** 20),
+                ', '.join(summary.pixel_types)))
+        return '\n'.join(lines)
+
+    def reset(self):
+        """Removes all measurements."""
+        self.records = []
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'ProfilingHook:\n' \
+               ' number_of_records: {}\n' \
+            .format(len(self.records))
+
+
+class ProgressHook(fltr.IFilterHook):
+    """Represents a hook reporting the progress of filter executions."""
+
+    def __init__(self, number_of_executions: int=None, callback: typing.Callable=None):
+        """Initializes a new instance of the ProgressHook class.
+
+        Args:
+            number_of_executions (int): The expected number of filter executions (e.g. the number of images times
+                the number of filters) or None if unknown.
+            callback (callable): The function called after each filter execution with the arguments
+                (number of finished executions, expected number of executions, FilterRecord). Prints the progress
+                if None.
+        """
+        self.number_of_executions = number_of_executions
+        self.callback = callback if callback is not None else _print_progress
+        self.number_of_finished_executions = 0
+
+    def after_execute(self, record: fltr.FilterRecord):
+        """Reports a finished filter execution.
+
+        Args:
+            record (FilterRecord): The measurements.
+        """
+        self.number_of_finished_executions += 1
+        self.callback(self.number_of_finished_executions, self.number_of_executions, record)
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'ProgressHook:\n' \
+               ' number_of_executions:          {self.number_of_executions}\n' \
+               ' number_of_finished_executions: {self.number_of_finished_executions}\n' \
+            .format(self=self)
+
+
+def _print_progress(number_of_finished_executions: int, number_of_executions: int, record: fltr.FilterRecord):
+    print('{}/{} {} ({:.3f} s)'.format(number_of_finished_executions,
+                                       '?' if number_of_executions is None else number_of_executions,
+                                       record.filter_name, record.wall_time))
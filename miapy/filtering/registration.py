@@ -15,6 +15,7 @@ import numpy as np
 import SimpleITK as sitk
 
 import miapy.filtering.filter as fltr
+import miapy.image.writer as wrt
 
 
 class RigidMultiModalRegistrationParams(fltr.IFilterParams):
@@ -81,33 +82,7 @@ class RigidMultiModalRegistration(fltr.IFilter):
         self.shrink_factors = shrink_factors
         self.smoothing_sigmas = smoothing_sigmas
 
-        registration = sitk.ImageRegistrationMethod()
-
-        # similarity metric
-        # will compare how well the two images match each other
-        # registration.SetMetricAsJointHistogramMutualInformation(self.number_of_histogram_bins, 1.5)
-        registration.SetMetricAsMattesMutualInformation(self.number_of_histogram_bins)
-        registration.SetMetricSamplingStrategy(registration.RANDOM)
-        registration.SetMetricSamplingPercentage(0.1)
-
-        # interpolator
-        # will evaluate the intensities of the moving image at non-rigid positions
-        registration.SetInterpolator(sitk.sitkLinear)
-
-        # optimizer
-        # is required to explore the parameter space of the transform in search of optimal values of the metric
-        registration.SetOptimizerAsGradientDescent(learningRate=self.learning_rate,
-                                                   numberOfIterations=self.number_of_iterations,
-                                                   convergenceMinimumValue=1e-6, convergenceWindowSize=10,
-                                                   estimateLearningRate=registration.Never)
-        registration.SetOptimizerScalesFromPhysicalShift()
-
-        # setup for the multi-resolution framework
-        registration.SetShrinkFactorsPerLevel(self.shrink_factors)
-        registration.SetSmoothingSigmasPerLevel(self.smoothing_sigmas)
-        registration.SmoothingSigmasAreSpecifiedInPhysicalUnitsOn()
-
-        self.registration = registration
+        self.registration = self._create_registration()
 
     def execute(self, image: sitk.Image, params: RigidMultiModalRegistrationParams=None) -> sitk.Image:
         """Executes a multi-modal rigid registration.
@@ -147,6 +122,47 @@ class RigidMultiModalRegistration(fltr.IFilter):
 
         return sitk.Resample(image, params.fixed_image, transform, sitk.sitkLinear, 0.0, image.GetPixelIDValue())
 
+    def _create_registration(self) -> sitk.ImageRegistrationMethod:
+        """Creates the SimpleITK registration method from the filter's settings."""
+
+        registration = sitk.ImageRegistrationMethod()
+
+        # similarity metric
+        # will compare how well the two images match each other
+        # registration.SetMetricAsJointHistogramMutualInformation(self.number_of_histogram_bins, 1.5)
+        registration.SetMetricAsMattesMutualInformation(self.number_of_histogram_bins)
+        registration.SetMetricSamplingStrategy(registration.RANDOM)
+        registration.SetMetricSamplingPercentage(0.1)
+
+        # interpolator
+        # will evaluate the intensities of the moving image at non-rigid positions
+        registration.SetInterpolator(sitk.sitkLinear)
+
+        # optimizer
+        # is required to explore the parameter space of the transform in search of optimal values of the metric
+        registration.SetOptimizerAsGradientDescent(learningRate=self.learning_rate,
+                                                   numberOfIterations=self.number_of_iterations,
+                                                   convergenceMinimumValue=1e-6, convergenceWindowSize=10,
+                                                   estimateLearningRate=registration.Never)
+        registration.SetOptimizerScalesFromPhysicalShift()
+
+        # setup for the multi-resolution framework
+        registration.SetShrinkFactorsPerLevel(self.shrink_factors)
+        registration.SetSmoothingSigmasPerLevel(self.smoothing_sigmas)
+        registration.SmoothingSigmasAreSpecifiedInPhysicalUnitsOn()
+
+        return registration
+
+    def __getstate__(self):
+        # the SimpleITK registration method cannot be pickled (e.g. to execute the filter in worker processes)
+        state = self.__dict__.copy()
+        del state['registration']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.registration = self._create_registration()
+
     def __str__(self):
         """Gets a nicely printable string representation.
 
@@ -171,7 +187,8 @@ class RegistrationPlotter:
                  fixed_image: sitk.Image,
                  image: sitk.Image,
                  transform: sitk.Transform,
-                 path: str):
+                 path: str,
+                 writer: wrt.AsyncImageWriter=None):
         """
 
         Args:
@@ -180,7 +197,9 @@ class RegistrationPlotter:
             image (sitk.Image): The moving image.
             transform (sitk.Transform): The transformation.
             path (str): Path to the directory where to save the plots.
+            writer (AsyncImageWriter): The writer to save the plots in the background or None to save them directly.
         """
+        self.writer = writer
         self.metric_values = []
         self.multires_iterations = []
 
@@ -272,4 +291,7 @@ class RegistrationPlotter:
 
         combined_image = sitk.Paste(combined_image, image1, image1.GetSize(), (0, 0), image1_destination)
         combined_image = sitk.Paste(combined_image, image2, image2.GetSize(), (0, 0), image2_destination)
-        sitk.WriteImage(combined_image, file_name)
+        if self.writer is None:
+            sitk.WriteImage(combined_image, file_name)
+        else:
+            self.writer.write(combined_image, file_name)
@@ -11,4 +11,52 @@ SimpleITK <> numpy (:mod:`image.image`)
 .. automodule:: image.image
     :members:
 
-"""
\ No newline at end of file
+Image cache (:mod:`image.cache`)
+--------------------------------
+
+.. automodule:: image.cache
+    :members:
+
+Dataset manifest (:mod:`image.manifest`)
+----------------------------------------
+
+.. automodule:: image.manifest
+    :members:
+
+Patches (:mod:`image.patch`)
+----------------------------
+
+.. automodule:: image.patch
+    :members:
+
+Prefetching reader (:mod:`image.reader`)
+----------------------------------------
+
+.. automodule:: image.reader
+    :members:
+
+Voxel sampling (:mod:`image.sampling`)
+--------------------------------------
+
+.. automodule:: image.sampling
+    :members:
+
+Shared memory (:mod:`image.shared`)
+-----------------------------------
+
+.. automodule:: image.shared
+    :members:
+
+Image stores (:mod:`image.store`)
+---------------------------------
+
+.. automodule:: image.store
+    :members:
+
+Background writer (:mod:`image.writer`)
+----------------------------------------
+
+.. automodule:: image.writer
+    :members:
+
+"""
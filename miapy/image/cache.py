@@ -0,0 +1,293 @@
+"""The cache module holds images in memory to avoid reloading them.
+
+The :class:`ImageCache` keeps recently used images up to a memory budget and evicts the least recently used ones.
+Images are identified by their absolute path, modification time, and read options, such that a modified file is
+reloaded. The cache returns shallow copies of the cached images, which share the pixel buffer until they are
+modified (copy-on-write), or read-only NumPy views of the pixel buffer. Frequently used images (e.g. atlases or the
+fixed image of a registration) can be pinned to prevent their eviction.
+
+Example usage:
+
+>>> cache = get_default_cache()
+>>> fixed_image = cache.pin("/path/to/atlas.nii.gz")
+>>> image = cache.get_image("/path/to/image.nii.gz")
+>>> array, properties = cache.get_array("/path/to/ground_truth.nii.gz")  # read-only view
+>>> print(cache.statistics)
+"""
+import collections
+import os
+import threading
+from typing import Tuple
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.image.image as img
+
+
+class CacheStatistics:
+    """Represents the usage statistics of an image cache."""
+
+    def __init__(self, hits: int=0, misses: int=0, evictions: int=0, number_of_images: int=0, size_in_bytes: int=0):
+        """Initializes a new instance of the CacheStatistics class.
+
+        Args:
+            hits (int): The number of requests served from the cache.
+            misses (int): The number of requests that loaded the image.
+            evictions (int): The number of evicted images.
+            number_of_images (int): The number of cached images.
+            size_in_bytes (int): The size of the cached images in bytes.
+        """
+        self.hits = hits
+        self.misses = misses
+        self.evictions = evictions
+        self.number_of_images = number_of_images
+        self.size_in_bytes = size_in_bytes
+
+    @property
+    def hit_rate(self) -> float:
+        """float: The fraction of requests served from the cache."""
+        requests = self.hits + self.misses
+        return self.hits / requests if requests > 0 else 0.0
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'CacheStatistics:\n' \
+               ' hits:             {self.hits}\n' \
+               ' misses:           {self.misses}\n' \
+               ' hit_rate:         {self.hit_rate:.3f}\n' \
+               ' evictions:        {self.evictions}\n' \
+               ' number_of_images: {self.number_of_images}\n' \
+               ' size_in_bytes:    {self.size_in_bytes}\n' \
+            .format(self=self)
+
+
+class ImageCache:
+    """Represents a thread-safe least recently used (LRU) image cache with a memory budget."""
+
+    def __init__(self, max_bytes: int=2 ** 30):
+        """Initializes a new instance of the ImageCache class.
+
+        Args:
+            max_bytes (int): The memory budget in bytes. Pinned images count towards the budget but are never evicted.
+        """
+        if max_bytes < 0:
+            raise ValueError('max_bytes must be non-negative')
+
+        self.max_bytes = max_bytes
+        self._images = collections.OrderedDict()  # key: (image, view, properties) in least to most recently used order
+        self._sizes = {}  # key: size in bytes
+        self._pins = collections.Counter()  # key: number of pins
+        self._size_in_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.RLock()
+
+    def get_image(self, path: str, pixel_type: int=sitk.sitkUnknown) -> sitk.Image:
+        """Gets an image.
+
+        Args:
+            path (str): The image file path.
+            pixel_type (int): The SimpleITK pixel type to read the image as (sitkUnknown keeps the file's type).
+
+        Returns:
+            sitk.Image: A shallow copy of the cached image, which can be modified without affecting the cache.
+        """
+        return sitk.Image(self._get(path, pixel_type)[0])
+
+    def get_array(self, path: str, pixel_type: int=sitk.sitkUnknown) -> Tuple[np.ndarray, img.ImageProperties]:
+        """Gets an image as array.
+
+        Args:
+            path (str): The image file path.
+            pixel_type (int): The SimpleITK pixel type to read the image as (sitkUnknown keeps the file's type).
+
+        Returns:
+            A Tuple[np.ndarray, ImageProperties]: A read-only view of the cached image's pixel buffer and the image
+                properties. All requests of a cached image share the same buffer.
+        """
+        _, array, properties = self._get(path, pixel_type)
+        return array, properties
+
+    def pin(self, path: str, pixel_type: int=sitk.sitkUnknown) -> sitk.Image:
+        """Pins an image, i.e. loads it if necessary and prevents its eviction until it is unpinned.
+
+        Args:
+            path (str): The image file path.
+            pixel_type (int): The SimpleITK pixel type to read the image as (sitkUnknown keeps the file's type).
+
+        Returns:
+            sitk.Image: A shallow copy of the pinned image.
+        """
+        key = self._get_key(path, pixel_type)
+        with self._lock:
+            self._pins[key] += 1
+        try:
+            return sitk.Image(self._get(path, pixel_type, key)[0])
+        except Exception:
+            self._unpin(key)
+            raise
+
+    def unpin(self, path: str, pixel_type: int=sitk.sitkUnknown):
+        """Unpins an image, which can be evicted when it is not pinned anymore.
+
+        Args:
+            path (str): The image file path.
+            pixel_type (int): The SimpleITK pixel type the image was pinned with.
+        """
+        self._unpin(self._get_key(path, pixel_type))
+
+    def invalidate(self, path: str=None):
+        """Removes the unpinned images of a file or all unpinned images from the cache.
+
+        Args:
+            path (str): The image file path or None for all images.
+        """
+        path = None if path is None else os.path.abspath(path)
+        with self._lock:
+            for key in list(self._images):
+                if (path is None or key[0] == path) and key not in self._pins:
+                    self._remove(key)
+
+    @property
+    def statistics(self) -> CacheStatistics:
+        """CacheStatistics: The usage statistics."""
+        with self._lock:
+            return CacheStatistics(self._hits, self._misses, self._evictions, len(self._images), self._size_in_bytes)
+
+    def reset_statistics(self):
+        """Resets the hit, miss, and eviction counts."""
+        with self._lock:
+            self._hits = self._misses = self._evictions = 0
+
+    def __len__(self):
+        """Gets the number of cached images.
+
+        Returns:
+            int: The number of cached images.
+        """
+        return len(self._images)
+
+    def __contains__(self, path: str):
+        """Determines whether the current version of a file is cached (with any read options).
+
+        Args:
+            path (str): The image file path.
+
+        Returns:
+            bool: True if the image is cached; otherwise, False.
+        """
+        path = os.path.abspath(path)
+        modification_time = os.stat(path).st_mtime_ns
+        with self._lock:
+            return any(key[:2] == (path, modification_time) for key in self._images)
+
+    def _get(self, path: str, pixel_type: int, key: tuple=None) -> tuple:
+        """Gets the cached (image, array view, properties) or loads and caches them."""
+
+        if key is None:
+            key = self._get_key(path, pixel_type)
+
+        with self._lock:
+            entry = self._images.get(key)
+            if entry is not None:
+                self._images.move_to_end(key)
+                self._hits += 1
+                return entry
+            self._misses += 1
+
+        # load outside of the lock such that other images can be served meanwhile
+        image = sitk.ReadImage(key[0], pixel_type)
+        # the view is created once while the image does not share its buffer yet, accessing the buffer after shallow
+        # copies were handed out would copy it (copy-on-write). The cached image itself is never modified
+        entry = (image, ) + img.SimpleITKNumpyImageBridge.convert(image, view=True)
+
+        with self._lock:
+            if key in self._images:  # loaded by another thread meanwhile
+                self._images.move_to_end(key)
+                return self._images[key]
+
+            # remove outdated versions of the file
+            for outdated_key in [k for k in self._images if k[0] == key[0] and k[1] != key[1]]:
+                if outdated_key not in self._pins:
+                    self._remove(outdated_key)
+
+            size = img.get_size_in_bytes(image)
+            if size > self.max_bytes and key not in self._pins:
+                return entry  # too large to be cached
+
+            self._images[key] = entry
+            self._sizes[key] = size
+            self._size_in_bytes += size
+            self._evict()
+        return entry
+
+    def _unpin(self, key: tuple):
+        """Decrements the pin count of an image and evicts images if necessary."""
+
+        with self._lock:
+            if self._pins[key] <= 0:
+                raise ValueError('image {} is not pinned'.format(key[0]))
+            self._pins[key] -= 1
+            if self._pins[key] == 0:
+                del self._pins[key]
+            self._evict()
+
+    def _evict(self):
+        """Evicts the least recently used unpinned images until the cache is within its memory budget."""
+
+        if self._size_in_bytes <= self.max_bytes:
+            return
+
+        for key in list(self._images):
+            if self._size_in_bytes <= self.max_bytes:
+                break
+            if key not in self._pins:
+                self._remove(key)
+                self._evictions += 1
+
+    def _remove(self, key: tuple):
+        """Removes an image from the cache."""
+
+        del self._images[key]
+        self._size_in_bytes -= self._sizes.pop(key)
+
+    @staticmethod
+    def _get_key(path: str, pixel_type: int) -> tuple:
+        """Gets the key of an image, i.e. the absolute path, the modification time, and the read options."""
+
+        path = os.path.abspath(path)
+        return path, os.stat(path).st_mtime_ns, pixel_type
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> ImageCache:
+    """Gets the process-wide image cache, which is created with the default memory budget on first use.
+
+    Returns:
+        ImageCache: The process-wide image cache.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ImageCache()
+        return _default_cache
+
+
+def set_default_cache(cache: ImageCache):
+    """Sets the process-wide image cache, e.g. to change the memory budget.
+
+    Args:
+        cache (ImageCache): The image cache.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        _default_cache = cache
@@ -2,37 +2,198 @@
 This module holds classes related to images.
 A strong focus is given to ITK images and numpy arrays.
 """
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Union
+
 import SimpleITK as sitk
 import numpy as np
-from typing import Tuple
 
 
-def get_numpy_data_type(data_type: int) -> np.dtype:
+_NUMPY_DATA_TYPES = {
+    sitk.sitkUInt8: np.uint8,
+    sitk.sitkInt8: np.int8,
+    sitk.sitkUInt16: np.uint16,
+    sitk.sitkInt16: np.int16,
+    sitk.sitkUInt32: np.uint32,
+    sitk.sitkInt32: np.int32,
+    sitk.sitkUInt64: np.uint64,
+    sitk.sitkInt64: np.int64,
+    sitk.sitkFloat32: np.float32,
+    sitk.sitkFloat64: np.float64,
+    sitk.sitkComplexFloat32: np.complex64,
+    sitk.sitkComplexFloat64: np.complex128,
+    sitk.sitkVectorUInt8: np.uint8,
+    sitk.sitkVectorInt8: np.int8,
+    sitk.sitkVectorUInt16: np.uint16,
+    sitk.sitkVectorInt16: np.int16,
+    sitk.sitkVectorUInt32: np.uint32,
+    sitk.sitkVectorInt32: np.int32,
+    sitk.sitkVectorUInt64: np.uint64,
+    sitk.sitkVectorInt64: np.int64,
+    sitk.sitkVectorFloat32: np.float32,
+    sitk.sitkVectorFloat64: np.float64,
+}
+
+_SCALAR_DATA_TYPES = {np.dtype(numpy_data_type): data_type for data_type, numpy_data_type in (
+    (sitk.sitkUInt8, np.bool_), (sitk.sitkUInt8, np.uint8), (sitk.sitkInt8, np.int8), (sitk.sitkUInt16, np.uint16),
+    (sitk.sitkInt16, np.int16), (sitk.sitkUInt32, np.uint32), (sitk.sitkInt32, np.int32),
+    (sitk.sitkUInt64, np.uint64), (sitk.sitkInt64, np.int64), (sitk.sitkFloat32, np.float32),
+    (sitk.sitkFloat64, np.float64), (sitk.sitkComplexFloat32, np.complex64),
+    (sitk.sitkComplexFloat64, np.complex128))}
+
+_VECTOR_DATA_TYPES = {np.dtype(numpy_data_type): data_type for data_type, numpy_data_type in (
+    (sitk.sitkVectorUInt8, np.bool_), (sitk.sitkVectorUInt8, np.uint8), (sitk.sitkVectorInt8, np.int8),
+    (sitk.sitkVectorUInt16, np.uint16), (sitk.sitkVectorInt16, np.int16), (sitk.sitkVectorUInt32, np.uint32),
+    (sitk.sitkVectorInt32, np.int32), (sitk.sitkVectorUInt64, np.uint64), (sitk.sitkVectorInt64, np.int64),
+    (sitk.sitkVectorFloat32, np.float32), (sitk.sitkVectorFloat64, np.float64))}
+
+_TOLERANCE = 1e-5  # the rounding step of the equality of image properties
+
+
+def get_numpy_data_type(data_type: int, default=None) -> np.dtype:
     """Gets the numpy data type for a SimpleITK data type.
 
+    The numpy data type of a vector data type is the type of its components.
+
+    Notes
+        Earlier versions returned np.float32 for all data types except sitkUInt8 and sitkInt8. Pass
+        ``default=np.float32`` to get np.float32 instead of a ValueError for data types without numpy equivalent.
+
     Args:
         data_type (int): A SimpleITK data type.
+        default: The numpy data type returned for data types without numpy equivalent or None to raise an error.
 
     Returns:
         np.dtype: The numpy data type.
 
+    Raises:
+        ValueError: If the data type has no numpy equivalent (e.g. sitkUnknown or the label map types) and no
+            default is given.
+
     See Also:
         http://insightsoftwareconsortium.github.io/SimpleITK-Notebooks/01_Image_Basics.html
         https://docs.scipy.org/doc/numpy-1.12.0/user/basics.types.html
+    """
+    if data_type not in _NUMPY_DATA_TYPES:
+        if default is not None:
+            return np.dtype(default)
+        raise ValueError('data type {} has no numpy equivalent'.format(sitk.GetPixelIDValueAsString(data_type)))
+    return np.dtype(_NUMPY_DATA_TYPES[data_type])
+
+
+def get_simpleitk_data_type(data_type, is_vector: bool=False) -> int:
+    """Gets the SimpleITK data type for a numpy data type.
+
+    Args:
+        data_type: A numpy data type (e.g. np.int16 or np.dtype('int16')).
+        is_vector (bool): Whether to get the vector data type with components of the numpy data type.
+
+    Returns:
+        int: The SimpleITK data type.
+
+    Raises:
+        ValueError: If the data type has no SimpleITK equivalent.
+    """
+    data_types = _VECTOR_DATA_TYPES if is_vector else _SCALAR_DATA_TYPES
+    data_type = np.dtype(data_type)
+    if data_type not in data_types:
+        raise ValueError('data type {} has no SimpleITK {}equivalent'.format(data_type, 'vector ' if is_vector else ''))
+    return data_types[data_type]
+
+
+def get_label_data_type(maximum: int, minimum: int=0) -> np.dtype:
+    """Gets the smallest integer data type holding all labels in the range [minimum, maximum].
+
+    Args:
+        maximum (int): The largest label.
+        minimum (int): The smallest label.
+
+    Returns:
+        np.dtype: The unsigned integer data type if `minimum` is non-negative; otherwise, the signed one.
+    """
+    data_types = (np.uint8, np.uint16, np.uint32, np.uint64) if minimum >= 0 else \
+        (np.int8, np.int16, np.int32, np.int64)
+    for data_type in data_types:
+        info = np.iinfo(data_type)
+        if info.min <= minimum and maximum <= info.max:
+            return np.dtype(data_type)
+    raise ValueError('labels in [{}, {}] exceed the 64-bit integer range'.format(minimum, maximum))
+
+
+def get_compact_label_array(array: np.ndarray) -> np.ndarray:
+    """Converts a label array to the smallest sufficient integer data type.
+
+    Args:
+        array (np.ndarray): The label array of a boolean, integer, or integral-valued floating point data type.
+
+    Returns:
+        np.ndarray: The array itself if it already has the smallest data type (or a uint8 view of a boolean array);
+            otherwise, a converted copy.
+
+    Raises:
+        ValueError: If the array contains non-integral values.
+    """
+    if array.dtype == np.bool_:
+        return array.view(np.uint8)
+    if array.size == 0:
+        return array.astype(np.uint8)
+
+    if not np.issubdtype(array.dtype, np.integer):
+        if not np.issubdtype(array.dtype, np.floating) or not np.all(np.mod(array, 1) == 0):
+            raise ValueError('array contains non-integral labels')
+
+    data_type = get_label_data_type(int(array.max()), int(array.min()))
+    return array if array.dtype == data_type else array.astype(data_type)
+
+
+def get_size_in_bytes(image: sitk.Image) -> int:
+    """Gets the size of an image's pixel buffer.
+
+    Args:
+        image (sitk.Image): The image.
+
+    Returns:
+        int: The size in bytes.
+    """
+    return image.GetNumberOfPixels() * image.GetNumberOfComponentsPerPixel() * image.GetSizeOfPixelComponent()
 
-    TODO:
-        fabianbalsiger: complete list
+
+def create_image_array(properties: 'ImageProperties', dtype) -> Tuple[sitk.Image, np.ndarray]:
+    """Creates an image and a writable array of its pixel buffer, e.g. to fill the image without a copy.
+
+    The array needs to be filled before the image is copied or modified since copies of an image share the pixel
+    buffer until either is modified (copy-on-write).
+
+    Args:
+        properties (ImageProperties): The image properties.
+        dtype: The numpy data type of the pixels.
+
+    Returns:
+        tuple: The image and the array of shape=(z, y, x) or shape=(z, y, x, components).
     """
-    return {
-        sitk.sitkUInt8: np.uint8,
-        sitk.sitkInt8: np.int8,
-    }.get(data_type, np.float32)
+    image = sitk.Image(list(properties.size),
+                       get_simpleitk_data_type(dtype, properties.is_vector_image()),
+                       properties.number_of_components_per_pixel)
+    image.SetOrigin(properties.origin)
+    image.SetSpacing(properties.spacing)
+    image.SetDirection(properties.direction)
+    return image, np.asarray(_ImageBuffer(image, writable=True))
 
 
 class ImageProperties:
     """Represents ITK image properties.
 
     Holds common ITK image meta-data such as the size, origin, spacing, and direction.
+    Instances are immutable and use slots to keep the memory footprint small. Use :meth:`intern` to share one
+    instance between identical properties, e.g. when holding properties for many patches or samples.
+
+    Two properties are equal if their origin, spacing, and direction are equal after rounding to multiples of
+    :attr:`ImageProperties.TOLERANCE`, such that most rounding differences of image headers are ignored. This is not
+    an absolute tolerance: values close to each other but rounded to different multiples are unequal, and values
+    almost a multiple apart can be equal. The hash, which is computed once, includes the rounded values to be
+    consistent with the equality, such that e.g. patches of the same size but with different origins do not collide
+    in sets and dictionaries. Use :meth:`equals` to compare with an absolute tolerance.
 
     See Also:
         SimpleITK provides `itk::simple::Image::CopyInformation`_ to copy image information.
@@ -41,19 +202,158 @@ class ImageProperties:
         https://itk.org/SimpleITKDoxygen/html/classitk_1_1simple_1_1Image.html#afa8a4757400c414e809d1767ee616bd0
     """
 
-    def __init__(self, image: sitk.Image):
+    __slots__ = ('size', 'origin', 'spacing', 'direction', 'dimensions', 'number_of_components_per_pixel',
+                 'pixel_id', '_hash', '__weakref__')
+
+    TOLERANCE = _TOLERANCE  # the rounding step of the equality (a constant, reassigning it has no effect)
+
+    _registry = weakref.WeakValueDictionary()  # the interned properties
+
+    def __init__(self, image: Union[sitk.Image, sitk.ImageFileReader]):
         """Initializes a new instance of the ImageInformation class.
 
         Args:
-            image (sitk.Image): The image whose properties to hold.
+            image (Union[sitk.Image, sitk.ImageFileReader]): The image whose properties to hold or an image file
+                reader, which has read the image information (see :meth:`from_file`).
         """
-        self.size = image.GetSize()
-        self.origin = image.GetOrigin()
-        self.spacing = image.GetSpacing()
-        self.direction = image.GetDirection()
-        self.dimensions = image.GetDimension()
-        self.number_of_components_per_pixel = image.GetNumberOfComponentsPerPixel()
-        self.pixel_id = image.GetPixelID()
+        if isinstance(image, sitk.ImageFileReader):
+            number_of_components_per_pixel = image.GetNumberOfComponents()
+        else:
+            number_of_components_per_pixel = image.GetNumberOfComponentsPerPixel()
+
+        self._initialize(image.GetSize(), image.GetOrigin(), image.GetSpacing(), image.GetDirection(),
+                         image.GetDimension(), number_of_components_per_pixel, image.GetPixelID())
+
+    def _initialize(self, size, origin, spacing, direction, dimensions, number_of_components_per_pixel, pixel_id):
+        """Sets the (immutable) attributes."""
+
+        set_attribute = super().__setattr__
+        set_attribute('size', tuple(int(value) for value in size))
+        set_attribute('origin', tuple(float(value) for value in origin))
+        set_attribute('spacing', tuple(float(value) for value in spacing))
+        set_attribute('direction', tuple(float(value) for value in direction))
+        set_attribute('dimensions', int(dimensions))
+        set_attribute('number_of_components_per_pixel', int(number_of_components_per_pixel))
+        set_attribute('pixel_id', int(pixel_id))
+        set_attribute('_hash', hash(self._get_key()))
+
+    def _get_key(self) -> tuple:
+        """Gets the values compared by the equality, i.e. the origin, spacing, and direction rounded to multiples of
+        the tolerance."""
+
+        return (self.size, self.dimensions, _quantize(self.origin, _TOLERANCE), _quantize(self.spacing, _TOLERANCE),
+                _quantize(self.direction, _TOLERANCE))
+
+    @classmethod
+    def from_file(cls, path: str) -> 'ImageProperties':
+        """Reads the image properties from an image file's header without reading the pixel data.
+
+        Args:
+            path (str): The image file path.
+
+        Returns:
+            ImageProperties: The image properties.
+        """
+        reader = sitk.ImageFileReader()
+        reader.SetFileName(path)
+        reader.ReadImageInformation()
+        return cls(reader)
+
+    @classmethod
+    def from_files(cls, paths: list, max_workers: int=None) -> list:
+        """Reads the image properties from the headers of many image files concurrently.
+
+        Args:
+            paths (list): The image file paths.
+            max_workers (int): The maximum number of threads (default see ``ThreadPoolExecutor``).
+
+        Returns:
+            list: The ImageProperties in the order of the paths.
+        """
+        with ThreadPoolExecutor(max_workers) as executor:
+            return list(executor.map(cls.from_file, paths))
+
+    @classmethod
+    def from_dict(cls, values: dict) -> 'ImageProperties':
+        """Creates image properties from a dictionary (see :meth:`to_dict`).
+
+        Args:
+            values (dict): The property values by name.
+
+        Returns:
+            ImageProperties: The image properties.
+        """
+        properties = cls.__new__(cls)
+        properties._initialize(values['size'], values['origin'], values['spacing'], values['direction'],
+                               values['dimensions'], values['number_of_components_per_pixel'], values['pixel_id'])
+        return properties
+
+    @classmethod
+    def intern(cls, properties: 'ImageProperties') -> 'ImageProperties':
+        """Gets the shared instance of properties with exactly the same values.
+
+        The instances are registered as long as they are referenced anywhere.
+
+        Args:
+            properties (ImageProperties): The properties.
+
+        Returns:
+            ImageProperties: The shared instance, which is `properties` itself if no such instance exists.
+        """
+        key = (properties.size, properties.origin, properties.spacing, properties.direction, properties.dimensions,
+               properties.number_of_components_per_pixel, properties.pixel_id)
+        return cls._registry.setdefault(key, properties)
+
+    def transform_index_to_physical_point(self, index) -> tuple:
+        """Transforms a (continuous) index to a physical point.
+
+        Args:
+            index: The index in image order (x, y, z).
+
+        Returns:
+            tuple: The physical point.
+        """
+        direction = np.array(self.direction).reshape(self.dimensions, self.dimensions)
+        return tuple(float(value) for value in
+                     np.array(self.origin) + direction @ (np.asarray(index, dtype=np.float64) * self.spacing))
+
+    def get_region(self, index, size) -> 'ImageProperties':
+        """Gets the properties of an image region.
+
+        Args:
+            index: The start index of the region in image order (x, y, z).
+            size: The size of the region in image order (x, y, z).
+
+        Returns:
+            ImageProperties: The properties of the region, whose origin is the physical point of `index`.
+
+        Raises:
+            ValueError: If the region is not inside the image.
+        """
+        if len(index) != self.dimensions or len(size) != self.dimensions or \
+                any(start < 0 or length < 1 or start + length > image_length
+                    for start, length, image_length in zip(index, size, self.size)):
+            raise ValueError('region (index={}, size={}) is not inside the image of size {}'
+                             .format(tuple(index), tuple(size), self.size))
+
+        properties = self.__class__.__new__(self.__class__)
+        properties._initialize(size, self.transform_index_to_physical_point(index), self.spacing, self.direction,
+                               self.dimensions, self.number_of_components_per_pixel, self.pixel_id)
+        return properties
+
+    def to_dict(self) -> dict:
+        """Gets the properties as dictionary of plain Python types (e.g. to serialize them as JSON).
+
+        Returns:
+            dict: The property values by name.
+        """
+        return {'size': list(self.size),
+                'origin': list(self.origin),
+                'spacing': list(self.spacing),
+                'direction': list(self.direction),
+                'dimensions': self.dimensions,
+                'number_of_components_per_pixel': self.number_of_components_per_pixel,
+                'pixel_id': self.pixel_id}
 
     def is_two_dimensional(self) -> bool:
         """Determines whether the image is two-dimensional.
@@ -79,6 +379,60 @@ class ImageProperties:
         """
         return self.number_of_components_per_pixel > 1
 
+    def equals(self, other: 'ImageProperties', tolerance: float=None) -> bool:
+        """Determines the equality of two ImageProperties classes with a tolerance.
+
+        Notes
+            The equality does not include the number_of_components_per_pixel and pixel_id.
+            Unlike ``==``, the origin, spacing, and direction are compared with an absolute tolerance instead of
+            being rounded, which is not consistent with the hash.
+
+        Args:
+            other (ImageProperties): The other properties.
+            tolerance (float): The absolute tolerance of the origin, spacing, and direction
+                (default :attr:`ImageProperties.TOLERANCE`).
+
+        Returns:
+            bool: True if the ImageProperties are equal; otherwise, False.
+        """
+        if tolerance is None:
+            tolerance = _TOLERANCE
+
+        if self is other:
+            return True
+
+        return self.size == other.size and \
+            self.dimensions == other.dimensions and \
+            _is_close(self.origin, other.origin, tolerance) and \
+            _is_close(self.spacing, other.spacing, tolerance) and \
+            _is_close(self.direction, other.direction, tolerance)
+
+    def __setattr__(self, name, value):
+        """Prevents the modification of the properties.
+
+        Raises:
+            AttributeError: Always, since ImageProperties are immutable.
+        """
+        raise AttributeError('ImageProperties are immutable')
+
+    def __delattr__(self, name):
+        """Prevents the modification of the properties.
+
+        Raises:
+            AttributeError: Always, since ImageProperties are immutable.
+        """
+        raise AttributeError('ImageProperties are immutable')
+
+    def __reduce__(self):
+        """Supports pickling of the immutable instance."""
+        return ImageProperties.from_dict, (self.to_dict(), )
+
+    def __copy__(self):
+        return self  # immutable
+
+    def __deepcopy__(self, memo):
+        return self  # immutable
+
     def __str__(self):
         """Gets a printable string representation.
 
@@ -100,6 +454,8 @@ class ImageProperties:
 
         Notes
             The equality does not include the number_of_components_per_pixel and pixel_id.
+            The origin, spacing, and direction are equal after rounding to multiples of
+            :attr:`ImageProperties.TOLERANCE` (consistent with the hash), which is not an absolute tolerance.
 
         Args:
             other (object): An ImageProperties instance or any other object.
@@ -108,11 +464,7 @@ class ImageProperties:
             bool: True if the ImageProperties are equal; otherwise, False.
         """
         if isinstance(other, self.__class__):
-            return self.size == other.size and \
-                   self.origin == other.origin and \
-                   self.spacing == other.spacing and \
-                   self.direction == other.direction and \
-                   self.dimensions == other.dimensions
+            return self is other or (self._hash == other._hash and self._get_key() == other._get_key())
         return NotImplemented
 
     def __ne__(self, other):
@@ -137,7 +489,62 @@ class ImageProperties:
         Returns:
             int: The hash of the object.
         """
-        return hash(tuple(sorted(self.__dict__.items())))
+        return self._hash
+
+
+def _quantize(values: tuple, tolerance: float) -> tuple:
+    """Rounds a tuple of floats to multiples of a tolerance."""
+
+    return tuple(round(value / tolerance) for value in values)
+
+
+def _is_close(values: tuple, other_values: tuple, tolerance: float) -> bool:
+    """Determines whether two tuples of floats are equal within an absolute tolerance."""
+
+    return len(values) == len(other_values) and \
+        all(abs(value - other_value) <= tolerance for value, other_value in zip(values, other_values))
+
+
+class _ImageBuffer:
+    """Exposes the pixel buffer of a SimpleITK image through the NumPy array interface.
+
+    Arrays created from an instance (and all their views) reference the instance as their ``base``, which in turn
+    holds a reference to the image. Therefore, the buffer stays valid as long as any array or view exists.
+    """
+
+    def __init__(self, image: sitk.Image, writable: bool=False):
+        """Initializes a new instance of the _ImageBuffer class.
+
+        Args:
+            image (sitk.Image): The image.
+            writable (bool): Whether to expose the buffer writable instead of read-only. The buffer of the image
+                itself is exposed, which is only valid for images not copied or modified until the array is filled.
+        """
+        # accessing the buffer makes it unique (copy-on-write), i.e. the image no longer shares it with copies
+        array_interface = sitk.GetArrayViewFromImage(image).__array_interface__
+        if writable:
+            array_interface = dict(array_interface, data=(array_interface['data'][0], False))
+            self.image = image
+        else:
+            # a private shallow copy, which is never accessed non-const, owns the buffer: a later modification or
+            # view of the image makes the image copy the buffer instead of modifying or releasing this one
+            self.image = sitk.Image(image)
+        self.__array_interface__ = array_interface
+
+
+def _get_image_buffer(array: np.ndarray):
+    """Gets the image buffer if the array covers the whole pixel buffer of an image; otherwise, None."""
+
+    base = array.base
+    if not isinstance(base, _ImageBuffer) or not array.flags.c_contiguous:
+        return None
+
+    buffer_array = np.asarray(base)
+    if array.__array_interface__['data'][0] != buffer_array.__array_interface__['data'][0] or \
+            array.size != buffer_array.size or array.dtype != buffer_array.dtype:
+        return None
+
+    return base
 
 
 class NumpySimpleITKImageBridge:
@@ -146,7 +553,7 @@ class NumpySimpleITKImageBridge:
     """
 
     @staticmethod
-    def convert(array: np.ndarray, properties: ImageProperties) -> sitk.Image:
+    def convert(array: np.ndarray, properties: ImageProperties, is_label: bool=False, dtype=None) -> sitk.Image:
         """
         Converts a numpy array to a SimpleITK image.
 
@@ -157,10 +564,23 @@ class NumpySimpleITKImageBridge:
         :type array: np.ndarray
         :param properties: The image information.
         :type properties: ImageProperties
+        :param is_label: If True, the image gets the smallest integer pixel type holding the labels.
+        :type is_label: bool
+        :param dtype: The numpy data type to cast to (takes precedence over is_label) or None to keep the array's.
         :return: The SimpleITK image.
         :rtype: sitk.Image
+
+        An unmodified (read-only) view created by ``SimpleITKNumpyImageBridge.convert(image, view=True)`` is
+        converted without copying the pixel buffer if the properties have exactly the origin, spacing, and direction
+        of the viewed image. Otherwise, the array is copied once into the image.
         """
 
+        array = _cast(array, is_label, dtype)
+        image = NumpySimpleITKImageBridge._convert_view(array, properties,
+                                                        properties.number_of_components_per_pixel)
+        if image is not None:
+            return image
+
         if not array.shape == properties.size[::-1]:
             # we need to reshape the array
 
@@ -199,6 +619,11 @@ class NumpySimpleITKImageBridge:
         if array.ndim != 2:
             raise ValueError("array needs to be two-dimensional")
 
+        if array.shape[1] > 1:
+            image = NumpySimpleITKImageBridge._convert_view(array, properties, array.shape[1])
+            if image is not None:
+                return image
+
         array = array.reshape((properties.size[::-1] + (array.shape[1], )))
 
         image = sitk.GetImageFromArray(array)
@@ -208,6 +633,27 @@ class NumpySimpleITKImageBridge:
 
         return image
 
+    @staticmethod
+    def _convert_view(array: np.ndarray, properties: ImageProperties, number_of_components_per_pixel: int):
+        """Converts a view of a whole image buffer back to an image without copying the pixel buffer.
+
+        Returns:
+            sitk.Image: The image sharing the buffer or None if the array is not a view of a whole image buffer.
+        """
+
+        buffer = _get_image_buffer(array)
+        if buffer is None or buffer.image.GetSize() != tuple(properties.size) or \
+                buffer.image.GetNumberOfComponentsPerPixel() != number_of_components_per_pixel:
+            return None
+
+        # setting the geometry of a shallow copy would copy the buffer (copy-on-write), hence, only images with
+        # exactly the geometry of the properties are converted without copying
+        if buffer.image.GetOrigin() != properties.origin or buffer.image.GetSpacing() != properties.spacing or \
+                buffer.image.GetDirection() != properties.direction:
+            return None
+
+        return sitk.Image(buffer.image)  # shallow copy (copy-on-write)
+
 
 class SimpleITKNumpyImageBridge:
     """A SimpleITK to numpy bridge.
@@ -216,11 +662,20 @@ class SimpleITKNumpyImageBridge:
     """
 
     @staticmethod
-    def convert(image: sitk.Image) -> Tuple[np.ndarray, ImageProperties]:
+    def convert(image: sitk.Image, view: bool=False, is_label: bool=False,
+                dtype=None) -> Tuple[np.ndarray, ImageProperties]:
         """Converts an image to a numpy array and an ImageProperties class.
 
         Args:
             image (SimpleITK.Image): The image.
+            view (bool): If True, a read-only view of the image's pixel buffer is returned instead of a copy.
+                The buffer is kept alive by the view (and all views derived from it), even if the image is deleted.
+                Unlike sitk.GetArrayViewFromImage, later modifications of the image are not visible in the view
+                since the image copies the buffer before it is modified (copy-on-write), which also applies to
+                further views of the image. The unmodified view can be converted back without copying by the
+                ``NumpySimpleITKImageBridge``. A view is only returned if no cast is necessary.
+            is_label (bool): If True, the array gets the smallest integer data type holding the labels.
+            dtype: The numpy data type to cast to (takes precedence over is_label) or None to keep the image's.
 
         Returns:
             A Tuple[np.ndarray, ImageProperties]: The image as numpy array and the image properties.
@@ -232,4 +687,19 @@ class SimpleITKNumpyImageBridge:
         if image is None:
             raise ValueError('image can not be None')
 
+        if view or is_label or dtype is not None:
+            array = _cast(np.asarray(_ImageBuffer(image)), is_label, dtype)
+            if array.base is None or view:
+                return array, ImageProperties(image)  # converted copy or view
+
         return sitk.GetArrayFromImage(image), ImageProperties(image)
+
+
+def _cast(array: np.ndarray, is_label: bool, dtype) -> np.ndarray:
+    """Casts an array to a data type, to the smallest label data type, or returns it unchanged."""
+
+    if dtype is not None:
+        return array.astype(dtype, copy=False)
+    if is_label:
+        return get_compact_label_array(array)
+    return array
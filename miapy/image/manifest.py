@@ -0,0 +1,262 @@
+"""The manifest module holds a persistent index of the images of a dataset.
+
+The :class:`DatasetManifest` stores for each subject and modality the image path, the file's modification time and
+size, the :class:`image.ImageProperties`, and a content hash in a local SQLite database. Scanning the dataset only
+reads the headers (and hashes the content) of new or changed files, such that the metadata of large datasets is
+available within milliseconds after the first scan.
+
+Example usage:
+
+>>> manifest = DatasetManifest("/path/to/dataset/manifest.sqlite")
+>>> manifest.scan([("Subject1", "T1", "/path/to/dataset/Subject1/T1.mha"),
+>>>                ("Subject1", "T2", "/path/to/dataset/Subject1/T2.mha")])
+>>> entries = manifest.query(modality="T1", spacing=1.0)
+>>> entries[0].path, entries[0].properties.size
+"""
+import hashlib
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import miapy.image.image as img
+
+
+class ManifestEntry:
+    """Represents an image of a dataset manifest."""
+
+    def __init__(self, subject: str, modality: str, path: str, modification_time: int, file_size: int,
+                 properties: img.ImageProperties, checksum: str):
+        """Initializes a new instance of the ManifestEntry class.
+
+        Args:
+            subject (str): The subject.
+            modality (str): The modality (e.g. "T1" or "GroundTruth").
+            path (str): The image file path.
+            modification_time (int): The file's modification time in nanoseconds.
+            file_size (int): The file size in bytes.
+            properties (ImageProperties): The image properties.
+            checksum (str): The SHA-256 hash of the file content or None if not computed.
+        """
+        self.subject = subject
+        self.modality = modality
+        self.path = path
+        self.modification_time = modification_time
+        self.file_size = file_size
+        self.properties = properties
+        self.checksum = checksum
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'ManifestEntry:\n' \
+               ' subject:           {self.subject}\n' \
+               ' modality:          {self.modality}\n' \
+               ' path:              {self.path}\n' \
+               ' modification_time: {self.modification_time}\n' \
+               ' file_size:         {self.file_size}\n' \
+               ' checksum:          {self.checksum}\n' \
+            .format(self=self)
+
+
+class DatasetManifest:
+    """Represents a persistent index of the images of a dataset backed by SQLite."""
+
+    _COLUMNS = 'subject, modality, path, modification_time, file_size, checksum, properties'
+
+    def __init__(self, path: str):
+        """Initializes a new instance of the DatasetManifest class.
+
+        Args:
+            path (str): The path of the SQLite database (created if it does not exist) or ":memory:".
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute('CREATE TABLE IF NOT EXISTS images ('
+                                    'subject TEXT NOT NULL, '
+                                    'modality TEXT NOT NULL, '
+                                    'path TEXT NOT NULL, '
+                                    'modification_time INTEGER NOT NULL, '
+                                    'file_size INTEGER NOT NULL, '
+                                    'checksum TEXT, '
+                                    'properties TEXT NOT NULL, '
+                                    'spacing_x REAL, spacing_y REAL, spacing_z REAL, '
+                                    'size_x INTEGER, size_y INTEGER, size_z INTEGER, '
+                                    'PRIMARY KEY (subject, modality))')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS images_spacing '
+                                    'ON images (modality, spacing_x, spacing_y, spacing_z)')
+
+    def scan(self, entries, compute_checksums: bool=True, remove_missing: bool=False, max_workers: int=None) -> int:
+        """Updates the manifest with the images of the dataset.
+
+        Only new images and images whose path, modification time, or file size changed are read (header only)
+        and hashed. If `compute_checksums`, the missing checksums of unchanged images (e.g. of an earlier scan
+        without checksums) are computed as well.
+
+        Args:
+            entries: An iterable of (subject, modality, path) tuples.
+            compute_checksums (bool): Whether to compute the content hash of new, changed, or not yet hashed files.
+            remove_missing (bool): Whether to remove the images of the manifest, which are not in `entries`.
+            max_workers (int): The maximum number of threads reading the headers and hashing the files.
+
+        Returns:
+            int: The number of added or updated images (including images whose checksum was computed).
+        """
+
+        stored = {(subject, modality): (path, modification_time, file_size) for subject, modality, path,
+                  modification_time, file_size in self.connection.execute(
+                      'SELECT subject, modality, path, modification_time, file_size FROM images')}
+        not_hashed = set(self.connection.execute('SELECT subject, modality FROM images WHERE checksum IS NULL')) \
+            if compute_checksums else set()
+
+        changed = []
+        scanned = set()
+        for subject, modality, path in entries:
+            path = os.path.abspath(path)
+            stat = os.stat(path)
+            scanned.add((subject, modality))
+            if stored.get((subject, modality)) != (path, stat.st_mtime_ns, stat.st_size) or \
+                    (subject, modality) in not_hashed:
+                changed.append((subject, modality, path, stat.st_mtime_ns, stat.st_size))
+
+        def read(entry):
+            subject, modality, path, modification_time, file_size = entry
+            checksum = get_checksum(path) if compute_checksums else None
+            return ManifestEntry(subject, modality, path, modification_time, file_size,
+                                 img.ImageProperties.from_file(path), checksum)
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            updates = list(executor.map(read, changed))
+
+        with self.connection:
+            self.connection.executemany('INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                        [_to_row(entry) for entry in updates])
+            if remove_missing:
+                self.connection.executemany('DELETE FROM images WHERE subject = ? AND modality = ?',
+                                            [key for key in stored if key not in scanned])
+
+        return len(updates)
+
+    def get(self, subject: str, modality: str) -> ManifestEntry:
+        """Gets an image of the manifest.
+
+        Args:
+            subject (str): The subject.
+            modality (str): The modality.
+
+        Returns:
+            ManifestEntry: The image or None if it is not in the manifest.
+        """
+        row = self.connection.execute('SELECT {} FROM images WHERE subject = ? AND modality = ?'
+                                      .format(DatasetManifest._COLUMNS), (subject, modality)).fetchone()
+        return None if row is None else _from_row(row)
+
+    def query(self, subject: str=None, modality: str=None, spacing=None, size=None,
+              tolerance: float=1e-5) -> list:
+        """Queries the images of the manifest.
+
+        Args:
+            subject (str): The subject or None for all subjects.
+            modality (str): The modality or None for all modalities.
+            spacing: The spacing as float (isotropic, matching two- and three-dimensional images) or tuple (matching
+                images of its dimension), or None for any spacing.
+            size (tuple): The image size (matching images of its dimension) or None for any size.
+            tolerance (float): The absolute tolerance of the spacing comparison.
+
+        Returns:
+            list: The matching images (ManifestEntry) ordered by subject and modality.
+        """
+        conditions = []
+        parameters = []
+
+        if subject is not None:
+            conditions.append('subject = ?')
+            parameters.append(subject)
+        if modality is not None:
+            conditions.append('modality = ?')
+            parameters.append(modality)
+        if spacing is not None:
+            if not hasattr(spacing, '__iter__'):
+                # two-dimensional images have no z spacing
+                conditions.append('spacing_x BETWEEN ? AND ? AND spacing_y BETWEEN ? AND ? AND '
+                                  '(spacing_z IS NULL OR spacing_z BETWEEN ? AND ?)')
+                parameters += [spacing - tolerance, spacing + tolerance] * 3
+            else:
+                _add_axis_conditions(conditions, parameters, 'spacing', 'BETWEEN ? AND ?',
+                                     [(value - tolerance, value + tolerance) for value in spacing])
+        if size is not None:
+            _add_axis_conditions(conditions, parameters, 'size', '= ?', [(value, ) for value in size])
+
+        statement = 'SELECT {} FROM images'.format(DatasetManifest._COLUMNS)
+        if conditions:
+            statement += ' WHERE ' + ' AND '.join(conditions)
+        statement += ' ORDER BY subject, modality'
+
+        return [_from_row(row) for row in self.connection.execute(statement, parameters)]
+
+    def close(self):
+        """Closes the database connection."""
+        self.connection.close()
+
+    def __len__(self):
+        """Gets the number of images.
+
+        Returns:
+            int: The number of images.
+        """
+        return self.connection.execute('SELECT COUNT(*) FROM images').fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def get_checksum(path: str, block_size: int=2 ** 20) -> str:
+    """Gets the SHA-256 hash of a file's content.
+
+    Args:
+        path (str): The file path.
+        block_size (int): The number of bytes to read at once.
+
+    Returns:
+        str: The hexadecimal hash.
+    """
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def _add_axis_conditions(conditions: list, parameters: list, column: str, condition: str, values: list):
+    """Adds a condition per axis of a column, where the axes beyond the dimension of the values need to be NULL."""
+
+    for axis_index, axis in enumerate('xyz'):
+        if axis_index < len(values):
+            conditions.append('{}_{} {}'.format(column, axis, condition))
+            parameters += values[axis_index]
+        else:
+            conditions.append('{}_{} IS NULL'.format(column, axis))
+
+
+def _to_row(entry: ManifestEntry) -> tuple:
+    """Converts an entry to a database row."""
+
+    spacing = (tuple(entry.properties.spacing) + (None, ) * 3)[:3]
+    size = (tuple(entry.properties.size) + (None, ) * 3)[:3]
+    return (entry.subject, entry.modality, entry.path, entry.modification_time, entry.file_size, entry.checksum,
+            json.dumps(entry.properties.to_dict())) + spacing + size
+
+
+def _from_row(row: tuple) -> ManifestEntry:
+    """Converts a database row to an entry."""
+
+    subject, modality, path, modification_time, file_size, checksum, properties = row
+    return ManifestEntry(subject, modality, path, modification_time, file_size,
+                         img.ImageProperties.from_dict(json.loads(properties)), checksum)
@@ -0,0 +1,396 @@
+"""The patch module enables the patch-wise processing of large images.
+
+The patch samplers lazily extract patches (e.g. for training or inference) from the arrays of one or multiple
+modalities with the same :class:`image.ImageProperties`. The arrays are in the layout of the
+``SimpleITKNumpyImageBridge``, i.e. shape=(z, y, x) or shape=(z, y, x, components), and can be in-memory arrays,
+memory maps (e.g. of :class:`store.MemoryMappedImageReader`), or region readers of the :mod:`image.store` module.
+The patches of arrays are views (no copies), such that the memory does not depend on the image size. The patches
+are yielded in batches, which hold the start index and the physical origin of each patch.
+
+The :class:`PatchAccumulator` reassembles (e.g. predicted) patches into an image. It preallocates the output and
+weight buffers once and adds the patches in place, where overlapping patches are averaged or weighted by a Gaussian
+(which emphasizes the patch centers). Multiple threads can add patches concurrently.
+
+Example usage:
+
+>>> sampler = GridPatchSampler(patch_size=(32, 32, 32), stride=(16, 16, 16), batch_size=8)
+>>> for batch in sampler.sample([t1_array, t2_array], properties):
+>>>     data = batch.stack()  # shape=(8, 2, 32, 32, 32)
+>>>     batch.indices, batch.origins  # start indices (x, y, z) and physical origins of the patches
+>>>
+>>> accumulator = PatchAccumulator(properties, weighting="gaussian")
+>>> for batch in sampler.sample([t1_array, t2_array], properties):
+>>>     accumulator.add_batch(model.predict(batch.stack()), batch.indices)  # predictions of shape=(8, 32, 32, 32)
+>>> prediction = accumulator.get_image()
+"""
+import itertools
+import threading
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+
+import miapy.image.image as img
+
+
+class PatchBatch:
+    """Represents a batch of patches."""
+
+    def __init__(self, indices: np.ndarray, origins: np.ndarray, patches: list):
+        """Initializes a new instance of the PatchBatch class.
+
+        Args:
+            indices (np.ndarray): The start indices in image order (x, y, z) of shape=(patches, dimensions).
+            origins (np.ndarray): The physical origins of shape=(patches, dimensions).
+            patches (list): A tuple per patch with the patch of each modality (views of arrays).
+        """
+        self.indices = indices
+        self.origins = origins
+        self.patches = patches
+
+    def __len__(self):
+        """Gets the number of patches.
+
+        Returns:
+            int: The number of patches.
+        """
+        return len(self.patches)
+
+    def stack(self, out: np.ndarray=None) -> np.ndarray:
+        """Stacks the patches into an array.
+
+        Args:
+            out (np.ndarray): A preallocated array to reuse across batches or None. An array larger than the batch
+                (e.g. of a full batch for the last, smaller batch) is filled from the start.
+
+        Returns:
+            np.ndarray: The patches of shape=(patches, modalities, z, y, x) or (patches, modalities, z, y, x,
+                components).
+        """
+        first = self.patches[0][0]
+        shape = (len(self.patches), len(self.patches[0])) + first.shape
+        if out is None:
+            out = np.empty(shape, dtype=first.dtype)
+        elif out.shape[1:] != shape[1:] or out.shape[0] < shape[0]:
+            raise ValueError('out needs to be of shape {}'.format(shape))
+
+        for i, patch in enumerate(self.patches):
+            for j, modality in enumerate(patch):
+                out[i, j] = modality
+        return out[:len(self.patches)]
+
+
+class IPatchSampler(metaclass=ABCMeta):
+    """Represents a patch sampler."""
+
+    def __init__(self, patch_size: tuple, batch_size: int=1):
+        """Initializes a new instance of the IPatchSampler class.
+
+        Args:
+            patch_size (tuple): The patch size in image order (x, y, z).
+            batch_size (int): The (maximum) number of patches per batch.
+        """
+        if batch_size < 1:
+            raise ValueError('batch_size must be at least 1')
+        if any(length < 1 for length in patch_size):
+            raise ValueError('patch_size must be positive')
+
+        self.patch_size = tuple(patch_size)
+        self.batch_size = batch_size
+
+    @abstractmethod
+    def get_indices(self, properties: img.ImageProperties):
+        """Lazily generates the start indices of the patches.
+
+        Args:
+            properties (ImageProperties): The image properties.
+
+        Yields:
+            tuple: The start index of a patch in image order (x, y, z).
+        """
+        raise NotImplementedError()
+
+    def sample(self, arrays: list, properties: img.ImageProperties):
+        """Lazily samples batches of patches.
+
+        Args:
+            arrays (list): The arrays (or region readers, see :class:`store.IImageRegionReader`) of the modalities.
+            properties (ImageProperties): The image properties.
+
+        Yields:
+            PatchBatch: A batch of patches.
+        """
+        self._check_size(properties)
+        slicers = [_get_slicer(array, self.patch_size) for array in arrays]
+        direction = np.array(properties.direction).reshape(properties.dimensions, properties.dimensions)
+
+        indices = iter(self.get_indices(properties))
+        while True:
+            batch_indices = list(itertools.islice(indices, self.batch_size))
+            if not batch_indices:
+                return
+
+            batch_indices = np.array(batch_indices, dtype=np.int64)
+            origins = np.array(properties.origin) + (batch_indices * properties.spacing) @ direction.T
+            patches = [tuple(slicer(index) for slicer in slicers) for index in batch_indices]
+            yield PatchBatch(batch_indices, origins, patches)
+
+    def _check_size(self, properties: img.ImageProperties):
+        """Checks that the patch fits into the image."""
+
+        if len(self.patch_size) != properties.dimensions or \
+                any(length > image_length for length, image_length in zip(self.patch_size, properties.size)):
+            raise ValueError('patch size {} does not fit into the image of size {}'
+                             .format(self.patch_size, properties.size))
+
+
+class GridPatchSampler(IPatchSampler):
+    """Represents a sampler of patches on a regular grid (sliding window).
+
+    The last patch along each axis is aligned with the image border, such that the patches cover the whole image.
+    """
+
+    def __init__(self, patch_size: tuple, stride: tuple=None, batch_size: int=1):
+        """Initializes a new instance of the GridPatchSampler class.
+
+        Args:
+            patch_size (tuple): The patch size in image order (x, y, z).
+            stride (tuple): The distance between the patches in image order (x, y, z). Defaults to the patch size,
+                i.e. non-overlapping patches. A smaller stride results in overlapping patches (sliding window).
+            batch_size (int): The (maximum) number of patches per batch.
+        """
+        super().__init__(patch_size, batch_size)
+        self.stride = self.patch_size if stride is None else tuple(stride)
+        if len(self.stride) != len(self.patch_size) or any(step < 1 for step in self.stride):
+            raise ValueError('stride must be positive and of the same dimension as patch_size')
+
+    def get_indices(self, properties: img.ImageProperties):
+        """Lazily generates the start indices of the patches (x varying fastest).
+
+        Args:
+            properties (ImageProperties): The image properties.
+
+        Yields:
+            tuple: The start index of a patch in image order (x, y, z).
+        """
+        self._check_size(properties)
+        starts = [get_grid_starts(image_length, length, step)
+                  for image_length, length, step in zip(properties.size, self.patch_size, self.stride)]
+        for index in itertools.product(*reversed(starts)):
+            yield tuple(reversed(index))
+
+    def get_number_of_patches(self, properties: img.ImageProperties) -> int:
+        """Gets the number of patches.
+
+        Args:
+            properties (ImageProperties): The image properties.
+
+        Returns:
+            int: The number of patches.
+        """
+        return int(np.prod([len(get_grid_starts(image_length, length, step))
+                            for image_length, length, step in zip(properties.size, self.patch_size, self.stride)]))
+
+
+class RandomPatchSampler(IPatchSampler):
+    """Represents a sampler of uniformly random patches."""
+
+    def __init__(self, patch_size: tuple, number_of_patches: int, batch_size: int=1, seed: int=None):
+        """Initializes a new instance of the RandomPatchSampler class.
+
+        Args:
+            patch_size (tuple): The patch size in image order (x, y, z).
+            number_of_patches (int): The number of patches per image.
+            batch_size (int): The (maximum) number of patches per batch.
+            seed (int): The seed of the random number generator.
+        """
+        super().__init__(patch_size, batch_size)
+        self.number_of_patches = number_of_patches
+        self.random_state = np.random.RandomState(seed)
+
+    def get_indices(self, properties: img.ImageProperties):
+        """Lazily generates the random start indices of the patches.
+
+        Args:
+            properties (ImageProperties): The image properties.
+
+        Yields:
+            tuple: The start index of a patch in image order (x, y, z).
+        """
+        self._check_size(properties)
+        high = np.array(properties.size) - self.patch_size + 1
+        for start in range(0, self.number_of_patches, self.batch_size):
+            count = min(self.batch_size, self.number_of_patches - start)
+            for index in self.random_state.randint(0, high, (count, len(high))):
+                yield tuple(int(value) for value in index)
+
+
+class PatchAccumulator:
+    """Represents an accumulator of (overlapping) patches into an image."""
+
+    WEIGHTINGS = ('average', 'gaussian')
+
+    def __init__(self, properties: img.ImageProperties, number_of_components: int=1, weighting: str='average',
+                 sigma_scale: float=0.125, dtype=np.float32, number_of_locks: int=0):
+        """Initializes a new instance of the PatchAccumulator class.
+
+        Args:
+            properties (ImageProperties): The properties of the image to reassemble.
+            number_of_components (int): The number of components per voxel of the patches (e.g. class
+                probabilities). The patches of a vector image have the shape=(z, y, x, components).
+            weighting (str): The weighting of overlapping patches, i.e. 'average' or 'gaussian'.
+            sigma_scale (float): The standard deviation of the Gaussian weighting relative to the patch size.
+            dtype: The data type of the output and weight buffers.
+            number_of_locks (int): The number of locks of slabs along the z-axis (or y-axis of 2-D images) to add
+                patches from multiple threads or 0 if patches are added from a single thread.
+        """
+        if weighting not in PatchAccumulator.WEIGHTINGS:
+            raise ValueError('weighting must be one of {}'.format(PatchAccumulator.WEIGHTINGS))
+
+        self.properties = properties
+        self.number_of_components = number_of_components
+        self.weighting = weighting
+        self.sigma_scale = sigma_scale
+
+        shape = tuple(reversed(properties.size))
+        self.output = np.zeros(shape + ((number_of_components, ) if number_of_components > 1 else ()), dtype=dtype)
+        self.weights = np.zeros(shape, dtype=dtype)
+
+        self._locks = [threading.Lock() for _ in range(number_of_locks)]
+        self._slab_length = -(-shape[0] // number_of_locks) if number_of_locks > 0 else shape[0]
+        self._patch_weights = {}  # patch shape: weights
+        self._local = threading.local()  # scratch buffers of the threads
+
+    def add(self, patch: np.ndarray, index: tuple):
+        """Adds a patch in place.
+
+        Args:
+            patch (np.ndarray): The patch of shape=(z, y, x) or shape=(z, y, x, components).
+            index (tuple): The start index of the patch in image order (x, y, z).
+        """
+        spatial_shape = patch.shape[:self.properties.dimensions]
+        region = tuple(slice(int(start), int(start) + length) for start, length in zip(reversed(index), spatial_shape))
+        output, weights = self.output[region], self.weights[region]
+        if output.shape != patch.shape:
+            raise ValueError('patch of shape {} at index {} does not fit into the image'
+                             .format(patch.shape, tuple(index)))
+
+        if self.weighting == 'gaussian':
+            patch_weights = self._get_patch_weights(spatial_shape)
+            scratch = self._get_scratch(patch.shape)
+            np.multiply(patch, patch_weights[..., np.newaxis] if patch.ndim > patch_weights.ndim else patch_weights,
+                        out=scratch)
+            patch = scratch
+
+        locks = self._locks[region[0].start // self._slab_length:(region[0].stop - 1) // self._slab_length + 1]
+        for lock in locks:  # acquired in increasing order to avoid deadlocks
+            lock.acquire()
+        try:
+            np.add(output, patch, out=output)
+            if self.weighting == 'gaussian':
+                np.add(weights, patch_weights, out=weights)
+            else:
+                np.add(weights, 1, out=weights)
+        finally:
+            for lock in locks:
+                lock.release()
+
+    def add_batch(self, patches: np.ndarray, indices: np.ndarray):
+        """Adds a batch of patches in place.
+
+        Args:
+            patches (np.ndarray): The patches of shape=(patches, z, y, x) or shape=(patches, z, y, x, components).
+            indices (np.ndarray): The start indices in image order (x, y, z) of shape=(patches, dimensions), e.g.
+                ``PatchBatch.indices``.
+        """
+        for patch, index in zip(patches, indices):
+            self.add(patch, index)
+
+    def normalize(self) -> np.ndarray:
+        """Normalizes the accumulated patches in place by their weights; voxels without patches are zero.
+
+        Returns:
+            np.ndarray: The normalized output buffer.
+        """
+        weights = self.weights[..., np.newaxis] if self.output.ndim > self.weights.ndim else self.weights
+        np.divide(self.output, weights, out=self.output, where=weights > 0)
+        self.weights[...] = np.where(self.weights > 0, 1, 0)
+        return self.output
+
+    def get_image(self, dtype=None):
+        """Normalizes the accumulated patches and converts them to an image with the geometry of the properties.
+
+        Args:
+            dtype: The numpy data type of the image or None to keep the one of the buffers.
+
+        Returns:
+            sitk.Image: The image.
+        """
+        array = self.normalize()
+        if dtype is not None:
+            array = array.astype(dtype)
+        if self.number_of_components > 1:
+            return img.NumpySimpleITKImageBridge.convert_to_vector_image(
+                array.reshape((-1, self.number_of_components)), self.properties)
+        return img.NumpySimpleITKImageBridge.convert(array, self.properties)
+
+    def _get_patch_weights(self, shape: tuple) -> np.ndarray:
+        """Gets the Gaussian weights of a patch shape."""
+
+        weights = self._patch_weights.get(shape)
+        if weights is None:
+            weights = np.ones((), dtype=self.weights.dtype)
+            for length in shape:
+                x = np.arange(length) - (length - 1) / 2
+                sigma = max(self.sigma_scale * length, 1e-3)
+                weights = np.multiply.outer(weights, np.exp(-x ** 2 / (2 * sigma ** 2)))
+            weights = (weights / weights.max()).astype(self.weights.dtype)
+            self._patch_weights[shape] = weights
+        return weights
+
+    def _get_scratch(self, shape: tuple) -> np.ndarray:
+        """Gets the scratch buffer of the current thread for weighting a patch."""
+
+        scratch = getattr(self._local, 'scratch', None)
+        if scratch is None or scratch.shape != shape:
+            scratch = self._local.scratch = np.empty(shape, dtype=self.output.dtype)
+        return scratch
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'PatchAccumulator:\n' \
+               ' weighting:            {self.weighting}\n' \
+               ' number_of_components: {self.number_of_components}\n' \
+               ' number_of_locks:      {number_of_locks}\n' \
+            .format(self=self, number_of_locks=len(self._locks))
+
+
+def get_grid_starts(image_length: int, length: int, step: int) -> list:
+    """Gets the start indices of patches along an axis, where the last patch is aligned with the border.
+
+    Args:
+        image_length (int): The image size along the axis.
+        length (int): The patch size along the axis.
+        step (int): The stride along the axis.
+
+    Returns:
+        list: The start indices.
+    """
+    starts = list(range(0, image_length - length + 1, step))
+    if starts[-1] != image_length - length:
+        starts.append(image_length - length)
+    return starts
+
+
+def _get_slicer(array, patch_size: tuple):
+    """Gets a function extracting the patch at a start index (image order) from an array or region reader."""
+
+    if hasattr(array, 'read_array'):
+        return lambda index: array.read_array(tuple(int(value) for value in index), patch_size)
+
+    def slicer(index):
+        return array[tuple(slice(start, start + length) for start, length in zip(index[::-1], patch_size[::-1]))]
+    return slicer
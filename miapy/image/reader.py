@@ -0,0 +1,152 @@
+"""The reader module enables overlapping image reading with processing.
+
+The :class:`PrefetchingReader` iterates over the subjects of a dataset and reads the images of the next subjects on
+a thread pool while the current subject is processed. The reading (I/O and decompression) releases the GIL, such
+that it is hidden behind the processing. The number of prefetched subjects and the memory they occupy are bounded.
+
+Example usage:
+
+>>> subjects = [{"T1": "/path/to/Subject1/T1.mha", "GroundTruth": "/path/to/Subject1/GroundTruth.mha"},
+>>>             {"T1": "/path/to/Subject2/T1.mha", "GroundTruth": "/path/to/Subject2/GroundTruth.mha"}]
+>>> for images in PrefetchingReader(subjects, prefetch_depth=2):
+>>>     evaluator.evaluate(images["T1"], images["GroundTruth"], "Subject")
+"""
+import collections
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.image.image as img
+
+_END = object()
+_UNKNOWN_ITEMSIZE = 8  # the estimated size of a pixel component without numpy equivalent (e.g. of label maps)
+
+
+class PrefetchingReader:
+    """Represents an iterable reader, which reads the next subjects in the background."""
+
+    def __init__(self, subjects: list, prefetch_depth: int=2, max_bytes: int=None, as_arrays: bool=False,
+                 pixel_type: int=sitk.sitkUnknown, max_workers: int=None):
+        """Initializes a new instance of the PrefetchingReader class.
+
+        Args:
+            subjects (list): The file groups of the subjects. A group is a path, a list of paths, or a dictionary
+                of paths (e.g. by modality). The images are yielded in the same structure.
+            prefetch_depth (int): The maximum number of subjects read ahead of the current one.
+            max_bytes (int): The maximum (estimated from the image headers) size of the subjects read ahead of the
+                current one in bytes or None for no limit. The current subject is always read.
+            as_arrays (bool): If True, (np.ndarray, ImageProperties) tuples are yielded instead of images
+                (see ``SimpleITKNumpyImageBridge``).
+            pixel_type (int): The SimpleITK pixel type to read the images as (sitkUnknown keeps the file's type).
+            max_workers (int): The maximum number of reading threads.
+        """
+        if prefetch_depth < 1:
+            raise ValueError('prefetch_depth must be at least 1')
+
+        self.subjects = subjects
+        self.prefetch_depth = prefetch_depth
+        self.max_bytes = max_bytes
+        self.as_arrays = as_arrays
+        self.pixel_type = pixel_type
+        self.max_workers = max_workers
+
+    def __len__(self):
+        """Gets the number of subjects.
+
+        Returns:
+            int: The number of subjects.
+        """
+        return len(self.subjects)
+
+    def __iter__(self):
+        """Iterates over the subjects.
+
+        Yields:
+            The images of a subject in the structure of its file group.
+        """
+        pending = collections.deque()  # (futures, estimated size) of the next subject and the subjects read ahead
+        subjects = iter(self.subjects)
+        next_subject = next(subjects, _END)
+
+        executor = ThreadPoolExecutor(self.max_workers)
+        try:
+            while True:
+                # read the next subject and ahead of it as long as the depth and memory budget allow it
+                while next_subject is not _END and len(pending) < self.prefetch_depth + 1:
+                    size = self._estimate_size_in_bytes(next_subject)
+                    if len(pending) > 0 and self.max_bytes is not None and \
+                            sum(size_ for _, size_ in itertools.islice(pending, 1, None)) + size > self.max_bytes:
+                        break
+                    pending.append((self._submit(executor, next_subject), size))
+                    next_subject = next(subjects, _END)
+
+                if not pending:
+                    return
+
+                futures, _ = pending.popleft()
+                yield _map(lambda future: future.result(), futures)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _submit(self, executor: ThreadPoolExecutor, group):
+        """Submits the reading of the images of a file group."""
+
+        return _map(lambda path: executor.submit(self._read, path), group)
+
+    def _read(self, path: str):
+        """Reads an image."""
+
+        image = sitk.ReadImage(path, self.pixel_type)
+        return img.SimpleITKNumpyImageBridge.convert(image, view=True) if self.as_arrays else image
+
+    def _estimate_size_in_bytes(self, group) -> int:
+        """Estimates the size of the images of a file group from the image headers."""
+
+        if self.max_bytes is None:
+            return 0
+
+        size = 0
+        for path in _flatten(group):
+            properties = img.ImageProperties.from_file(path)
+            pixel_type = properties.pixel_id if self.pixel_type == sitk.sitkUnknown else self.pixel_type
+            try:
+                itemsize = img.get_numpy_data_type(pixel_type).itemsize
+            except ValueError:
+                itemsize = _UNKNOWN_ITEMSIZE
+            size += int(np.prod(properties.size)) * properties.number_of_components_per_pixel * itemsize
+        return size
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'PrefetchingReader:\n' \
+               ' subjects:       {subjects}\n' \
+               ' prefetch_depth: {self.prefetch_depth}\n' \
+               ' max_bytes:      {self.max_bytes}\n' \
+               ' as_arrays:      {self.as_arrays}\n' \
+            .format(self=self, subjects=len(self.subjects))
+
+
+def _map(function, group):
+    """Applies a function to the paths of a file group keeping its structure."""
+
+    if isinstance(group, dict):
+        return {key: function(value) for key, value in group.items()}
+    if isinstance(group, (list, tuple)):
+        return [function(value) for value in group]
+    return function(group)
+
+
+def _flatten(group) -> list:
+    """Gets the paths of a file group."""
+
+    if isinstance(group, dict):
+        return list(group.values())
+    if isinstance(group, (list, tuple)):
+        return list(group)
+    return [group]
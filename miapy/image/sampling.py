@@ -0,0 +1,168 @@
+"""The sampling module enables the stratified sampling of voxels, e.g. to build training sets.
+
+The :class:`StratifiedVoxelSampler` draws a number of voxels per label uniformly without replacement from the label
+maps of one or multiple subjects. The label maps are streamed once in chunks: each voxel gets a random key and the
+voxels with the smallest keys per label are kept (reservoir sampling), such that the memory is proportional to the
+sample size and the chunk size instead of the image size. The sampled voxels are returned as compact arrays of
+subject indices and flat voxel indices (in the order of the flattened arrays of the ``SimpleITKNumpyImageBridge``),
+which can be used to gather the voxels from images or from feature arrays of shape=(n, v).
+
+Example usage:
+
+>>> sampler = StratifiedVoxelSampler({0: 1000, 1: 500, 2: 500}, seed=0)
+>>> for ground_truth in PrefetchingReader(ground_truth_paths):
+>>>     sampler.add(ground_truth)
+>>> samples = sampler.get_samples()
+>>> subjects, indices = samples[1]  # the subject and voxel index of each sampled voxel of label 1
+>>> features_of_label = features[sampler.get_subject_indices(0)[1]]  # features of label 1 of subject 0
+"""
+from typing import Union
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.image.image as img
+
+
+class _Reservoir:
+    """Holds the voxels with the smallest random keys of a label."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.keys = np.empty(0, dtype=np.float64)
+        self.subjects = np.empty(0, dtype=np.int64)
+        self.indices = np.empty(0, dtype=np.int64)
+
+    @property
+    def threshold(self) -> float:
+        """float: The key a voxel needs to undercut to enter the reservoir."""
+        if self.size == 0:
+            return -np.inf
+        return self.keys.max() if len(self.keys) == self.size else np.inf
+
+    def add(self, keys: np.ndarray, subject: int, indices: np.ndarray):
+        """Adds candidate voxels and keeps the ones with the smallest keys."""
+
+        if len(keys) > self.size:
+            selection = np.argpartition(keys, self.size - 1)[:self.size]
+            keys, indices = keys[selection], indices[selection]
+
+        self.keys = np.concatenate([self.keys, keys])
+        self.subjects = np.concatenate([self.subjects, np.full(len(keys), subject, dtype=np.int64)])
+        self.indices = np.concatenate([self.indices, indices])
+
+        if len(self.keys) > self.size:
+            selection = np.argpartition(self.keys, self.size - 1)[:self.size]
+            self.keys, self.subjects, self.indices = self.keys[selection], self.subjects[selection], \
+                self.indices[selection]
+
+
+class StratifiedVoxelSampler:
+    """Represents a one-pass sampler of a number of voxels per label across subjects."""
+
+    def __init__(self, number_of_samples: Union[int, dict], chunk_size: int=2 ** 20, seed: int=None):
+        """Initializes a new instance of the StratifiedVoxelSampler class.
+
+        Args:
+            number_of_samples (Union[int, dict]): The number of voxels to sample per label, either as dictionary
+                of label: number (other labels are ignored) or as number for each label occurring in the label maps.
+                All voxels are sampled of labels with fewer voxels.
+            chunk_size (int): The number of voxels processed at once.
+            seed (int): The seed of the random number generator.
+        """
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be at least 1')
+
+        self.number_of_samples = number_of_samples
+        self.chunk_size = chunk_size
+        self.random_state = np.random.RandomState(seed)
+        self.number_of_subjects = 0
+        self.number_of_voxels = 0  # of the largest label map, to choose the index data type
+        self._reservoirs = {}  # label: _Reservoir
+
+    def add(self, label_map: Union[sitk.Image, np.ndarray]) -> int:
+        """Adds (the voxels of) the label map of the next subject.
+
+        Args:
+            label_map (Union[sitk.Image, np.ndarray]): The label map.
+
+        Returns:
+            int: The subject index of the label map.
+        """
+        if isinstance(label_map, sitk.Image):
+            label_map = img.SimpleITKNumpyImageBridge.convert(label_map, view=True)[0]
+        labels = np.asarray(label_map).reshape(-1)  # a view if possible
+
+        subject = self.number_of_subjects
+        for start in range(0, labels.size, self.chunk_size):
+            chunk = labels[start:start + self.chunk_size]
+            keys = self.random_state.random_sample(chunk.size)
+
+            chunk_labels = self.number_of_samples.keys() if isinstance(self.number_of_samples, dict) else \
+                np.unique(chunk).tolist()
+            for label in chunk_labels:
+                reservoir = self._get_reservoir(label)
+                # only voxels undercutting the current reservoir's largest key can enter it
+                positions = np.flatnonzero((chunk == label) & (keys < reservoir.threshold))
+                if positions.size > 0:
+                    reservoir.add(keys[positions], subject, positions + start)
+
+        self.number_of_subjects += 1
+        self.number_of_voxels = max(self.number_of_voxels, labels.size)
+        return subject
+
+    def get_samples(self) -> dict:
+        """Gets the sampled voxels.
+
+        Returns:
+            dict: The (subjects, indices) arrays by label, sorted by subject and index. The arrays have the smallest
+                unsigned integer data type holding the number of subjects and voxels.
+        """
+        subject_dtype = img.get_label_data_type(max(self.number_of_subjects - 1, 0))
+        index_dtype = img.get_label_data_type(max(self.number_of_voxels - 1, 0))
+
+        samples = {}
+        for label, reservoir in self._reservoirs.items():
+            order = np.lexsort((reservoir.indices, reservoir.subjects))
+            samples[label] = (reservoir.subjects[order].astype(subject_dtype),
+                              reservoir.indices[order].astype(index_dtype))
+        return samples
+
+    def get_subject_indices(self, subject: int) -> dict:
+        """Gets the sampled voxels of a subject.
+
+        Args:
+            subject (int): The subject index.
+
+        Returns:
+            dict: The voxel indices by label, sorted ascending.
+        """
+        return {label: indices[subjects == subject] for label, (subjects, indices) in self.get_samples().items()}
+
+    def reset(self):
+        """Removes all subjects and sampled voxels."""
+        self.number_of_subjects = 0
+        self.number_of_voxels = 0
+        self._reservoirs = {}
+
+    def _get_reservoir(self, label) -> _Reservoir:
+        """Gets the reservoir of a label."""
+
+        reservoir = self._reservoirs.get(label)
+        if reservoir is None:
+            size = self.number_of_samples[label] if isinstance(self.number_of_samples, dict) else \
+                self.number_of_samples
+            reservoir = self._reservoirs[label] = _Reservoir(size)
+        return reservoir
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'StratifiedVoxelSampler:\n' \
+               ' number_of_samples:  {self.number_of_samples}\n' \
+               ' chunk_size:         {self.chunk_size}\n' \
+               ' number_of_subjects: {self.number_of_subjects}\n' \
+            .format(self=self)
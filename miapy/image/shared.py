@@ -0,0 +1,212 @@
+"""The shared module enables the transport of images between processes through shared memory.
+
+Passing images or arrays to worker processes (e.g. with ``multiprocessing`` or ``concurrent.futures``) pickles and
+copies the pixel data through pipes. A :class:`SharedImage` places the pixel buffer in shared memory instead, such
+that only a small :class:`SharedImageDescriptor` (the name of the shared memory block, the array layout, and the
+:class:`image.ImageProperties`) is passed to the workers, which attach to the block and access the array without
+copying.
+
+The lifetime of the shared memory is explicit: the creating process owns the block and needs to unlink it when all
+workers are done (e.g. by using the shared image as context manager), while the workers only close their attachment.
+
+Example usage:
+
+>>> def work(descriptor):
+>>>     with SharedImage.attach(descriptor) as shared_image:
+>>>         array = shared_image.get_array()  # no copy
+>>>         result = array.mean()
+>>>         del array  # release the buffer before closing
+>>>     return result
+>>>
+>>> with SharedImage.from_image(image) as shared_image, ProcessPoolExecutor() as executor:
+>>>     result = executor.submit(work, shared_image.descriptor).result()
+"""
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.image.image as img
+
+
+class SharedImageDescriptor:
+    """Represents the picklable description of an image in shared memory."""
+
+    def __init__(self, name: str, shape: tuple, dtype: str, properties: img.ImageProperties):
+        """Initializes a new instance of the SharedImageDescriptor class.
+
+        Args:
+            name (str): The name of the shared memory block.
+            shape (tuple): The array shape, i.e. shape=(z, y, x) or shape=(z, y, x, components).
+            dtype (str): The array data type.
+            properties (ImageProperties): The image properties.
+        """
+        self.name = name
+        self.shape = tuple(shape)
+        self.dtype = dtype
+        self.properties = properties
+
+    @property
+    def size_in_bytes(self) -> int:
+        """int: The size of the pixel buffer in bytes."""
+        return int(np.prod(self.shape)) * np.dtype(self.dtype).itemsize
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'SharedImageDescriptor:\n' \
+               ' name:  {self.name}\n' \
+               ' shape: {self.shape}\n' \
+               ' dtype: {self.dtype}\n' \
+            .format(self=self)
+
+
+class SharedImage:
+    """Represents an image whose pixel buffer is in shared memory."""
+
+    def __init__(self, memory: shared_memory.SharedMemory, descriptor: SharedImageDescriptor, is_owner: bool):
+        """Initializes a new instance of the SharedImage class.
+
+        Use :meth:`from_image`, :meth:`from_array`, or :meth:`attach` to create an instance.
+
+        Args:
+            memory (SharedMemory): The shared memory block.
+            descriptor (SharedImageDescriptor): The descriptor.
+            is_owner (bool): Whether this instance created the block and is responsible for unlinking it.
+        """
+        self.memory = memory
+        self.descriptor = descriptor
+        self.is_owner = is_owner
+
+    @classmethod
+    def from_image(cls, image: sitk.Image) -> 'SharedImage':
+        """Copies an image into a new shared memory block.
+
+        Args:
+            image (sitk.Image): The image.
+
+        Returns:
+            SharedImage: The shared image owning the block.
+        """
+        return cls.from_array(*img.SimpleITKNumpyImageBridge.convert(image, view=True))
+
+    @classmethod
+    def from_array(cls, array: np.ndarray, properties: img.ImageProperties) -> 'SharedImage':
+        """Copies an array into a new shared memory block.
+
+        Args:
+            array (np.ndarray): The array in the layout of ``SimpleITKNumpyImageBridge``, i.e. shape=(z, y, x) or
+                shape=(z, y, x, components).
+            properties (ImageProperties): The image properties.
+
+        Returns:
+            SharedImage: The shared image owning the block.
+        """
+        memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        shared_image = cls(memory, SharedImageDescriptor(memory.name, array.shape, array.dtype.str, properties), True)
+        shared_array = shared_image.get_array()
+        shared_array[...] = array
+        del shared_array
+        return shared_image
+
+    @classmethod
+    def attach(cls, descriptor: SharedImageDescriptor, take_ownership: bool=False) -> 'SharedImage':
+        """Attaches to the shared memory block of a descriptor (e.g. in a worker process).
+
+        Args:
+            descriptor (SharedImageDescriptor): The descriptor.
+            take_ownership (bool): Whether to take over the responsibility for unlinking the block from the process
+                that created it, e.g. for a block created by a worker process that only closed it.
+
+        Returns:
+            SharedImage: The shared image, which owns the block if `take_ownership`.
+        """
+        return cls(_attach(descriptor.name), descriptor, take_ownership)
+
+    @property
+    def properties(self) -> img.ImageProperties:
+        """ImageProperties: The image properties."""
+        return self.descriptor.properties
+
+    def get_array(self) -> np.ndarray:
+        """Gets the array backed by the shared memory (no copy).
+
+        Modifications of the array are visible to all processes. The array (and all views of it) need to be deleted
+        before the shared image is closed.
+
+        Returns:
+            np.ndarray: The array.
+        """
+        return np.ndarray(self.descriptor.shape, dtype=self.descriptor.dtype, buffer=self.memory.buf)
+
+    def get_image(self) -> sitk.Image:
+        """Gets the image (the pixel buffer is copied once into the image).
+
+        Returns:
+            sitk.Image: The image.
+        """
+        array = self.get_array()
+        if self.properties.is_vector_image():
+            array = array.reshape((-1, self.properties.number_of_components_per_pixel))
+        image = img.NumpySimpleITKImageBridge.convert(array, self.properties)
+        del array
+        return image
+
+    def close(self):
+        """Closes the access of this process to the shared memory block."""
+        self.memory.close()
+
+    def unlink(self):
+        """Frees the shared memory block once all processes closed it.
+
+        Raises:
+            ValueError: If this instance does not own the block.
+        """
+        if not self.is_owner:
+            raise ValueError('only the owner can unlink the shared memory')
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        if self.is_owner:
+            self.unlink()
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'SharedImage:\n' \
+               ' name:     {self.descriptor.name}\n' \
+               ' shape:    {self.descriptor.shape}\n' \
+               ' dtype:    {self.descriptor.dtype}\n' \
+               ' is_owner: {self.is_owner}\n' \
+            .format(self=self)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attaches to a shared memory block without taking responsibility for its cleanup."""
+
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python >= 3.13
+    except TypeError:
+        pass
+
+    from multiprocessing import resource_tracker
+
+    # before Python 3.13, attaching registers the block at the resource tracker, which unlinks it when it shuts down.
+    # multiprocessing workers share the tracker of their parent (where the block is already registered), while a
+    # tracker started by this attach would unlink the block of the owner when this process exits
+    is_tracker_running = getattr(resource_tracker._resource_tracker, '_fd', None) is not None
+    memory = shared_memory.SharedMemory(name=name)
+    if os.name == 'posix' and not is_tracker_running:
+        resource_tracker.unregister(memory._name, 'shared_memory')
+    return memory
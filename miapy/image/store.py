@@ -0,0 +1,384 @@
+"""The store module provides image storage formats with random access to image regions.
+
+Compressed image files (e.g. .nii.gz or .mha) need to be decompressed and loaded completely to access a small region.
+The formats of this module store the pixel data such that reading a region (e.g. a patch or a slab) only touches
+the data of this region. The :class:`image.ImageProperties` are stored in a JSON sidecar file next to the data.
+
+- Memory-mapped images store the pixel data as uncompressed NumPy (.npy) file, which is memory-mapped for reading.
+  Region reads are views into the memory map, i.e. O(region size), and the operating system's page cache is
+  shared between processes reading the same file.
+- Chunked images split the pixel data into fixed-size chunks, which are compressed independently (zlib or lzma).
+  The sidecar holds the chunk index (offset and length of each chunk), such that region reads only decompress the
+  chunks they touch. The chunks are compressed in parallel.
+
+Example usage:
+
+>>> write_memory_mapped_image(sitk.ReadImage("/path/to/image.nii.gz"), "/path/to/image.npy")
+>>> reader = MemoryMappedImageReader("/path/to/image.npy")
+>>> patch = reader.read_array(index=(10, 20, 30), size=(32, 32, 32))  # np.ndarray view of shape=(32, 32, 32)
+>>> patch_image = reader.read_image(index=(10, 20, 30), size=(32, 32, 32))  # sitk.Image with physical origin
+>>> write_chunked_image(sitk.ReadImage("/path/to/image.nii.gz"), "/path/to/image.chunks", chunk_size=(64, 64, 64))
+>>> with ChunkedImageReader("/path/to/image.chunks") as reader:  # closes the file on exit
+>>>     slab = reader.read_array(index=(0, 0, 30), size=(256, 256, 1))  # decompresses a single row of chunks
+"""
+import itertools
+import json
+import lzma
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.image.image as img
+
+
+def get_sidecar_path(path: str) -> str:
+    """Gets the path of the JSON sidecar file holding the image properties of a stored image.
+
+    Args:
+        path (str): The path of the stored image.
+
+    Returns:
+        str: The sidecar path.
+    """
+    return path + '.json'
+
+
+def _write_sidecar(path: str, properties: img.ImageProperties, **kwargs):
+    """Writes the sidecar file with the image properties and further (format-specific) entries."""
+
+    with open(get_sidecar_path(path), 'w') as file:
+        json.dump(dict(properties=properties.to_dict(), **kwargs), file)
+
+
+def _read_sidecar(path: str) -> dict:
+    """Reads the sidecar file."""
+
+    with open(get_sidecar_path(path), 'r') as file:
+        sidecar = json.load(file)
+    sidecar['properties'] = img.ImageProperties.from_dict(sidecar['properties'])
+    return sidecar
+
+
+CODECS = ('zlib', 'lzma')
+
+
+def _compress(data: bytes, codec: str, level: int) -> bytes:
+    """Compresses data with a codec."""
+
+    if codec == 'zlib':
+        return zlib.compress(data, level)
+    return lzma.compress(data, preset=level)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    """Decompresses data with a codec."""
+
+    if codec == 'zlib':
+        return zlib.decompress(data)
+    return lzma.decompress(data)
+
+
+def _get_region_slices(properties: img.ImageProperties, index, size) -> tuple:
+    """Gets the array slices (in array order z, y, x) of an image region (index and size in image order x, y, z)."""
+
+    properties.get_region(index, size)  # validates the region
+    return tuple(slice(start, start + length) for start, length in zip(reversed(index), reversed(size)))
+
+
+class IImageRegionReader(metaclass=ABCMeta):
+    """Represents a reader of image regions.
+
+    Readers are context managers, which call :meth:`close` on exit.
+    """
+
+    def __init__(self, properties: img.ImageProperties):
+        """Initializes a new instance of the IImageRegionReader class.
+
+        Args:
+            properties (ImageProperties): The properties of the whole image.
+        """
+        self.properties = properties
+
+    @abstractmethod
+    def read_array(self, index=None, size=None) -> np.ndarray:
+        """Reads an image region as array.
+
+        Args:
+            index: The start index of the region in image order (x, y, z) or None for the whole image.
+            size: The size of the region in image order (x, y, z) or None for the whole image.
+
+        Returns:
+            np.ndarray: The region in array order, i.e. shape=(z, y, x) or shape=(z, y, x, components).
+        """
+        raise NotImplementedError()
+
+    def read_image(self, index=None, size=None) -> sitk.Image:
+        """Reads an image region as image.
+
+        Args:
+            index: The start index of the region in image order (x, y, z) or None for the whole image.
+            size: The size of the region in image order (x, y, z) or None for the whole image.
+
+        Returns:
+            sitk.Image: The region, whose origin is the physical point of `index`.
+        """
+        index, size = self._get_region(index, size)
+        array = self.read_array(index, size)
+        if self.properties.is_vector_image():
+            array = array.reshape((-1, self.properties.number_of_components_per_pixel))
+        return img.NumpySimpleITKImageBridge.convert(array, self.properties.get_region(index, size))
+
+    def close(self):
+        """Releases the resources of the reader, e.g. open files."""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _get_region(self, index, size) -> (tuple, tuple):
+        """Gets the region, where None corresponds to the whole image."""
+
+        if index is None:
+            index = (0, ) * self.properties.dimensions
+        if size is None:
+            size = tuple(image_length - start for start, image_length in zip(index, self.properties.size))
+        return tuple(index), tuple(size)
+
+
+def write_memory_mapped_image(image: sitk.Image, path: str) -> str:
+    """Writes an image as memory-mappable NumPy file with a sidecar holding the image properties.
+
+    Args:
+        image (sitk.Image): The image.
+        path (str): The file path (the extension .npy is appended if necessary).
+
+    Returns:
+        str: The file path.
+    """
+
+    if not path.endswith('.npy'):
+        path += '.npy'
+
+    array, properties = img.SimpleITKNumpyImageBridge.convert(image, view=True)
+
+    memory_map = np.lib.format.open_memmap(path, mode='w+', dtype=array.dtype, shape=array.shape)
+    memory_map[...] = array
+    memory_map.flush()
+    del memory_map
+
+    _write_sidecar(path, properties)
+    return path
+
+
+def convert_to_memory_mapped_image(source_path: str, path: str) -> str:
+    """Converts an image file to a memory-mappable NumPy file with a sidecar holding the image properties.
+
+    Args:
+        source_path (str): The path of the image file (any format readable by SimpleITK).
+        path (str): The file path (the extension .npy is appended if necessary).
+
+    Returns:
+        str: The file path.
+    """
+    return write_memory_mapped_image(sitk.ReadImage(source_path), path)
+
+
+class MemoryMappedImageReader(IImageRegionReader):
+    """Represents a reader of memory-mapped images (see :func:`write_memory_mapped_image`)."""
+
+    def __init__(self, path: str):
+        """Initializes a new instance of the MemoryMappedImageReader class.
+
+        Args:
+            path (str): The file path.
+        """
+        super().__init__(_read_sidecar(path)['properties'])
+        self.path = path
+        self.array = np.load(path, mmap_mode='r')  # read-only memory map
+
+    def read_array(self, index=None, size=None) -> np.ndarray:
+        """Reads an image region as read-only view of the memory map.
+
+        Args:
+            index: The start index of the region in image order (x, y, z) or None for the whole image.
+            size: The size of the region in image order (x, y, z) or None for the whole image.
+
+        Returns:
+            np.ndarray: The region in array order, i.e. shape=(z, y, x) or shape=(z, y, x, components).
+        """
+        index, size = self._get_region(index, size)
+        return self.array[_get_region_slices(self.properties, index, size)]
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'MemoryMappedImageReader:\n' \
+               ' path: {self.path}\n' \
+            .format(self=self)
+
+
+def write_chunked_image(image: sitk.Image, path: str, chunk_size: tuple=None, codec: str='zlib', level: int=6,
+                        max_workers: int=None) -> str:
+    """Writes an image as independently compressed chunks with a sidecar holding the image properties and chunk index.
+
+    Args:
+        image (sitk.Image): The image.
+        path (str): The file path.
+        chunk_size (tuple): The chunk size in image order (x, y, z). Defaults to 64 voxels along each axis.
+        codec (str): The compression codec, see :attr:`CODECS`.
+        level (int): The compression level (0-9).
+        max_workers (int): The maximum number of threads compressing the chunks.
+
+    Returns:
+        str: The file path.
+    """
+
+    if codec not in CODECS:
+        raise ValueError('codec must be one of {}'.format(CODECS))
+
+    array, properties = img.SimpleITKNumpyImageBridge.convert(image, view=True)
+    if chunk_size is None:
+        chunk_size = (64, ) * properties.dimensions
+    if len(chunk_size) != properties.dimensions or any(length < 1 for length in chunk_size):
+        raise ValueError('chunk_size needs {} positive entries'.format(properties.dimensions))
+    chunk_shape = tuple(reversed(chunk_size))
+
+    def compress(grid_index):
+        slices = tuple(slice(i * length, (i + 1) * length) for i, length in zip(grid_index, chunk_shape))
+        return _compress(np.ascontiguousarray(array[slices]).tobytes(), codec, level)
+
+    offsets, lengths = [], []
+    offset = 0
+    with open(path, 'wb') as file, ThreadPoolExecutor(max_workers) as executor:
+        # zlib and lzma release the GIL, the chunks are written in the order of the chunk grid
+        for data in executor.map(compress, np.ndindex(*_get_chunk_grid(array.shape, chunk_shape))):
+            file.write(data)
+            offsets.append(offset)
+            lengths.append(len(data))
+            offset += len(data)
+
+    _write_sidecar(path, properties, dtype=array.dtype.str, shape=array.shape, chunk_shape=chunk_shape,
+                   codec=codec, level=level, offsets=offsets, lengths=lengths)
+    return path
+
+
+def convert_to_chunked_image(source_path: str, path: str, chunk_size: tuple=None, codec: str='zlib', level: int=6,
+                             max_workers: int=None) -> str:
+    """Converts an image file to independently compressed chunks (see :func:`write_chunked_image`).
+
+    Args:
+        source_path (str): The path of the image file (any format readable by SimpleITK).
+        path (str): The file path.
+        chunk_size (tuple): The chunk size in image order (x, y, z). Defaults to 64 voxels along each axis.
+        codec (str): The compression codec, see :attr:`CODECS`.
+        level (int): The compression level (0-9).
+        max_workers (int): The maximum number of threads compressing the chunks.
+
+    Returns:
+        str: The file path.
+    """
+    return write_chunked_image(sitk.ReadImage(source_path), path, chunk_size, codec, level, max_workers)
+
+
+def _get_chunk_grid(shape: tuple, chunk_shape: tuple) -> tuple:
+    """Gets the number of chunks along each (spatial) axis in array order."""
+
+    return tuple(-(-length // chunk_length) for length, chunk_length in zip(shape, chunk_shape))
+
+
+class ChunkedImageReader(IImageRegionReader):
+    """Represents a reader of chunked images (see :func:`write_chunked_image`).
+
+    The reader keeps the file open until :meth:`close` is called or the ``with`` block is exited.
+    """
+
+    def __init__(self, path: str):
+        """Initializes a new instance of the ChunkedImageReader class.
+
+        Args:
+            path (str): The file path.
+        """
+        sidecar = _read_sidecar(path)
+        super().__init__(sidecar['properties'])
+        self.path = path
+        self.dtype = np.dtype(sidecar['dtype'])
+        self.shape = tuple(sidecar['shape'])
+        self.chunk_shape = tuple(sidecar['chunk_shape'])
+        self.codec = sidecar['codec']
+        self.grid = _get_chunk_grid(self.shape, self.chunk_shape)
+        self.offsets = sidecar['offsets']
+        self.lengths = sidecar['lengths']
+        self._file = open(path, 'rb')
+        self._lock = threading.Lock()
+
+    def read_array(self, index=None, size=None) -> np.ndarray:
+        """Reads an image region by decompressing the chunks it touches.
+
+        Args:
+            index: The start index of the region in image order (x, y, z) or None for the whole image.
+            size: The size of the region in image order (x, y, z) or None for the whole image.
+
+        Returns:
+            np.ndarray: The region in array order, i.e. shape=(z, y, x) or shape=(z, y, x, components).
+        """
+        index, size = self._get_region(index, size)
+        slices = _get_region_slices(self.properties, index, size)
+
+        region = np.empty(tuple(s.stop - s.start for s in slices) + self.shape[len(slices):], dtype=self.dtype)
+        ranges = [range(s.start // length, (s.stop - 1) // length + 1) for s, length in zip(slices, self.chunk_shape)]
+        for grid_index in itertools.product(*ranges):
+            chunk = self.read_chunk(grid_index)
+            chunk_slices, region_slices = [], []
+            for i, s, chunk_length in zip(grid_index, slices, self.chunk_shape):
+                start = max(s.start, i * chunk_length)
+                stop = min(s.stop, (i + 1) * chunk_length)
+                chunk_slices.append(slice(start - i * chunk_length, stop - i * chunk_length))
+                region_slices.append(slice(start - s.start, stop - s.start))
+            region[tuple(region_slices)] = chunk[tuple(chunk_slices)]
+
+        return region
+
+    def read_chunk(self, grid_index: tuple) -> np.ndarray:
+        """Reads and decompresses a chunk.
+
+        Args:
+            grid_index (tuple): The index of the chunk in the chunk grid (array order).
+
+        Returns:
+            np.ndarray: The chunk (smaller than the chunk shape at the image border).
+        """
+        position = int(np.ravel_multi_index(grid_index, self.grid))
+        with self._lock:
+            self._file.seek(self.offsets[position])
+            data = self._file.read(self.lengths[position])
+
+        shape = tuple(min(chunk_length, length - i * chunk_length)
+                      for i, chunk_length, length in zip(grid_index, self.chunk_shape, self.shape)) + \
+            self.shape[len(grid_index):]
+        return np.frombuffer(_decompress(data, self.codec), dtype=self.dtype).reshape(shape)
+
+    def close(self):
+        """Closes the file."""
+        self._file.close()
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'ChunkedImageReader:\n' \
+               ' path:        {self.path}\n' \
+               ' chunk_shape: {self.chunk_shape}\n' \
+               ' codec:       {self.codec}\n' \
+            .format(self=self)
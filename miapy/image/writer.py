@@ -0,0 +1,181 @@
+"""The writer module enables writing images in the background.
+
+The :class:`AsyncImageWriter` queues images and writes them on background threads, such that the writing (I/O and
+compression, which release the GIL) does not stall the computation. The memory occupied by the queued images is
+bounded: :meth:`AsyncImageWriter.write` blocks while the budget is exhausted. Each image is written to a temporary
+file in the target directory, which is renamed on completion, such that readers never observe partially written
+files. Failures are raised on :meth:`AsyncImageWriter.flush` or :meth:`AsyncImageWriter.close`.
+
+Example usage:
+
+>>> with AsyncImageWriter(max_workers=2, max_bytes=2 ** 30) as writer:
+>>>     for subject, image in results:
+>>>         writer.write(image, "/path/to/{}.nii.gz".format(subject), use_compression=True, compression_level=1)
+"""
+import os
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import SimpleITK as sitk
+
+import miapy.image.image as img
+
+
+class AsyncImageWriter:
+    """Represents an image writer with background workers and a memory budget."""
+
+    # formats writing a header and a separate data file, which are not written atomically
+    MULTI_FILE_EXTENSIONS = ('.mhd', '.hdr')
+
+    def __init__(self, max_workers: int=2, max_bytes: int=2 ** 30, use_compression: bool=False,
+                 compression_level: int=-1, compressor: str=''):
+        """Initializes a new instance of the AsyncImageWriter class.
+
+        Args:
+            max_workers (int): The number of writing threads.
+            max_bytes (int): The maximum size of the queued images in bytes. An image larger than the budget is
+                queued when no other image is queued.
+            use_compression (bool): The default of whether to compress the images (if supported by the format).
+            compression_level (int): The default compression level (-1 uses the default of the format).
+            compressor (str): The default compressor (e.g. "" for the default of the format, see
+                ``sitk.ImageFileWriter.SetCompressor``).
+        """
+        if max_bytes < 0:
+            raise ValueError('max_bytes must be non-negative')
+
+        self.max_bytes = max_bytes
+        self.use_compression = use_compression
+        self.compression_level = compression_level
+        self.compressor = compressor
+
+        self._executor = ThreadPoolExecutor(max_workers)
+        self._condition = threading.Condition()
+        self._pending = set()  # futures of the queued images
+        self._pending_bytes = 0
+        self._errors = []
+        self._is_closed = False
+
+    def write(self, image: sitk.Image, path: str, use_compression: bool=None, compression_level: int=None,
+              compressor: str=None) -> Future:
+        """Queues an image for writing; blocks while the memory budget is exhausted.
+
+        The image can be modified after the call since a (copy-on-write) shallow copy is queued.
+
+        Args:
+            image (sitk.Image): The image.
+            path (str): The file path.
+            use_compression (bool): Whether to compress the image or None for the writer's default.
+            compression_level (int): The compression level or None for the writer's default.
+            compressor (str): The compressor or None for the writer's default.
+
+        Returns:
+            Future: The future of the write, whose result is the path.
+        """
+        image = sitk.Image(image)
+        size = img.get_size_in_bytes(image)
+        options = (self.use_compression if use_compression is None else use_compression,
+                   self.compression_level if compression_level is None else compression_level,
+                   self.compressor if compressor is None else compressor)
+
+        with self._condition:
+            while self._pending and self._pending_bytes + size > self.max_bytes and not self._is_closed:
+                self._condition.wait()
+            if self._is_closed:
+                raise ValueError('writer is closed')
+
+            future = self._executor.submit(_write, image, path, *options)
+            self._pending.add(future)
+            self._pending_bytes += size
+        future.add_done_callback(lambda f: self._on_written(f, size))
+        return future
+
+    def flush(self):
+        """Waits until all queued images are written.
+
+        Raises:
+            Exception: The first failure of a write since the last flush.
+        """
+        with self._condition:
+            while self._pending:
+                self._condition.wait()
+            errors, self._errors = self._errors, []
+
+        if errors:
+            raise errors[0]
+
+    def close(self):
+        """Writes the queued images and stops the workers.
+
+        Raises:
+            Exception: The first failure of a write since the last flush.
+        """
+        try:
+            self.flush()
+        finally:
+            with self._condition:
+                self._is_closed = True
+                self._condition.notify_all()
+            self._executor.shutdown(wait=True)
+
+    def _on_written(self, future: Future, size: int):
+        """Releases the memory budget of a written image and records its failure."""
+
+        with self._condition:
+            self._pending.discard(future)
+            self._pending_bytes -= size
+            if not future.cancelled() and future.exception() is not None:
+                self._errors.append(future.exception())
+            self._condition.notify_all()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            try:
+                self.close()
+            except Exception:
+                pass  # the exception of the with block takes precedence
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'AsyncImageWriter:\n' \
+               ' max_bytes:         {self.max_bytes}\n' \
+               ' use_compression:   {self.use_compression}\n' \
+               ' compression_level: {self.compression_level}\n' \
+               ' compressor:        {self.compressor}\n' \
+            .format(self=self)
+
+
+def _write(image: sitk.Image, path: str, use_compression: bool, compression_level: int, compressor: str) -> str:
+    """Writes an image to a temporary file in the target directory and renames it to the path."""
+
+    directory, file_name = os.path.split(os.path.abspath(path))
+    if file_name.lower().endswith(AsyncImageWriter.MULTI_FILE_EXTENSIONS):
+        temporary_path = path
+    else:
+        # the temporary file keeps the extension(s) to select the same image format
+        temporary_path = os.path.join(directory, '.tmp-{}-{}'.format(uuid.uuid4().hex, file_name))
+
+    writer = sitk.ImageFileWriter()
+    writer.SetFileName(temporary_path)
+    writer.SetUseCompression(use_compression)
+    writer.SetCompressionLevel(compression_level)
+    writer.SetCompressor(compressor)
+    try:
+        writer.Execute(image)
+        if temporary_path != path:
+            os.replace(temporary_path, path)
+    except Exception:
+        if temporary_path != path and os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+    return path
@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.evaluation.agreement as agr
+import miapy.evaluation.metric as mtrc
+
+
+class TestAgreementEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        random_state = np.random.RandomState(0)
+        self.label_maps = [random_state.randint(0, 3, (4, 5, 6)) for _ in range(3)]
+
+        self.evaluator = agr.AgreementEvaluator()
+        self.evaluator.add_label(1, 'ONE')
+        self.evaluator.add_label((1, 2), 'ONE_TWO')
+        self.evaluator.add_metric(mtrc.DiceCoefficient())
+        self.evaluator.add_metric(mtrc.Sensitivity())
+
+    def test_matches_pairwise_confusion_matrix(self):
+        result = self.evaluator.evaluate(self.label_maps)
+
+        for l, label in enumerate((1, (1, 2))):
+            for i, prediction in enumerate(self.label_maps):
+                for j, reference in enumerate(self.label_maps):
+                    confusion_matrix = mtrc.ConfusionMatrix(np.isin(prediction, label).astype(np.uint8),
+                                                            np.isin(reference, label).astype(np.uint8))
+                    for metric in (mtrc.DiceCoefficient(), mtrc.Sensitivity()):
+                        metric.confusion_matrix = confusion_matrix
+                        self.assertAlmostEqual(result.matrices[str(metric)][l, i, j], metric.calculate())
+
+    def test_images_and_float_labels(self):
+        expected = self.evaluator.evaluate(self.label_maps)
+        result = self.evaluator.evaluate([sitk.GetImageFromArray(label_map.astype(np.float32))
+                                          for label_map in self.label_maps])
+
+        np.testing.assert_allclose(result.matrices['DICE'], expected.matrices['DICE'])
+
+    def test_identical_raters(self):
+        result = self.evaluator.evaluate([self.label_maps[0]] * 3)
+
+        np.testing.assert_allclose(result.matrices['DICE'], 1)
+        np.testing.assert_allclose(result.fleiss_kappa, 1)
+        np.testing.assert_allclose(result.get_mean_pairwise_agreement('DICE'), 1)
+        self.assertEqual(result.get_rater_agreement('DICE').shape, (2, 3))
+
+    def test_unsupported_metric(self):
+        with self.assertRaises(ValueError):
+            self.evaluator.add_metric(mtrc.HausdorffDistance())
+
+    def test_single_rater(self):
+        with self.assertRaises(ValueError):
+            self.evaluator.evaluate(self.label_maps[:1])
+
+    def test_sparse_labels(self):
+        expected = self.evaluator.evaluate(self.label_maps)
+        sparse_label_maps = [np.choose(label_map, [0, 1, 60000]) for label_map in self.label_maps]
+        evaluator = agr.AgreementEvaluator()
+        evaluator.add_label(1, 'ONE')
+        evaluator.add_label((1, 60000), 'ONE_TWO')
+        evaluator.add_metric(mtrc.DiceCoefficient())
+
+        _, values = agr._encode(sparse_label_maps)
+        np.testing.assert_array_equal(values, [0, 1, 60000])
+
+        result = evaluator.evaluate(sparse_label_maps)
+        np.testing.assert_allclose(result.matrices['DICE'], expected.matrices['DICE'])
+        np.testing.assert_allclose(result.fleiss_kappa, expected.fleiss_kappa)
@@ -0,0 +1,91 @@
+import unittest
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.evaluation.evaluator as eval_
+import miapy.evaluation.metric as mtrc
+
+
+class ListEvaluatorWriter(eval_.IEvaluatorWriter):
+
+    def __init__(self):
+        self.header = None
+        self.data = []
+
+    def write(self, data: list):
+        self.data += data
+
+    def write_header(self, header: list):
+        self.header = header
+
+
+class TestEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        ground_truth = np.zeros((4, 5, 6), dtype=np.uint8)
+        ground_truth[1:3, 1:4, 1:5] = 1
+        ground_truth[0, 0, :] = 2
+        prediction = np.zeros((4, 5, 6), dtype=np.uint8)
+        prediction[1:3, 1:4, 2:5] = 1
+        prediction[0, 0, :3] = 2
+
+        self.ground_truth = sitk.GetImageFromArray(ground_truth)
+        self.prediction = sitk.GetImageFromArray(prediction)
+
+        self.writer = ListEvaluatorWriter()
+        self.evaluator = eval_.Evaluator(self.writer)
+        self.evaluator.add_label(1, 'ONE')
+        self.evaluator.add_label((1, 2), 'ONE_TWO')
+
+    def test_evaluate(self):
+        self.evaluator.add_metric(mtrc.DiceCoefficient())
+        self.evaluator.add_metric(mtrc.LabelVolume())
+        self.evaluator.evaluate(self.prediction, self.ground_truth, 'SUBJECT')
+
+        self.assertEqual(self.writer.header, ['ID', 'LABEL', 'DICE', 'LBLVOL'])
+        self.assertEqual(self.writer.data[0][:2], ['SUBJECT', 'ONE'])
+        self.assertAlmostEqual(self.writer.data[0][2], 2 * 18 / (18 + 24))
+        self.assertAlmostEqual(self.writer.data[0][3], 24)
+        self.assertAlmostEqual(self.writer.data[1][2], 2 * 21 / (21 + 30))
+        self.assertAlmostEqual(self.writer.data[1][3], 30)
+
+    def test_evaluate_arrays(self):
+        self.evaluator.add_metric(mtrc.DiceCoefficient())
+        self.evaluator.add_metric(mtrc.MahalanobisDistance())
+        self.evaluator.evaluate(sitk.GetArrayFromImage(self.prediction), sitk.GetArrayFromImage(self.ground_truth),
+                                'SUBJECT')
+
+        self.assertAlmostEqual(self.writer.data[0][2], 2 * 18 / (18 + 24))
+        self.assertTrue(self.writer.data[0][3] > 0)
+
+    def test_evaluate_float_arrays(self):
+        self.evaluator.add_metric(mtrc.DiceCoefficient())
+        self.evaluator.evaluate(sitk.GetArrayFromImage(self.prediction).astype(np.float64),
+                                sitk.GetArrayFromImage(self.ground_truth).astype(np.int64), 'SUBJECT')
+
+        self.assertAlmostEqual(self.writer.data[0][2], 2 * 18 / (18 + 24))
+        self.assertAlmostEqual(self.writer.data[1][2], 2 * 21 / (21 + 30))
+
+    def test_plan_confusion_matrix(self):
+        self.evaluator.add_metric(mtrc.DiceCoefficient())
+        plan = self.evaluator.plan(self.prediction, self.ground_truth)
+
+        self.assertEqual(plan.primitives, [mtrc.MASKS, mtrc.CONFUSION_MATRIX])
+        self.assertEqual(plan.reasons[mtrc.MASKS], [mtrc.CONFUSION_MATRIX])
+
+    def test_plan_images_only(self):
+        self.evaluator.labels = {1: 'ONE'}
+        self.evaluator.add_metric(mtrc.HausdorffDistance())
+
+        self.assertEqual(self.evaluator.plan(self.prediction, self.ground_truth).primitives, [mtrc.IMAGES])
+        self.assertEqual(self.evaluator.plan(sitk.GetArrayFromImage(self.prediction), self.ground_truth).primitives,
+                         [mtrc.MASKS, mtrc.IMAGES])
+
+    def test_plan_unknown_primitive(self):
+        metric = mtrc.DiceCoefficient()
+        metric.primitives = ('unknown', )
+        self.evaluator.add_metric(metric)
+
+        with self.assertRaises(ValueError):
+            self.evaluator.plan(self.prediction, self.ground_truth)
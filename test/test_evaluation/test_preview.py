@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.evaluation.metric as mtrc
+import miapy.evaluation.preview as prv
+
+
+class TestPreviewEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        z, y, x = np.mgrid[:30, :40, :50]
+        ground_truth = (((z - 15) ** 2 + (y - 20) ** 2 + (x - 25) ** 2) < 10 ** 2).astype(np.uint8)
+        prediction = (((z - 16) ** 2 + (y - 20) ** 2 + (x - 25) ** 2) < 9 ** 2).astype(np.uint8)
+
+        self.ground_truth = sitk.GetImageFromArray(ground_truth)
+        self.ground_truth.SetSpacing((0.5, 0.5, 2.0))
+        self.prediction = sitk.GetImageFromArray(prediction)
+        self.prediction.CopyInformation(self.ground_truth)
+
+        self.dice = 2 * (ground_truth & prediction).sum() / (ground_truth.sum() + prediction.sum())
+        self.volume = ground_truth.sum() * 0.5
+
+        distance_filter = sitk.HausdorffDistanceImageFilter()
+        distance_filter.Execute(self.ground_truth, self.prediction)
+        self.hausdorff_distance = distance_filter.GetHausdorffDistance()
+
+    def evaluate(self, **kwargs):
+        evaluator = prv.PreviewEvaluator(**kwargs)
+        evaluator.add_label(1, 'SPHERE')
+        evaluator.add_metric(mtrc.DiceCoefficient())
+        evaluator.add_metric(mtrc.LabelVolume())
+        evaluator.add_metric(mtrc.HausdorffDistance())
+        return evaluator.evaluate(self.prediction, self.ground_truth, 'SUBJECT')[0]
+
+    def test_exhaustive(self):
+        result = self.evaluate(sampling_rate=1)
+
+        self.assertEqual(result[:2], ['SUBJECT', 'SPHERE'])
+        np.testing.assert_allclose(result[2:5], self.dice)
+        np.testing.assert_allclose(result[5:8], self.volume)
+        np.testing.assert_allclose(result[8:11], self.hausdorff_distance)
+
+    def test_random(self):
+        result = self.evaluate(sampling_rate=0.1, seed=1)
+
+        self.assertTrue(result[3] <= result[2] <= result[4])
+        self.assertAlmostEqual(result[2], self.dice, delta=0.05)
+        self.assertTrue(result[6] <= result[5] <= result[7])
+        self.assertTrue(result[9] <= self.hausdorff_distance <= result[10])
+
+    def test_stride(self):
+        result = self.evaluate(sampling_rate=0.1, strategy='stride')
+
+        self.assertAlmostEqual(result[2], self.dice, delta=0.05)
+        self.assertTrue(result[9] <= self.hausdorff_distance <= result[10])
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            prv.PreviewEvaluator(sampling_rate=0)
+        with self.assertRaises(ValueError):
+            prv.PreviewEvaluator(strategy='unknown')
+        with self.assertRaises(ValueError):
+            prv.PreviewEvaluator().add_metric(mtrc.MahalanobisDistance())
@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+
+import miapy.evaluation.results as rslt
+
+
+class TestEvaluationResults(unittest.TestCase):
+
+    def setUp(self):
+        self.results = rslt.EvaluationResults(capacity=2)
+        self.results.extend(['S1', 'S1', 'S2', 'S2', 'S3', 'S3'],
+                            ['A', 'B', 'A', 'B', 'A', 'B'],
+                            ['DICE'] * 6,
+                            [0.1, 0.5, 0.3, 0.6, 0.2, 'n/a'])
+        self.results.append('S1', 'A', 'HDRFDST', 4.0)
+
+    def test_length_and_columns(self):
+        self.assertEqual(len(self.results), 7)
+        np.testing.assert_array_equal(self.results.get_column('subject'),
+                                      ['S1', 'S1', 'S2', 'S2', 'S3', 'S3', 'S1'])
+        self.assertTrue(np.isnan(self.results.values[5]))
+
+    def test_filter(self):
+        filtered = self.results.filter(label='A', metric=['DICE'])
+
+        self.assertEqual(len(filtered), 3)
+        np.testing.assert_allclose(filtered.values, [0.1, 0.3, 0.2])
+        self.assertEqual(len(self.results.filter(subject='unknown')), 0)
+
+    def test_aggregate(self):
+        summary = self.results.aggregate(by=('label', 'metric'),
+                                         functions=('count', 'mean', 'std', 'min', 'max', 'median'))
+
+        self.assertEqual(list(summary['label']), ['A', 'A', 'B'])
+        self.assertEqual(list(summary['metric']), ['DICE', 'HDRFDST', 'DICE'])
+        np.testing.assert_array_equal(summary['count'], [3, 1, 2])
+        np.testing.assert_allclose(summary['mean'], [0.2, 4.0, 0.55])
+        np.testing.assert_allclose(summary['std'], [np.std([0.1, 0.3, 0.2]), 0, 0.05])
+        np.testing.assert_allclose(summary['min'], [0.1, 4.0, 0.5])
+        np.testing.assert_allclose(summary['max'], [0.3, 4.0, 0.6])
+        np.testing.assert_allclose(summary['median'], [0.2, 4.0, 0.55])
+
+    def test_aggregate_unknown_function(self):
+        with self.assertRaises(ValueError):
+            self.results.aggregate(functions=('mode', ))
+
+    def test_pivot(self):
+        subjects, labels, values = self.results.pivot('DICE')
+
+        self.assertEqual(subjects, ['S1', 'S2', 'S3'])
+        self.assertEqual(labels, ['A', 'B'])
+        np.testing.assert_allclose(values, [[0.1, 0.5], [0.3, 0.6], [0.2, np.nan]])
+
+    def test_to_array(self):
+        array = self.results.to_array()
+
+        self.assertEqual(array.dtype.names, ('subject', 'label', 'metric', 'value'))
+        self.assertEqual(array[6]['metric'], 'HDRFDST')
+        self.assertEqual(array[6]['value'], 4.0)
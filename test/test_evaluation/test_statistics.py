@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+
+import miapy.evaluation.metric as mtrc
+import miapy.evaluation.statistics as stat
+
+
+class TestBootstrapIndices(unittest.TestCase):
+    def test_shape_and_range(self):
+        indices = stat.bootstrap_indices(7, 20, seed=1)
+
+        self.assertEqual(indices.shape, (20, 7))
+        self.assertTrue(indices.min() >= 0)
+        self.assertTrue(indices.max() < 7)
+
+    def test_seed(self):
+        np.testing.assert_array_equal(stat.bootstrap_indices(5, 3, seed=2), stat.bootstrap_indices(5, 3, seed=2))
+
+
+class TestBootstrapMean(unittest.TestCase):
+    def test_constant_values(self):
+        values = np.full((10, 3), 0.5)
+        result = stat.bootstrap_mean(values, number_of_resamples=50, seed=1)
+
+        np.testing.assert_allclose(result.estimate, [0.5, 0.5, 0.5])
+        np.testing.assert_allclose(result.lower, [0.5, 0.5, 0.5])
+        np.testing.assert_allclose(result.upper, [0.5, 0.5, 0.5])
+        self.assertEqual(result.samples.shape, (50, 3))
+
+    def test_samples_match_loop(self):
+        values = np.random.RandomState(3).rand(12, 2)
+        result = stat.bootstrap_mean(values, number_of_resamples=30, seed=4, chunk_size=7)
+
+        indices = np.random.RandomState(4).randint(0, 12, (30, 12))
+        expected = np.array([values[i].mean(axis=0) for i in indices[:7]])
+        np.testing.assert_allclose(result.samples[:7], expected)
+        self.assertTrue(np.all(result.lower <= result.estimate))
+        self.assertTrue(np.all(result.estimate <= result.upper))
+
+    def test_nan_ignored(self):
+        values = np.array([1.0, np.nan, 3.0])
+        result = stat.bootstrap_mean(values, number_of_resamples=10, seed=1)
+
+        self.assertAlmostEqual(float(result.estimate), 2.0)
+
+
+class TestBootstrapPooled(unittest.TestCase):
+    def test_pooled_dice(self):
+        tp = np.array([[10, 5], [20, 0]])
+        tn = np.array([[100, 100], [100, 100]])
+        fp = np.array([[2, 1], [4, 3]])
+        fn = np.array([[3, 0], [1, 2]])
+
+        result = stat.bootstrap_pooled(tp, tn, fp, fn, number_of_resamples=40, seed=1)
+
+        np.testing.assert_allclose(result.estimate, [60 / 70, 10 / 16])
+        self.assertEqual(result.samples.shape, (40, 2))
+
+    def test_scalar_metric(self):
+        tp = np.array([10, 20, 30])
+        tn = np.array([50, 50, 50])
+        fp = np.array([0, 5, 0])
+        fn = np.array([1, 1, 1])
+
+        result = stat.bootstrap_pooled(tp, tn, fp, fn, metric=mtrc.Precision(), number_of_resamples=20, seed=1)
+
+        self.assertAlmostEqual(float(result.estimate), 60 / 65)
+        self.assertEqual(result.samples.shape, (20, ))
+
+
+class TestCalculateConfusionMatrixMetric(unittest.TestCase):
+    def test_matches_scalar_calculation(self):
+        counts = (np.array([10, 0]), np.array([80, 90]), np.array([5, 0]), np.array([5, 10]))
+
+        for metric in (mtrc.DiceCoefficient(), mtrc.Accuracy(), mtrc.FMeasure()):
+            values = mtrc.calculate_confusion_matrix_metric(metric, *counts)
+            for i in range(2):
+                metric.confusion_matrix = mtrc.ConfusionMatrix.from_counts(*(c[i] for c in counts))
+                self.assertAlmostEqual(values[i], metric.calculate())
@@ -0,0 +1,134 @@
+import concurrent.futures as futures
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.filtering.cache as cache
+import miapy.filtering.filter as fltr
+import miapy.filtering.preprocessing as prep
+
+
+class _AddParams(fltr.IFilterParams):
+
+    def __init__(self, value: float):
+        self.value = value
+
+
+class _CountingAdd(fltr.IFilter):
+
+    def __init__(self, value: float=1):
+        super().__init__()
+        self.value = value
+        self.number_of_executions = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['number_of_executions']  # not part of the configuration
+        return state
+
+    def execute(self, image: sitk.Image, params: _AddParams=None) -> sitk.Image:
+        self.number_of_executions += 1
+        return image + (self.value if params is None else params.value)
+
+
+def _get_digests() -> list:
+    return [cache.get_digest(value) for value in (prep.HistogramMatcher(), _CountingAdd(), np.mean, _get_digests,
+                                                  [prep.RescaleIntensity(0, 1).execute])]
+
+
+class TestFilterCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.image = sitk.GetImageFromArray(np.arange(24, dtype=np.float32).reshape((2, 3, 4)))
+        self.filters = [_CountingAdd(1), _CountingAdd(2), _CountingAdd(3)]
+
+        self.pipeline = fltr.FilterPipeline(cache.FilterCache(self.directory.name))
+        for filter_ in self.filters:
+            self.pipeline.add_filter(filter_)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _get_number_of_executions(self):
+        return [filter_.number_of_executions for filter_ in self.filters]
+
+    def test_rerun(self):
+        expected = sitk.GetArrayFromImage(self.pipeline.execute(self.image))
+        result = sitk.GetArrayFromImage(self.pipeline.execute(self.image))
+
+        np.testing.assert_array_equal(result, expected)
+        self.assertEqual(self._get_number_of_executions(), [1, 1, 1])
+        self.assertEqual(self.pipeline.cache.statistics.hits, 1)
+        self.assertEqual(self.pipeline.cache.statistics.number_of_images, 3)
+
+    def test_changed_last_stage(self):
+        self.pipeline.execute(self.image)
+        self.pipeline.set_param(_AddParams(10), 2)
+        result = self.pipeline.execute(self.image)
+
+        self.assertEqual(result[0, 0, 0], 13)
+        self.assertEqual(self._get_number_of_executions(), [1, 1, 2])
+
+    def test_changed_configuration(self):
+        self.pipeline.execute(self.image)
+        self.filters[1].value = 5
+        result = self.pipeline.execute(self.image)
+
+        self.assertEqual(result[0, 0, 0], 9)
+        self.assertEqual(self._get_number_of_executions(), [1, 2, 2])
+
+    def test_changed_input(self):
+        self.pipeline.execute(self.image)
+        image = sitk.Image(self.image)
+        image.SetSpacing((1, 1, 2))
+        self.pipeline.execute(image)
+
+        self.assertEqual(self._get_number_of_executions(), [2, 2, 2])
+
+    def test_not_cached_stage(self):
+        pipeline = fltr.FilterPipeline(self.pipeline.cache)
+        pipeline.add_filter(self.filters[0])
+        pipeline.add_filter(self.filters[1], cache=False)
+        pipeline.execute(self.image)
+        pipeline.execute(self.image)
+
+        self.assertEqual(self._get_number_of_executions(), [1, 2, 0])
+        self.assertEqual(pipeline.cache.statistics.number_of_images, 1)
+
+    def test_eviction(self):
+        size_in_bytes = os.path.getsize(self._put('a'))
+        filter_cache = cache.FilterCache(self.directory.name, max_bytes=2 * size_in_bytes)
+        self._put('b', filter_cache)
+        filter_cache.get('a')  # a is now more recently used than b
+        self._put('c', filter_cache)
+
+        self.assertIn('a', filter_cache)
+        self.assertNotIn('b', filter_cache)
+        self.assertIn('c', filter_cache)
+        self.assertEqual(filter_cache.statistics.evictions, 1)
+
+    def test_get_digest(self):
+        params = _AddParams(self.image)
+        self.assertEqual(cache.get_digest(params), cache.get_digest(_AddParams(sitk.Image(self.image))))
+        self.assertNotEqual(cache.get_digest(params), cache.get_digest(_AddParams(self.image + 1)))
+        self.assertNotEqual(cache.get_digest({0: 1}), cache.get_digest({0: 2}))
+
+    def test_get_digest_across_processes(self):
+        with futures.ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            digests = executor.submit(_get_digests).result()
+        self.assertEqual(digests, _get_digests())
+
+    def test_get_digest_unhashable(self):
+        for value in (lambda image: image, sitk.ImageRegistrationMethod()):
+            with self.assertRaises(ValueError):
+                cache.get_digest(value)
+
+    def _put(self, key: str, filter_cache: cache.FilterCache=None) -> str:
+        filter_cache = filter_cache or self.pipeline.cache
+        filter_cache.put(key, self.image)
+        return filter_cache._get_path(key)
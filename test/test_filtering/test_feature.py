@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.filtering.feature as ftr
+import miapy.image.image as img
+
+
+class TestVoxelFeatureExtractor(unittest.TestCase):
+
+    def setUp(self):
+        random_state = np.random.RandomState(0)
+        self.image = sitk.GetImageFromArray(random_state.rand(7, 6, 5).astype(np.float32) * 100)
+        self.image.SetSpacing((1.0, 2.0, 0.5))
+        self.image.SetOrigin((10.0, -5.0, 3.0))
+        self.image2 = sitk.GetImageFromArray(random_state.randint(0, 10, (7, 6, 5)).astype(np.int16))
+        self.image2.CopyInformation(self.image)
+
+    def test_intensity(self):
+        extractor = ftr.VoxelFeatureExtractor([ftr.IntensityFeature(0), ftr.IntensityFeature(1)], slab_size=3)
+        features = extractor.execute([self.image, self.image2])
+        self.assertEqual(features.shape, (7 * 6 * 5, 2))
+        self.assertEqual(features.dtype, np.float32)
+        np.testing.assert_array_equal(features[:, 0], sitk.GetArrayViewFromImage(self.image).ravel())
+        np.testing.assert_array_equal(features[:, 1], sitk.GetArrayViewFromImage(self.image2).ravel())
+
+    def test_neighborhood_mean(self):
+        extractor = ftr.VoxelFeatureExtractor([ftr.NeighborhoodMeanFeature(0, radius=2)], slab_size=2)
+        features = extractor.execute([self.image])
+        expected = sitk.GetArrayFromImage(sitk.Mean(self.image, [2, 2, 2]))
+        np.testing.assert_allclose(features[:, 0], expected.ravel(), rtol=1e-4)
+
+    def test_gradient_magnitude(self):
+        extractor = ftr.VoxelFeatureExtractor([ftr.GradientMagnitudeFeature(0)], slab_size=3)
+        features = extractor.execute([self.image])
+        expected = sitk.GetArrayFromImage(sitk.GradientMagnitude(self.image))
+        np.testing.assert_allclose(features[:, 0], expected.ravel(), rtol=1e-4, atol=1e-3)
+
+    def test_coordinates(self):
+        extractor = ftr.VoxelFeatureExtractor([ftr.CoordinateFeature(), ftr.CoordinateFeature(physical=False)],
+                                              slab_size=4)
+        features = extractor.execute([self.image])
+        index = (3, 2, 5)
+        row = np.ravel_multi_index(index[::-1], (7, 6, 5))
+        np.testing.assert_allclose(features[row, :3], self.image.TransformIndexToPhysicalPoint(index))
+        np.testing.assert_array_equal(features[row, 3:], index)
+
+    def test_mask_and_vector_image(self):
+        mask = sitk.GetArrayFromImage(self.image2) > 4
+        extractor = ftr.VoxelFeatureExtractor([ftr.IntensityFeature(0), ftr.GradientMagnitudeFeature(0)],
+                                              slab_size=3)
+        features = extractor.execute([self.image], mask=mask)
+        all_features = extractor.execute([self.image])
+        np.testing.assert_array_equal(features, all_features[mask.ravel()])
+
+        vector_image = img.NumpySimpleITKImageBridge.convert_to_vector_image(all_features,
+                                                                             img.ImageProperties(self.image))
+        self.assertEqual(vector_image.GetNumberOfComponentsPerPixel(), 2)
+        self.assertEqual(extractor.get_feature_names(), ['INTENSITY_0', 'GRADMAG_0'])
+
+    def test_arrays(self):
+        array = sitk.GetArrayFromImage(self.image)
+        extractor = ftr.VoxelFeatureExtractor([ftr.IntensityFeature()])
+        with self.assertRaises(ValueError):
+            extractor.execute([array])
+        features = extractor.execute([array], properties=img.ImageProperties(self.image))
+        np.testing.assert_array_equal(features[:, 0], array.ravel())
@@ -0,0 +1,171 @@
+import multiprocessing
+import unittest
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.filtering.filter as fltr
+import miapy.filtering.preprocessing as prep
+import miapy.filtering.profiling as prof
+import miapy.image.image as img
+
+
+class _AddParams(fltr.IFilterParams):
+
+    def __init__(self, value: float):
+        self.value = value
+
+
+class _Add(fltr.IFilter):
+
+    def execute(self, image: sitk.Image, params: _AddParams=None) -> sitk.Image:
+        return image + (1 if params is None else params.value)
+
+
+class _NumberOfThreads(fltr.IFilter):
+
+    def execute(self, image: sitk.Image, params: fltr.IFilterParams=None) -> sitk.Image:
+        return image * 0 + sitk.ProcessObject.GetGlobalDefaultNumberOfThreads()
+
+
+class TestFilterPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.images = [sitk.GetImageFromArray(np.full((2, 3, 4), i, dtype=np.float32)) for i in range(5)]
+        self.context = multiprocessing.get_context('spawn')
+
+        self.pipeline = fltr.FilterPipeline()
+        self.pipeline.add_filter(_Add())
+        self.pipeline.add_filter(_Add())
+        self.pipeline.set_param(_AddParams(10), 1)
+
+    def test_execute_params(self):
+        image = self.pipeline.execute(self.images[2], {0: _AddParams(100)})
+        self.assertEqual(image[0, 0, 0], 112)
+        self.assertEqual(self.pipeline.execute(self.images[2])[0, 0, 0], 13)
+
+    def test_execute_many(self):
+        params = [None if i % 2 else {1: _AddParams(100 * i)} for i in range(len(self.images))]
+        results = list(self.pipeline.execute_many(self.images, params, max_workers=2, max_in_flight=3,
+                                                  mp_context=self.context))
+
+        expected = [self.pipeline.execute(image, image_params) for image, image_params in zip(self.images, params)]
+        self.assertEqual(len(results), len(expected))
+        for result, image in zip(results, expected):
+            np.testing.assert_array_equal(sitk.GetArrayFromImage(result), sitk.GetArrayFromImage(image))
+
+    def test_execute_many_number_of_threads(self):
+        pipeline = fltr.FilterPipeline()
+        pipeline.add_filter(_NumberOfThreads())
+        result = next(pipeline.execute_many(self.images[:1], max_workers=1, number_of_threads=3,
+                                            mp_context=self.context))
+        self.assertEqual(result[0, 0, 0], 3)
+
+    def test_execute_many_invalid_params(self):
+        with self.assertRaises(ValueError):
+            list(self.pipeline.execute_many(self.images, [None], max_workers=1, mp_context=self.context))
+        with self.assertRaises(ValueError):
+            list(self.pipeline.execute_many(self.images, max_in_flight=0))
+
+
+class TestFusedPointwiseFilters(unittest.TestCase):
+
+    def setUp(self):
+        array = np.random.RandomState(0).normal(100, 50, (5, 6, 7))
+        self.images = [sitk.GetImageFromArray(array.astype(dtype)) for dtype in (np.int16, np.float32)]
+        self.filters = [prep.ClipIntensity(20, 180), prep.RescaleIntensity(-1, 1), prep.NormalizeZScore(),
+                        prep.RescaleIntensity(0, 255)]
+
+    def _get_pipeline(self, fuse_pointwise: bool) -> fltr.FilterPipeline:
+        pipeline = fltr.FilterPipeline(fuse_pointwise=fuse_pointwise)
+        pipeline.CHUNK_SIZE = 17  # several chunks
+        for filter_ in self.filters:
+            pipeline.add_filter(filter_)
+        return pipeline
+
+    def test_fused_equals_unfused(self):
+        for image in self.images:
+            expected = self._get_pipeline(False).execute(image)
+            result = self._get_pipeline(True).execute(image)
+
+            self.assertEqual(result.GetPixelID(), expected.GetPixelID())
+            self.assertTrue(img.ImageProperties(result) == img.ImageProperties(expected))
+            np.testing.assert_allclose(sitk.GetArrayFromImage(result), sitk.GetArrayFromImage(expected), atol=1e-9)
+
+    def test_out_of_range_clip_bounds(self):
+        array = np.random.RandomState(0).normal(100, 50, (5, 6, 7)).clip(0, 255)
+        for dtype, bounds in ((np.uint8, [(0, 800), (-5, 100), (-10, 300)]),
+                              (np.int16, [(-40000, 100), (-5, 40000), (-40000, 40000)])):
+            image = sitk.GetImageFromArray(array.astype(dtype))
+            for min_intensity, max_intensity in bounds:
+                self.filters = [prep.ClipIntensity(min_intensity, max_intensity), prep.ClipIntensity(-50, 150)]
+                expected = self._get_pipeline(False).execute(image)
+                result = self._get_pipeline(True).execute(image)
+                np.testing.assert_array_equal(sitk.GetArrayFromImage(result), sitk.GetArrayFromImage(expected))
+
+    def test_out_of_range_rescale_intensities(self):
+        image = sitk.GetImageFromArray(np.arange(24, dtype=np.uint8).reshape((2, 3, 4)))
+        self.filters = [prep.RescaleIntensity(-1, 1), prep.ClipIntensity(0, 1)]
+        for fuse_pointwise in (False, True):
+            with self.assertRaises(RuntimeError):  # raised by SimpleITK
+                self._get_pipeline(fuse_pointwise).execute(image)
+
+        self.filters = [prep.ClipIntensity(2, 20), prep.RescaleIntensity(0, 300), prep.ClipIntensity(0, 100)]
+        expected = self._get_pipeline(False).execute(image)
+        result = self._get_pipeline(True).execute(image)
+        np.testing.assert_array_equal(sitk.GetArrayFromImage(result), sitk.GetArrayFromImage(expected))
+
+    def test_cast_and_threshold(self):
+        self.filters = [prep.ClipIntensity(20, 180), prep.BinaryThreshold(50.5, 120.7, 7, 2),
+                        prep.Cast(sitk.sitkFloat32), prep.RescaleIntensity(-1, 1)]
+        for image in self.images:
+            expected = self._get_pipeline(False).execute(image)
+            result = self._get_pipeline(True).execute(image)
+
+            self.assertEqual(result.GetPixelID(), sitk.sitkFloat32)
+            np.testing.assert_array_equal(sitk.GetArrayFromImage(result), sitk.GetArrayFromImage(expected))
+
+        self.filters = [prep.Cast(sitk.sitkInt16), prep.BinaryThreshold(-2.5, 2.5)]
+        image = sitk.GetImageFromArray(np.linspace(-5, 5, 210).reshape((5, 6, 7)))
+        expected = self._get_pipeline(False).execute(image)
+        result = self._get_pipeline(True).execute(image)
+        np.testing.assert_array_equal(sitk.GetArrayFromImage(result), sitk.GetArrayFromImage(expected))
+
+    def test_empty_image(self):
+        image = sitk.Image([0, 3, 2], sitk.sitkFloat32)
+        result = self._get_pipeline(True).execute(image)
+        self.assertEqual(result.GetSize(), (0, 3, 2))
+        self.assertEqual(result.GetPixelID(), sitk.sitkFloat64)
+
+    def test_execute_array(self):
+        for image in self.images:
+            array = sitk.GetArrayViewFromImage(image).reshape(-1)
+            statistics = fltr.IntensityStatistics()
+            for start in range(0, array.size, 17):
+                statistics.update(array[start:start + 17])
+
+            for filter_ in self.filters[:3]:
+                expected = sitk.GetArrayFromImage(filter_.execute(image, None)).reshape(-1)
+                result = filter_.execute_array(array, statistics)
+                self.assertEqual(result.dtype, expected.dtype)
+                np.testing.assert_allclose(result, expected, atol=1e-9)
+
+    def test_fused_hooks(self):
+        pipeline = self._get_pipeline(True)
+        pipeline.add_filter(_Add())
+        profiler = prof.ProfilingHook()
+        progress = []
+        pipeline.add_hook(profiler)
+        pipeline.add_hook(prof.ProgressHook(5, lambda finished, total, record: progress.append((finished, total))))
+        result = pipeline.execute(self.images[0])
+
+        # the filters are not fused with hooks, i.e. each filter is recorded
+        self.assertEqual([(record.filter_index, record.filter_name) for record in profiler.records],
+                         [(0, 'ClipIntensity'), (1, 'RescaleIntensity'), (2, 'NormalizeZScore'),
+                          (3, 'RescaleIntensity'), (4, '_Add')])
+        self.assertEqual(progress, [(i, 5) for i in range(1, 6)])
+
+        expected = self._get_pipeline(False)
+        expected.add_filter(_Add())
+        np.testing.assert_allclose(sitk.GetArrayFromImage(result),
+                                   sitk.GetArrayFromImage(expected.execute(self.images[0])))
@@ -0,0 +1,102 @@
+import threading
+import unittest
+import weakref
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.filtering.filter as fltr
+import miapy.filtering.graph as graph
+
+
+class _AddParams(fltr.IFilterParams):
+
+    def __init__(self, image: sitk.Image):
+        self.image = image
+
+
+class _Add(fltr.IFilter):
+    """Adds a value or the image of the parameters and records its executions and outputs."""
+
+    def __init__(self, value: float=1, barrier: threading.Barrier=None):
+        super().__init__()
+        self.value = value
+        self.barrier = barrier
+        self.outputs = []
+        self.alive_outputs = []  # the number of alive outputs of other filters at the time of the execution
+        self.observed = []
+
+    def execute(self, image: sitk.Image, params: _AddParams=None) -> sitk.Image:
+        if self.barrier is not None:
+            self.barrier.wait()  # fails if the filters of the barrier are not executed concurrently
+        self.alive_outputs.append(sum(output() is not None for filter_ in self.observed for output in filter_.outputs))
+
+        output = image + (self.value if params is None else params.image)
+        self.outputs.append(weakref.ref(output))
+        return output
+
+
+class TestFilterGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.image = sitk.GetImageFromArray(np.zeros((2, 3, 4), dtype=np.float32))
+        self.graph = graph.FilterGraph()
+        self.graph.add_input('image')
+
+    def test_shared_node(self):
+        mask_filter = _Add(1)
+        self.graph.add_node('mask', mask_filter, 'image')
+        self.graph.add_node('corrected', _Add(10), 'mask')
+        self.graph.add_node('masked', _Add(), 'corrected', _AddParams, ['mask'])
+        self.graph.add_node('other', _Add(100), 'mask')
+
+        outputs = self.graph.execute({'image': self.image})
+
+        self.assertEqual(sorted(outputs), ['masked', 'other'])
+        self.assertEqual(outputs['masked'][0, 0, 0], 12)
+        self.assertEqual(outputs['other'][0, 0, 0], 101)
+        self.assertEqual(len(mask_filter.outputs), 1)
+
+    def test_required_nodes(self):
+        filters = [_Add(), _Add()]
+        self.graph.add_node('a', filters[0], 'image')
+        self.graph.add_node('b', filters[1], 'image')
+
+        outputs = self.graph.execute({'image': self.image}, ['a'])
+
+        self.assertEqual(list(outputs), ['a'])
+        self.assertEqual([len(filter_.outputs) for filter_ in filters], [1, 0])
+
+    def test_concurrent_branches(self):
+        barrier = threading.Barrier(2, timeout=10)
+        self.graph.add_node('a', _Add(barrier=barrier), 'image')
+        self.graph.add_node('b', _Add(barrier=barrier), 'image')
+
+        outputs = self.graph.execute({'image': self.image})
+        self.assertEqual(sorted(outputs), ['a', 'b'])
+
+    def test_release_intermediates(self):
+        filters = [_Add(), _Add(), _Add()]
+        filters[2].observed = filters[:1]
+        self.graph.add_node('a', filters[0], 'image')
+        self.graph.add_node('b', filters[1], 'a')
+        self.graph.add_node('c', filters[2], 'b')
+
+        self.graph.execute({'image': self.image})
+
+        self.assertEqual(filters[2].alive_outputs, [0])  # the output of a is released after b
+
+    def test_invalid_nodes(self):
+        with self.assertRaises(ValueError):
+            self.graph.add_node('a', _Add(), 'unknown')
+        with self.assertRaises(ValueError):
+            self.graph.add_node('image', _Add(), 'image')
+        with self.assertRaises(ValueError):
+            self.graph.add_node('a', _Add(), 'image', _AddParams(self.image), ['image'])
+        with self.assertRaises(ValueError):
+            self.graph.execute({})
+
+    def test_failing_node(self):
+        self.graph.add_node('a', _Add(), 'image', lambda: 1 / 0, [])
+        with self.assertRaises(ZeroDivisionError):
+            self.graph.execute({'image': self.image})
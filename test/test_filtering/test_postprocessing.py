@@ -91,3 +91,9 @@ class TestLargestNConnectedComponents(unittest.TestCase):
 
         result_array = sitk.GetArrayFromImage(result)
         self.assertEqual(result_array.sum(), 10)
+
+    def test_consecutive_labels_data_type(self):
+        result = fltr.LargestNConnectedComponents(3, True).execute(self.image)
+        self.assertEqual(result.GetPixelID(), sitk.sitkUInt8)
+        result = fltr.LargestNConnectedComponents(300, True).execute(self.image)
+        self.assertEqual(result.GetPixelID(), sitk.sitkUInt16)
@@ -0,0 +1,67 @@
+import multiprocessing
+import unittest
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.filtering.filter as fltr
+import miapy.filtering.profiling as prof
+
+
+class _Add(fltr.IFilter):
+
+    def execute(self, image: sitk.Image, params: fltr.IFilterParams=None) -> sitk.Image:
+        return image + 1
+
+
+class _Cast(fltr.IFilter):
+
+    def execute(self, image: sitk.Image, params: fltr.IFilterParams=None) -> sitk.Image:
+        return sitk.Cast(image, sitk.sitkFloat64)
+
+
+class TestProfilingHook(unittest.TestCase):
+
+    def setUp(self):
+        self.images = [sitk.GetImageFromArray(np.full((2, 3, 4), i, dtype=np.float32)) for i in range(3)]
+
+        self.pipeline = fltr.FilterPipeline()
+        self.pipeline.add_filter(_Add())
+        self.pipeline.add_filter(_Cast())
+
+        self.profiler = prof.ProfilingHook()
+        self.progress = []
+        self.pipeline.add_hook(self.profiler)
+        self.pipeline.add_hook(prof.ProgressHook(6, lambda finished, total, record: self.progress.append(finished)))
+
+    def test_execute(self):
+        for image in self.images:
+            self.pipeline.execute(image)
+
+        self.assertEqual(len(self.profiler.records), 6)
+        self.assertEqual(self.progress, [1, 2, 3, 4, 5, 6])
+
+        summaries = self.profiler.get_summaries()
+        self.assertEqual([summary.filter_name for summary in summaries], ['_Add', '_Cast'])
+        self.assertEqual(summaries[0].number_of_executions, 3)
+        self.assertEqual(summaries[0].mean_size_in_bytes, 24 * 4)
+        self.assertEqual(summaries[1].mean_size_in_bytes, 24 * 8)
+        self.assertEqual(summaries[1].pixel_types, ['64-bit float'])
+        self.assertGreaterEqual(summaries[0].total_time, 0)
+
+        report = self.profiler.get_report()
+        self.assertEqual(len(report.splitlines()), 3)
+        self.assertIn('_Cast', report)
+
+    def test_execute_many(self):
+        results = list(self.pipeline.execute_many(self.images, max_workers=2,
+                                                  mp_context=multiprocessing.get_context('spawn')))
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(self.progress, [1, 2, 3, 4, 5, 6])
+        self.assertEqual([record.filter_index for record in self.profiler.records], [0, 1] * 3)
+
+    def test_reset(self):
+        self.pipeline.execute(self.images[0])
+        self.profiler.reset()
+        self.assertEqual(self.profiler.get_summaries(), [])
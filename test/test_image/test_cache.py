@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.image.cache as cache
+import miapy.image.image as img
+
+
+class TestImageCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i in range(3):
+            path = os.path.join(self.directory.name, 'image{}.mha'.format(i))
+            sitk.WriteImage(sitk.Image([10, 10, 10], sitk.sitkUInt8) + i, path)  # 1000 bytes
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_get_image(self):
+        image_cache = cache.ImageCache()
+        image = image_cache.get_image(self.paths[1])
+        self.assertEqual(image[0, 0, 0], 1)
+        image[0, 0, 0] = 5  # modifying the returned image does not affect the cache
+        self.assertEqual(image_cache.get_image(self.paths[1])[0, 0, 0], 1)
+
+        statistics = image_cache.statistics
+        self.assertEqual((statistics.hits, statistics.misses, statistics.size_in_bytes), (1, 1, 1000))
+        self.assertIn(self.paths[1], image_cache)
+
+    def test_get_array(self):
+        image_cache = cache.ImageCache()
+        array, properties = image_cache.get_array(self.paths[2])
+        self.assertFalse(array.flags.writeable)
+        np.testing.assert_array_equal(array, 2)
+        self.assertEqual(properties, img.ImageProperties(sitk.ReadImage(self.paths[2])))
+
+    def test_get_array_shared(self):
+        image_cache = cache.ImageCache()
+        array, _ = image_cache.get_array(self.paths[2])
+        image = image_cache.get_image(self.paths[2])
+        image.SetPixel((0, 0, 0), 7)  # modifies the shallow copy only
+        other_array, _ = image_cache.get_array(self.paths[2])
+
+        self.assertTrue(np.shares_memory(array, other_array))
+        np.testing.assert_array_equal(other_array, 2)
+
+    def test_pixel_type(self):
+        image_cache = cache.ImageCache()
+        self.assertEqual(image_cache.get_image(self.paths[0], sitk.sitkFloat32).GetPixelID(), sitk.sitkFloat32)
+        self.assertEqual(image_cache.get_image(self.paths[0]).GetPixelID(), sitk.sitkUInt8)
+        self.assertEqual(len(image_cache), 2)
+
+    def test_eviction(self):
+        image_cache = cache.ImageCache(max_bytes=2000)
+        for path in self.paths:
+            image_cache.get_image(path)
+        self.assertEqual(len(image_cache), 2)
+        self.assertEqual(image_cache.statistics.evictions, 1)
+        self.assertNotIn(self.paths[0], image_cache)
+
+        image_cache.get_image(self.paths[1])  # most recently used
+        image_cache.get_image(self.paths[0])
+        self.assertNotIn(self.paths[2], image_cache)
+        self.assertIn(self.paths[1], image_cache)
+
+    def test_pin(self):
+        image_cache = cache.ImageCache(max_bytes=1000)
+        image_cache.pin(self.paths[0])
+        image_cache.get_image(self.paths[1])
+        image_cache.get_image(self.paths[2])
+        self.assertIn(self.paths[0], image_cache)
+        self.assertNotIn(self.paths[1], image_cache)
+
+        image_cache.unpin(self.paths[0])
+        self.assertEqual(image_cache.statistics.size_in_bytes, 1000)
+        with self.assertRaises(ValueError):
+            image_cache.unpin(self.paths[0])
+
+    def test_modified_file(self):
+        image_cache = cache.ImageCache()
+        image_cache.get_image(self.paths[0])
+        sitk.WriteImage(sitk.Image([10, 10, 10], sitk.sitkUInt8) + 7, self.paths[0])
+        stat = os.stat(self.paths[0])
+        os.utime(self.paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        self.assertEqual(image_cache.get_image(self.paths[0])[0, 0, 0], 7)
+        self.assertEqual(len(image_cache), 1)
+
+    def test_default_cache(self):
+        image_cache = cache.ImageCache(max_bytes=0)
+        cache.set_default_cache(image_cache)
+        self.assertIs(cache.get_default_cache(), image_cache)
+        cache.set_default_cache(None)
+        self.assertIsNot(cache.get_default_cache(), image_cache)
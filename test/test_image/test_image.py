@@ -1,3 +1,6 @@
+import os
+import pickle
+import tempfile
 import unittest
 
 import numpy as np
@@ -152,6 +155,128 @@ class TestImageProperties(unittest.TestCase):
         self.assertFalse(dut1 == dut2)
         self.assertTrue(dut1 != dut2)
 
+    def test_tolerant_equality(self):
+        image = sitk.Image([10, 10, 3], sitk.sitkUInt8)
+        image.SetSpacing((1, 1, 3))
+        dut1 = img.ImageProperties(image)
+        image.SetSpacing((1, 1, 3 + 1e-7))
+        dut2 = img.ImageProperties(image)
+
+        self.assertTrue(dut1 == dut2)
+        self.assertEqual(hash(dut1), hash(dut2))
+        self.assertFalse(dut1.equals(dut2, tolerance=0))
+        self.assertEqual({dut1: 'value'}[dut2], 'value')
+
+    def test_rounded_equality(self):
+        image = sitk.Image([10, 10, 3], sitk.sitkUInt8)
+        image.SetOrigin((4.9e-6, 0, 0))
+        dut1 = img.ImageProperties(image)
+        image.SetOrigin((5.1e-6, 0, 0))  # rounded to another multiple of the tolerance
+        dut2 = img.ImageProperties(image)
+
+        self.assertFalse(dut1 == dut2)
+        self.assertTrue(dut1.equals(dut2))
+
+        img.ImageProperties.TOLERANCE = 1  # a constant, which does not change the equality
+        try:
+            self.assertFalse(img.ImageProperties(image) == dut1)
+            self.assertTrue(img.ImageProperties(image) == dut2)
+        finally:
+            img.ImageProperties.TOLERANCE = 1e-5
+
+    def test_hash_distinct_origins(self):
+        dut = img.ImageProperties(sitk.Image([10, 10, 3], sitk.sitkUInt8))
+        patches = [dut.get_region((x, y, 0), (2, 2, 3)) for x in range(9) for y in range(9)]
+
+        self.assertEqual(len({hash(patch) for patch in patches}), len(patches))
+        self.assertEqual(len(set(patches)), len(patches))
+
+    def test_immutable(self):
+        dut = img.ImageProperties(sitk.Image([10, 10, 3], sitk.sitkUInt8))
+
+        with self.assertRaises(AttributeError):
+            dut.size = (1, 2, 3)
+        with self.assertRaises(AttributeError):
+            dut.new_attribute = 1
+        self.assertFalse(hasattr(dut, '__dict__'))
+
+    def test_intern(self):
+        image = sitk.Image([10, 10, 3], sitk.sitkUInt8)
+        dut1 = img.ImageProperties.intern(img.ImageProperties(image))
+        dut2 = img.ImageProperties.intern(img.ImageProperties(image))
+        dut3 = img.ImageProperties.intern(img.ImageProperties(sitk.Image([10, 10, 3], sitk.sitkInt8)))
+
+        self.assertIs(dut1, dut2)
+        self.assertIsNot(dut1, dut3)
+
+    def test_pickle_and_dict(self):
+        image = sitk.Image([10, 10, 3], sitk.sitkVectorUInt8, 2)
+        image.SetOrigin((1, 2, 3))
+        dut = img.ImageProperties(image)
+
+        for copy in (pickle.loads(pickle.dumps(dut)), img.ImageProperties.from_dict(dut.to_dict())):
+            self.assertEqual(copy, dut)
+            self.assertEqual(copy.number_of_components_per_pixel, 2)
+            self.assertEqual(copy.pixel_id, dut.pixel_id)
+
+    def test_from_file(self):
+        image = sitk.Image([10, 10, 3], sitk.sitkVectorInt16, 2)
+        image.SetOrigin((1, 2, 3))
+        image.SetSpacing((0.5, 0.5, 2))
+
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [os.path.join(directory, 'image{}.mha'.format(i)) for i in range(3)]
+            for path in paths:
+                sitk.WriteImage(image, path)
+
+            dut = img.ImageProperties.from_file(paths[0])
+            duts = img.ImageProperties.from_files(paths, max_workers=2)
+
+        expected = img.ImageProperties(image)
+        self.assertEqual(dut, expected)
+        self.assertEqual(dut.number_of_components_per_pixel, 2)
+        self.assertEqual(dut.pixel_id, image.GetPixelID())
+        self.assertEqual(duts, [expected] * 3)
+
+
+class TestDataTypes(unittest.TestCase):
+    def test_numpy_data_type(self):
+        self.assertEqual(img.get_numpy_data_type(sitk.sitkUInt16), np.uint16)
+        self.assertEqual(img.get_numpy_data_type(sitk.sitkInt64), np.int64)
+        self.assertEqual(img.get_numpy_data_type(sitk.sitkFloat64), np.float64)
+        self.assertEqual(img.get_numpy_data_type(sitk.sitkVectorFloat32), np.float32)
+        with self.assertRaises(ValueError):
+            img.get_numpy_data_type(sitk.sitkLabelUInt8)
+        self.assertEqual(img.get_numpy_data_type(sitk.sitkLabelUInt8, default=np.float32), np.float32)
+        self.assertEqual(img.get_numpy_data_type(sitk.sitkInt8, default=np.float32), np.int8)
+
+    def test_simpleitk_data_type(self):
+        for data_type, is_vector in ((sitk.sitkUInt8, False), (sitk.sitkInt32, False), (sitk.sitkUInt64, False),
+                                     (sitk.sitkFloat32, False), (sitk.sitkComplexFloat64, False),
+                                     (sitk.sitkVectorInt16, True), (sitk.sitkVectorFloat64, True)):
+            self.assertEqual(img.get_simpleitk_data_type(img.get_numpy_data_type(data_type), is_vector), data_type)
+        self.assertEqual(img.get_simpleitk_data_type(np.bool_), sitk.sitkUInt8)
+        with self.assertRaises(ValueError):
+            img.get_simpleitk_data_type(np.complex64, is_vector=True)
+
+    def test_label_data_type(self):
+        self.assertEqual(img.get_label_data_type(255), np.uint8)
+        self.assertEqual(img.get_label_data_type(256), np.uint16)
+        self.assertEqual(img.get_label_data_type(70000), np.uint32)
+        self.assertEqual(img.get_label_data_type(100, -1), np.int8)
+        self.assertEqual(img.get_label_data_type(200, -1), np.int16)
+
+    def test_compact_label_array(self):
+        array = np.array([[0, 3], [4, 1]], dtype=np.int64)
+        compact = img.get_compact_label_array(array)
+        self.assertEqual(compact.dtype, np.uint8)
+        np.testing.assert_array_equal(compact, array)
+        self.assertIs(img.get_compact_label_array(compact), compact)
+        self.assertEqual(img.get_compact_label_array(array.astype(np.float32) - 1).dtype, np.int8)
+        self.assertEqual(img.get_compact_label_array(array > 1).dtype, np.uint8)
+        with self.assertRaises(ValueError):
+            img.get_compact_label_array(array / 2)
+
 
 class TestSimpleITKNumpyImageBridge(unittest.TestCase):
     def test_convert(self):
@@ -172,3 +297,104 @@ class TestSimpleITKNumpyImageBridge(unittest.TestCase):
     def test_convert_None(self):
         with self.assertRaises(ValueError):
             img.SimpleITKNumpyImageBridge.convert(None)
+
+    def test_convert_view(self):
+        image = sitk.Image([10, 10, 3], sitk.sitkInt16)
+        image.SetPixel((1, 2, 0), 5)
+
+        array, properties = img.SimpleITKNumpyImageBridge.convert(image, view=True)
+
+        self.assertEqual(array.shape, (3, 10, 10))
+        self.assertEqual(array.dtype, np.int16)
+        self.assertFalse(array.flags.writeable)
+        self.assertEqual(array[0, 2, 1], 5)
+
+    def test_convert_view_lifetime(self):
+        image = sitk.Image([10, 10, 3], sitk.sitkInt16)
+        image.SetPixel((1, 2, 0), 5)
+        array, _ = img.SimpleITKNumpyImageBridge.convert(image, view=True)
+        view = array[0]
+
+        image.SetPixel((1, 2, 0), 7)  # the image copies the buffer before it is modified
+        del image, array  # the view keeps the buffer alive
+
+        self.assertEqual(view[2, 1], 5)
+        self.assertEqual(view.sum(), 5)
+
+    def test_convert_view_shallow_copy(self):
+        image = sitk.Image([10, 10, 3], sitk.sitkInt16)
+        image.SetPixel((1, 2, 0), 5)
+        array, _ = img.SimpleITKNumpyImageBridge.convert(image, view=True)
+        copy = sitk.Image(image)
+        other_array, _ = img.SimpleITKNumpyImageBridge.convert(image, view=True)
+        del copy  # must not release the buffer of the first view
+
+        self.assertEqual(array.mean(), 5 / 300)
+        self.assertEqual(other_array.mean(), 5 / 300)
+        self.assertFalse(np.shares_memory(array, other_array))
+
+    def test_convert_view_no_copy(self):
+        image = sitk.Image([10, 10, 3], sitk.sitkInt16)
+        address = sitk.GetArrayViewFromImage(image).__array_interface__['data'][0]
+        array, properties = img.SimpleITKNumpyImageBridge.convert(image, view=True)
+        self.assertEqual(array.__array_interface__['data'][0], address)
+        del image
+
+        result = img.NumpySimpleITKImageBridge.convert(array, properties)
+        del array  # releases the view's reference, such that the buffer is not copied on access
+        self.assertEqual(sitk.GetArrayViewFromImage(result).__array_interface__['data'][0], address)
+
+    def test_convert_label(self):
+        image = sitk.Image([10, 10, 3], sitk.sitkInt64)
+        image.SetPixel((1, 2, 0), 5)
+
+        array, _ = img.SimpleITKNumpyImageBridge.convert(image, is_label=True)
+        self.assertEqual(array.dtype, np.uint8)
+        self.assertEqual(array[0, 2, 1], 5)
+
+        array, _ = img.SimpleITKNumpyImageBridge.convert(image, view=True, dtype=np.int64)
+        self.assertFalse(array.flags.writeable)  # no cast necessary
+
+    def test_convert_dtype(self):
+        image = sitk.Image([10, 10, 3], sitk.sitkInt16)
+        array, _ = img.SimpleITKNumpyImageBridge.convert(image, dtype=np.float32)
+        self.assertEqual(array.dtype, np.float32)
+
+
+class TestNumpySimpleITKImageBridge(unittest.TestCase):
+    def setUp(self):
+        self.image = sitk.Image([10, 10, 3], sitk.sitkVectorFloat32, 2)
+        self.image.SetSpacing((1, 2, 3))
+        self.image.SetPixel((1, 2, 0), (5, 6))
+        self.array, self.properties = img.SimpleITKNumpyImageBridge.convert(self.image, view=True)
+
+    def test_convert(self):
+        image = img.NumpySimpleITKImageBridge.convert(self.array.reshape(-1, 2), self.properties)
+
+        self.assertEqual(image.GetSize(), (10, 10, 3))
+        self.assertEqual(image.GetSpacing(), (1, 2, 3))
+        self.assertEqual(image.GetPixel((1, 2, 0)), (5, 6))
+
+    def test_convert_modified(self):
+        image = img.NumpySimpleITKImageBridge.convert(self.array.reshape(-1, 2) + 1, self.properties)
+
+        self.assertEqual(image.GetNumberOfComponentsPerPixel(), 2)
+        self.assertEqual(image.GetPixel((1, 2, 0)), (6, 7))
+
+    def test_convert_to_vector_image(self):
+        image = img.NumpySimpleITKImageBridge.convert_to_vector_image(self.array.reshape(-1, 2), self.properties)
+
+        self.assertEqual(image.GetNumberOfComponentsPerPixel(), 2)
+        self.assertEqual(image.GetPixel((1, 2, 0)), (5, 6))
+
+    def test_convert_label(self):
+        array = np.zeros((3, 10, 10), dtype=np.float64)
+        array[0, 2, 1] = 300
+        properties = img.ImageProperties(sitk.Image([10, 10, 3], sitk.sitkFloat64))
+
+        image = img.NumpySimpleITKImageBridge.convert(array, properties, is_label=True)
+        self.assertEqual(image.GetPixelID(), sitk.sitkUInt16)
+        self.assertEqual(image.GetPixel((1, 2, 0)), 300)
+
+        image = img.NumpySimpleITKImageBridge.convert(array, properties)
+        self.assertEqual(image.GetPixelID(), sitk.sitkFloat64)  # intensity images keep their type
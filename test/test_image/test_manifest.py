@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+
+import SimpleITK as sitk
+
+import miapy.image.image as img
+import miapy.image.manifest as mnfst
+
+
+class TestDatasetManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.entries = []
+        for subject, spacing in (('S1', (1, 1, 1)), ('S2', (1, 1, 3))):
+            for modality in ('T1', 'T2'):
+                image = sitk.Image([4, 5, 6], sitk.sitkInt16)
+                image.SetSpacing(spacing)
+                path = os.path.join(self.directory.name, '{}_{}.mha'.format(subject, modality))
+                sitk.WriteImage(image, path)
+                self.entries.append((subject, modality, path))
+
+        self.manifest = mnfst.DatasetManifest(os.path.join(self.directory.name, 'manifest.sqlite'))
+
+    def tearDown(self):
+        self.manifest.close()
+        self.directory.cleanup()
+
+    def test_scan(self):
+        self.assertEqual(self.manifest.scan(self.entries), 4)
+        self.assertEqual(len(self.manifest), 4)
+
+        entry = self.manifest.get('S1', 'T2')
+        self.assertEqual(entry.path, self.entries[1][2])
+        self.assertEqual(entry.properties, img.ImageProperties(sitk.ReadImage(entry.path)))
+        self.assertEqual(entry.checksum, mnfst.get_checksum(entry.path))
+
+    def test_scan_incremental(self):
+        self.manifest.scan(self.entries)
+        self.assertEqual(self.manifest.scan(self.entries), 0)
+
+        image = sitk.Image([7, 7, 7], sitk.sitkInt16)
+        sitk.WriteImage(image, self.entries[0][2])
+        os.utime(self.entries[0][2], ns=(0, 0))
+
+        self.assertEqual(self.manifest.scan(self.entries), 1)
+        self.assertEqual(self.manifest.get('S1', 'T1').properties.size, (7, 7, 7))
+
+    def test_scan_remove_missing(self):
+        self.manifest.scan(self.entries)
+        self.manifest.scan(self.entries[:3], remove_missing=True)
+
+        self.assertEqual(len(self.manifest), 3)
+        self.assertIsNone(self.manifest.get('S2', 'T2'))
+
+    def test_persistence(self):
+        self.manifest.scan(self.entries, compute_checksums=False)
+        self.manifest.close()
+
+        self.manifest = mnfst.DatasetManifest(os.path.join(self.directory.name, 'manifest.sqlite'))
+        self.assertEqual(len(self.manifest), 4)
+        self.assertIsNone(self.manifest.get('S1', 'T1').checksum)
+
+    def test_query(self):
+        self.manifest.scan(self.entries)
+
+        entries = self.manifest.query(modality='T1', spacing=1.0)
+        self.assertEqual([(entry.subject, entry.modality) for entry in entries], [('S1', 'T1')])
+
+        entries = self.manifest.query(spacing=(1, 1, 3 + 1e-7), size=(4, 5, 6))
+        self.assertEqual([(entry.subject, entry.modality) for entry in entries], [('S2', 'T1'), ('S2', 'T2')])
+
+        self.assertEqual(len(self.manifest.query(subject='S1')), 2)
+
+    def test_backfill_checksums(self):
+        self.manifest.scan(self.entries, compute_checksums=False)
+        self.assertEqual(self.manifest.scan(self.entries[:2]), 2)  # unchanged, but not yet hashed
+
+        self.assertEqual(self.manifest.get('S1', 'T1').checksum, mnfst.get_checksum(self.entries[0][2]))
+        self.assertIsNone(self.manifest.get('S2', 'T1').checksum)
+        self.assertEqual(self.manifest.scan(self.entries[:2]), 0)
+        self.assertEqual(self.manifest.scan(self.entries, compute_checksums=False), 0)
+
+    def test_query_two_dimensional(self):
+        image = sitk.Image([4, 5], sitk.sitkInt16)
+        path = os.path.join(self.directory.name, 'S3_T1.mha')
+        sitk.WriteImage(image, path)
+        self.manifest.scan(self.entries + [('S3', 'T1', path)])
+
+        entries = self.manifest.query(modality='T1', spacing=1.0)
+        self.assertEqual([entry.subject for entry in entries], ['S1', 'S3'])
+        entries = self.manifest.query(spacing=(1, 1), size=(4, 5))
+        self.assertEqual([entry.subject for entry in entries], ['S3'])
+        entries = self.manifest.query(size=(4, 5, 6), modality='T1')
+        self.assertEqual([entry.subject for entry in entries], ['S1', 'S2'])
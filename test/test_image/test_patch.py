@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.image.image as img
+import miapy.image.patch as patch
+import miapy.image.store as store
+
+
+class TestGridPatchSampler(unittest.TestCase):
+
+    def setUp(self):
+        self.array = np.arange(5 * 6 * 7, dtype=np.float32).reshape((5, 6, 7))
+        image = sitk.GetImageFromArray(self.array)
+        image.SetOrigin((1.0, 2.0, 3.0))
+        image.SetSpacing((0.5, 1.0, 2.0))
+        self.image = image
+        self.properties = img.ImageProperties(image)
+
+    def test_indices(self):
+        sampler = patch.GridPatchSampler((4, 4, 4), stride=(3, 3, 3))
+        indices = list(sampler.get_indices(self.properties))
+        self.assertEqual(len(indices), sampler.get_number_of_patches(self.properties))
+        self.assertEqual(indices[:3], [(0, 0, 0), (3, 0, 0), (0, 2, 0)])
+        self.assertEqual(indices[-1], (3, 2, 1))  # aligned with the border
+
+    def test_sample(self):
+        sampler = patch.GridPatchSampler((4, 3, 2), batch_size=5)
+        batches = list(sampler.sample([self.array, 2 * self.array], self.properties))
+        self.assertEqual(sum(len(batch) for batch in batches), sampler.get_number_of_patches(self.properties))
+        self.assertEqual(len(batches[0]), 5)
+
+        batch = batches[1]
+        x, y, z = batch.indices[2]
+        t1, t2 = batch.patches[2]
+        np.testing.assert_array_equal(t1, self.array[z:z + 2, y:y + 3, x:x + 4])
+        np.testing.assert_array_equal(t2, 2 * t1)
+        self.assertTrue(np.shares_memory(t1, self.array))  # a view
+        np.testing.assert_allclose(batch.origins[2],
+                                   self.image.TransformIndexToPhysicalPoint((int(x), int(y), int(z))))
+
+    def test_stack(self):
+        sampler = patch.GridPatchSampler((4, 3, 2), batch_size=4)
+        out = np.empty((4, 2, 2, 3, 4), dtype=np.float32)
+        for batch in sampler.sample([self.array, self.array], self.properties):
+            stacked = batch.stack(out)
+            self.assertEqual(stacked.shape, (len(batch), 2, 2, 3, 4))
+            np.testing.assert_array_equal(stacked[-1, 1], batch.patches[-1][1])
+
+    def test_region_reader(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = store.write_chunked_image(self.image, os.path.join(directory, 'image.chunks'),
+                                             chunk_size=(3, 3, 3))
+            with store.ChunkedImageReader(path) as reader:
+                batch = next(patch.GridPatchSampler((4, 3, 2), batch_size=3).sample([reader], reader.properties))
+        x, y, z = batch.indices[1]
+        np.testing.assert_array_equal(batch.patches[1][0], self.array[z:z + 2, y:y + 3, x:x + 4])
+
+    def test_invalid_patch_size(self):
+        with self.assertRaises(ValueError):
+            list(patch.GridPatchSampler((8, 3, 2)).sample([self.array], self.properties))
+
+
+class TestRandomPatchSampler(unittest.TestCase):
+
+    def test_sample(self):
+        array = np.arange(5 * 6 * 7).reshape((5, 6, 7))
+        properties = img.ImageProperties(sitk.GetImageFromArray(array))
+        sampler = patch.RandomPatchSampler((3, 3, 3), number_of_patches=10, batch_size=4, seed=0)
+
+        batches = list(sampler.sample([array], properties))
+        self.assertEqual([len(batch) for batch in batches], [4, 4, 2])
+        for batch in batches:
+            self.assertTrue(np.all(batch.indices >= 0))
+            self.assertTrue(np.all(batch.indices + 3 <= properties.size))
+            self.assertEqual(batch.stack().shape, (len(batch), 1, 3, 3, 3))
+
+
+class TestPatchAccumulator(unittest.TestCase):
+
+    def setUp(self):
+        self.array = np.random.RandomState(0).rand(5, 6, 7).astype(np.float32)
+        image = sitk.GetImageFromArray(self.array)
+        image.SetOrigin((1.0, 2.0, 3.0))
+        image.SetSpacing((0.5, 1.0, 2.0))
+        self.properties = img.ImageProperties(image)
+
+    def _reassemble(self, accumulator, stride):
+        sampler = patch.GridPatchSampler((4, 3, 2), stride=stride, batch_size=4)
+        for batch in sampler.sample([self.array], self.properties):
+            accumulator.add_batch(batch.stack()[:, 0], batch.indices)
+        return accumulator.get_image()
+
+    def test_average(self):
+        image = self._reassemble(patch.PatchAccumulator(self.properties), (2, 2, 1))
+        np.testing.assert_allclose(sitk.GetArrayFromImage(image), self.array, rtol=1e-6)
+        self.assertEqual(img.ImageProperties(image), self.properties)
+
+    def test_gaussian(self):
+        accumulator = patch.PatchAccumulator(self.properties, weighting='gaussian', number_of_locks=3)
+        image = self._reassemble(accumulator, (1, 1, 1))
+        np.testing.assert_allclose(sitk.GetArrayFromImage(image), self.array, rtol=1e-5)
+
+    def test_vector(self):
+        accumulator = patch.PatchAccumulator(self.properties, number_of_components=2)
+        accumulator.add(np.ones((5, 6, 7, 2), dtype=np.float32), (0, 0, 0))
+        accumulator.add(np.full((2, 2, 2, 2), 3, dtype=np.float32), (1, 1, 1))
+        image = accumulator.get_image()
+        self.assertEqual(image.GetNumberOfComponentsPerPixel(), 2)
+        self.assertEqual(image.GetPixel((1, 1, 1)), (2, 2))
+        self.assertEqual(image.GetPixel((0, 0, 0)), (1, 1))
+
+    def test_uncovered_and_invalid(self):
+        accumulator = patch.PatchAccumulator(self.properties)
+        accumulator.add(np.ones((2, 2, 2), dtype=np.float32), (0, 0, 0))
+        array = accumulator.normalize()
+        self.assertEqual(array.sum(), 8)
+        with self.assertRaises(ValueError):
+            accumulator.add(np.ones((2, 2, 2), dtype=np.float32), (6, 0, 0))
+        with self.assertRaises(ValueError):
+            patch.PatchAccumulator(self.properties, weighting='median')
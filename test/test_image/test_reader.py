@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.image.image as img
+import miapy.image.reader as rd
+
+
+class _CountingReader(rd.PrefetchingReader):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.number_of_submitted_subjects = 0
+
+    def _submit(self, executor, group):
+        self.number_of_submitted_subjects += 1
+        return super()._submit(executor, group)
+
+
+class TestPrefetchingReader(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.subjects = []
+        for i in range(4):
+            group = {}
+            for modality in ('T1', 'GroundTruth'):
+                path = os.path.join(self.directory.name, '{}_{}.mha'.format(i, modality))
+                sitk.WriteImage(sitk.Image([4, 5, 6], sitk.sitkInt16) + i, path)  # 240 bytes
+                group[modality] = path
+            self.subjects.append(group)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_iterate(self):
+        reader = rd.PrefetchingReader(self.subjects, prefetch_depth=2)
+        self.assertEqual(len(reader), 4)
+        for i, images in enumerate(reader):
+            self.assertEqual(set(images), {'T1', 'GroundTruth'})
+            self.assertEqual(images['T1'][0, 0, 0], i)
+        self.assertEqual(i, 3)
+
+    def test_file_groups(self):
+        paths = [subject['T1'] for subject in self.subjects]
+        images = list(rd.PrefetchingReader(paths))
+        self.assertEqual([image[0, 0, 0] for image in images], [0, 1, 2, 3])
+
+        groups = list(rd.PrefetchingReader([paths[:2], paths[2:]]))
+        self.assertEqual([[image[0, 0, 0] for image in group] for group in groups], [[0, 1], [2, 3]])
+
+    def test_as_arrays(self):
+        for i, (array, properties) in enumerate(rd.PrefetchingReader(
+                [subject['T1'] for subject in self.subjects], as_arrays=True, pixel_type=sitk.sitkFloat32)):
+            self.assertEqual(array.dtype, np.float32)
+            np.testing.assert_array_equal(array, i)
+            self.assertIsInstance(properties, img.ImageProperties)
+
+    def test_prefetch_depth(self):
+        for prefetch_depth in (1, 2):
+            reader = _CountingReader(self.subjects, prefetch_depth=prefetch_depth)
+            for i, _ in enumerate(reader):
+                # the current subject and the subjects read ahead of it
+                self.assertEqual(reader.number_of_submitted_subjects, min(i + 1 + prefetch_depth, 4))
+
+    def test_max_bytes(self):
+        reader = _CountingReader(self.subjects, prefetch_depth=3, max_bytes=480)
+        for i, _ in enumerate(reader):
+            # only one subject is read ahead as a second one exceeds the memory budget
+            self.assertEqual(reader.number_of_submitted_subjects, min(i + 2, 4))
+
+        reader = _CountingReader(self.subjects, prefetch_depth=3, max_bytes=0)
+        for i, _ in enumerate(reader):
+            self.assertEqual(reader.number_of_submitted_subjects, i + 1)  # nothing is read ahead
+
+    def test_estimate_size_in_bytes(self):
+        reader = rd.PrefetchingReader(self.subjects, max_bytes=0)
+        self.assertEqual(reader._estimate_size_in_bytes(self.subjects[0]), 2 * 240)
+
+        # pixel types without numpy equivalent are estimated with 8 bytes per pixel component
+        reader = rd.PrefetchingReader(self.subjects, max_bytes=0, pixel_type=sitk.sitkLabelUInt8)
+        self.assertEqual(reader._estimate_size_in_bytes(self.subjects[0]), 2 * 120 * 8)
+
+    def test_invalid_prefetch_depth(self):
+        with self.assertRaises(ValueError):
+            rd.PrefetchingReader(self.subjects, prefetch_depth=0)
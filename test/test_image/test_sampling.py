@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.image.sampling as smpl
+
+
+class TestStratifiedVoxelSampler(unittest.TestCase):
+
+    def setUp(self):
+        self.label_maps = []
+        for i in range(3):
+            label_map = np.zeros((10, 20, 30), dtype=np.uint8)
+            label_map[2:8, 5:15, 10:20] = 1
+            label_map[0, 0, :i + 1] = 2  # few voxels
+            self.label_maps.append(label_map)
+
+    def test_sample(self):
+        sampler = smpl.StratifiedVoxelSampler({0: 100, 1: 50, 2: 10}, chunk_size=1000, seed=0)
+        for label_map in self.label_maps:
+            sampler.add(sitk.GetImageFromArray(label_map))
+        samples = sampler.get_samples()
+
+        self.assertEqual({label: len(indices) for label, (_, indices) in samples.items()}, {0: 100, 1: 50, 2: 6})
+        for label, (subjects, indices) in samples.items():
+            self.assertEqual(subjects.dtype, np.uint8)
+            self.assertEqual(indices.dtype, np.uint16)
+            self.assertEqual(len(np.unique(subjects.astype(np.int64) * 6000 + indices)), len(indices))
+            for subject, index in zip(subjects, indices):
+                self.assertEqual(self.label_maps[subject].ravel()[index], label)
+
+    def test_subject_indices(self):
+        sampler = smpl.StratifiedVoxelSampler(20, seed=1)
+        for label_map in self.label_maps:
+            sampler.add(label_map)
+
+        indices = sampler.get_subject_indices(2)
+        self.assertEqual(set(indices), {0, 1, 2})
+        np.testing.assert_array_equal(indices[2], [0, 1, 2])
+        features = self.label_maps[2].reshape(-1, 1)  # e.g. a feature array of shape=(n, v)
+        np.testing.assert_array_equal(features[indices[1]], 1)
+
+    def test_seed(self):
+        samples = []
+        for _ in range(2):
+            sampler = smpl.StratifiedVoxelSampler({1: 30}, chunk_size=777, seed=42)
+            sampler.add(self.label_maps[0])
+            samples.append(sampler.get_samples()[1][1])
+        np.testing.assert_array_equal(samples[0], samples[1])
+
+    def test_uniform(self):
+        # the label 1 voxels are split equally between two subjects
+        sampler = smpl.StratifiedVoxelSampler({1: 300}, chunk_size=512, seed=0)
+        sampler.add(self.label_maps[0])
+        sampler.add(self.label_maps[1])
+        subjects, _ = sampler.get_samples()[1]
+        self.assertTrue(100 < np.count_nonzero(subjects == 0) < 200)
@@ -0,0 +1,79 @@
+import pickle
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.image.image as img
+import miapy.image.shared as shared
+
+
+def _increment(descriptor: shared.SharedImageDescriptor) -> float:
+    with shared.SharedImage.attach(descriptor) as shared_image:
+        array = shared_image.get_array()
+        array += 1
+        total = float(array.sum())
+        del array
+    return total
+
+
+class TestSharedImage(unittest.TestCase):
+
+    def setUp(self):
+        self.image = sitk.GetImageFromArray(np.arange(60, dtype=np.int16).reshape((3, 4, 5)))
+        self.image.SetSpacing((1.0, 2.0, 3.0))
+
+    def test_from_image(self):
+        with shared.SharedImage.from_image(self.image) as shared_image:
+            array = shared_image.get_array()
+            np.testing.assert_array_equal(array, sitk.GetArrayFromImage(self.image))
+            self.assertEqual(shared_image.properties, img.ImageProperties(self.image))
+            self.assertEqual(shared_image.descriptor.size_in_bytes, 120)
+            del array
+
+            image = shared_image.get_image()
+            self.assertEqual(image.GetSpacing(), (1.0, 2.0, 3.0))
+            np.testing.assert_array_equal(sitk.GetArrayFromImage(image), sitk.GetArrayFromImage(self.image))
+
+    def test_vector_image(self):
+        vector_image = sitk.Compose([self.image, self.image])
+        with shared.SharedImage.from_image(vector_image) as shared_image:
+            image = shared_image.get_image()
+        self.assertEqual(image.GetNumberOfComponentsPerPixel(), 2)
+        self.assertEqual(image.GetPixel((1, 0, 0)), (1, 1))
+
+    def test_descriptor_pickle(self):
+        with shared.SharedImage.from_image(self.image) as shared_image:
+            descriptor = pickle.loads(pickle.dumps(shared_image.descriptor))
+            self.assertEqual(descriptor.name, shared_image.descriptor.name)
+            self.assertEqual(descriptor.properties, shared_image.properties)
+
+    def test_worker_process(self):
+        context = multiprocessing.get_context('spawn')
+        with shared.SharedImage.from_image(self.image) as shared_image, \
+                ProcessPoolExecutor(1, mp_context=context) as executor:
+            total = executor.submit(_increment, shared_image.descriptor).result()
+
+            array = shared_image.get_array()
+            self.assertEqual(total, float(array.sum()))
+            np.testing.assert_array_equal(array, sitk.GetArrayFromImage(self.image) + 1)  # modified in place
+            del array
+
+    def test_unlink_attached(self):
+        with shared.SharedImage.from_image(self.image) as shared_image:
+            attached = shared.SharedImage.attach(shared_image.descriptor)
+            with self.assertRaises(ValueError):
+                attached.unlink()
+            attached.close()
+
+    def test_take_ownership(self):
+        shared_image = shared.SharedImage.from_image(self.image)
+        shared_image.close()  # e.g. in a worker process returning the descriptor
+
+        with shared.SharedImage.attach(shared_image.descriptor, take_ownership=True) as attached:
+            np.testing.assert_array_equal(sitk.GetArrayFromImage(attached.get_image()),
+                                          sitk.GetArrayFromImage(self.image))
+        with self.assertRaises(FileNotFoundError):  # unlinked
+            shared.SharedImage.attach(shared_image.descriptor)
@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.image.image as img
+import miapy.image.store as store
+
+
+class TestMemoryMappedImageReader(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.array = np.arange(6 * 5 * 4, dtype=np.int16).reshape((6, 5, 4))
+        self.image = sitk.GetImageFromArray(self.array)
+        self.image.SetSpacing((1.0, 2.0, 3.0))
+        self.image.SetOrigin((-1.0, 5.0, 10.0))
+        self.image.SetDirection((0.0, 1.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0))
+        self.path = store.write_memory_mapped_image(self.image, os.path.join(self.directory.name, 'image'))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write(self):
+        self.assertTrue(self.path.endswith('.npy'))
+        self.assertTrue(os.path.exists(store.get_sidecar_path(self.path)))
+        reader = store.MemoryMappedImageReader(self.path)
+        self.assertEqual(reader.properties, img.ImageProperties(self.image))
+        np.testing.assert_array_equal(reader.read_array(), self.array)
+
+    def test_read_array(self):
+        reader = store.MemoryMappedImageReader(self.path)
+        region = reader.read_array((1, 2, 3), (2, 3, 2))
+        np.testing.assert_array_equal(region, self.array[3:5, 2:5, 1:3])
+        self.assertIsInstance(region.base, np.memmap)
+        self.assertFalse(region.flags.writeable)
+
+    def test_read_image(self):
+        reader = store.MemoryMappedImageReader(self.path)
+        region = reader.read_image((1, 2, 3), (2, 3, 2))
+
+        expected = self.image[1:3, 2:5, 3:5]
+        np.testing.assert_array_equal(sitk.GetArrayFromImage(region), sitk.GetArrayFromImage(expected))
+        np.testing.assert_allclose(region.GetOrigin(), expected.GetOrigin())
+        self.assertEqual(region.GetSpacing(), expected.GetSpacing())
+        self.assertEqual(region.GetDirection(), expected.GetDirection())
+
+    def test_read_invalid_region(self):
+        with store.MemoryMappedImageReader(self.path) as reader:
+            with self.assertRaises(ValueError):
+                reader.read_array((3, 0, 0), (2, 1, 1))
+            with self.assertRaises(ValueError):
+                reader.read_array((-1, 0, 0), (1, 1, 1))
+
+    def test_vector_image(self):
+        vector_image = sitk.Compose([self.image, self.image])
+        path = store.write_memory_mapped_image(vector_image, os.path.join(self.directory.name, 'vector.npy'))
+        reader = store.MemoryMappedImageReader(path)
+        region = reader.read_image((0, 1, 2), (4, 2, 1))
+        self.assertEqual(region.GetNumberOfComponentsPerPixel(), 2)
+        self.assertEqual(region.GetSize(), (4, 2, 1))
+
+
+class TestChunkedImageReader(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.array = np.random.RandomState(0).randint(0, 100, (7, 9, 10)).astype(np.float32)
+        self.image = sitk.GetImageFromArray(self.array)
+        self.image.SetSpacing((1.0, 2.0, 3.0))
+        self.image.SetOrigin((-1.0, 5.0, 10.0))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_array(self):
+        for codec in store.CODECS:
+            path = store.write_chunked_image(self.image, os.path.join(self.directory.name, codec),
+                                             chunk_size=(4, 3, 2), codec=codec, max_workers=2)
+            with store.ChunkedImageReader(path) as reader:
+                self.assertEqual(reader.properties, img.ImageProperties(self.image))
+                self.assertEqual(reader.grid, (4, 3, 3))
+                np.testing.assert_array_equal(reader.read_array(), self.array)
+                np.testing.assert_array_equal(reader.read_array((3, 2, 1), (6, 5, 4)), self.array[1:5, 2:7, 3:9])
+
+    def test_read_image(self):
+        path = store.write_chunked_image(self.image, os.path.join(self.directory.name, 'image.chunks'),
+                                         chunk_size=(4, 4, 4))
+        with store.ChunkedImageReader(path) as reader:
+            region = reader.read_image((5, 0, 2), (1, 9, 3))
+
+        expected = self.image[5:6, 0:9, 2:5]
+        np.testing.assert_array_equal(sitk.GetArrayFromImage(region), sitk.GetArrayFromImage(expected))
+        np.testing.assert_allclose(region.GetOrigin(), expected.GetOrigin())
+
+    def test_close(self):
+        path = store.write_chunked_image(self.image, os.path.join(self.directory.name, 'image.chunks'))
+        with store.ChunkedImageReader(path) as reader:
+            reader.read_array((0, 0, 0), (1, 1, 1))
+        self.assertTrue(reader._file.closed)
+        with self.assertRaises(ValueError):
+            reader.read_array((0, 0, 0), (1, 1, 1))
+
+        reader = store.ChunkedImageReader(path)
+        reader.close()
+        reader.close()  # closing twice is allowed
+        self.assertTrue(reader._file.closed)
+
+    def test_vector_image(self):
+        vector_image = sitk.Compose([self.image, self.image * 2])
+        path = store.write_chunked_image(vector_image, os.path.join(self.directory.name, 'vector.chunks'),
+                                         chunk_size=(4, 4, 4))
+        with store.ChunkedImageReader(path) as reader:
+            np.testing.assert_array_equal(reader.read_array((1, 2, 3), (4, 4, 4)),
+                                          sitk.GetArrayFromImage(vector_image)[3:7, 2:6, 1:5])
+
+    def test_invalid_arguments(self):
+        path = os.path.join(self.directory.name, 'image.chunks')
+        with self.assertRaises(ValueError):
+            store.write_chunked_image(self.image, path, codec='bz2')
+        with self.assertRaises(ValueError):
+            store.write_chunked_image(self.image, path, chunk_size=(4, 4))
@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import SimpleITK as sitk
+
+import miapy.image.writer as wrt
+
+
+class TestAsyncImageWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.image = sitk.GetImageFromArray(np.arange(60, dtype=np.int16).reshape((3, 4, 5)))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write(self):
+        paths = [os.path.join(self.directory.name, name) for name in ('image.nii.gz', 'image.mha', 'image.mhd')]
+        with wrt.AsyncImageWriter(max_workers=2, max_bytes=120) as writer:
+            futures = [writer.write(self.image, path, use_compression=True, compression_level=1) for path in paths]
+        self.assertEqual([future.result() for future in futures], paths)
+
+        for path in paths:
+            np.testing.assert_array_equal(sitk.GetArrayFromImage(sitk.ReadImage(path)),
+                                          sitk.GetArrayFromImage(self.image))
+        self.assertFalse(any(name.startswith('.tmp-') for name in os.listdir(self.directory.name)))
+
+    def test_modify_after_write(self):
+        path = os.path.join(self.directory.name, 'image.mha')
+        with wrt.AsyncImageWriter() as writer:
+            writer.write(self.image, path)
+            self.image[0, 0, 0] = 100
+        self.assertEqual(sitk.ReadImage(path)[0, 0, 0], 0)
+
+    def test_error_on_flush(self):
+        writer = wrt.AsyncImageWriter()
+        writer.write(self.image, os.path.join(self.directory.name, 'missing', 'image.mha'))
+        with self.assertRaises(RuntimeError):
+            writer.flush()
+        writer.flush()  # the error is raised once
+        writer.close()
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+        with self.assertRaises(ValueError):
+            writer.write(self.image, os.path.join(self.directory.name, 'image.mha'))